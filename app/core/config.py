@@ -7,15 +7,179 @@ class Settings:
     def __init__(self):
         self.GEMINI_API_KEY: str | None = os.getenv("GEMINI_API_KEY")
 
+        # 로그 레벨 (DEBUG 면 요청별 프롬프트 토큰 통계까지 남긴다)
+        self.LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+
         # 기본값을 Pro로
         self.GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
 
+        self.GEMINI_API_BASE: str = os.getenv(
+            "GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta"
+        ).rstrip("/")
+
         # 모델에 따라 URL 동적으로 생성
-        self.GEMINI_URL: str = (
-            "https://generativelanguage.googleapis.com/"
-            f"v1beta/models/{self.GEMINI_MODEL}:generateContent"
-        )
+        self.GEMINI_URL: str = self.gemini_model_url(self.GEMINI_MODEL, "generateContent")
+        self.GEMINI_STREAM_URL: str = self.gemini_model_url(self.GEMINI_MODEL, "streamGenerateContent")
+        self.GEMINI_CACHED_CONTENTS_URL: str = f"{self.GEMINI_API_BASE}/cachedContents"
+
+        # responseMimeType=application/json + 응답 스키마 강제 (스키마는 LifeCyclePlanResponse 에서 자동 생성)
+        self.GEMINI_STRUCTURED_OUTPUT: bool = os.getenv("GEMINI_STRUCTURED_OUTPUT", "true").lower() == "true"
+        # 로컬 보정으로도 스키마가 맞지 않을 때 한 번만 호출하는 저비용 보정 모델
+        self.GEMINI_REPAIR_MODEL: str = os.getenv("GEMINI_REPAIR_MODEL", "gemini-2.5-flash")
+
+        # 정적 지시문을 cachedContents 로 등록해 요청마다 다시 보내지 않는다
+        # (모델별 최소 토큰 수 미만이면 등록이 거부되어 자동으로 system_instruction 인라인 전송)
+        self.GEMINI_CONTEXT_CACHE: bool = os.getenv("GEMINI_CONTEXT_CACHE", "false").lower() == "true"
+        self.GEMINI_CONTEXT_CACHE_TTL_SEC: int = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SEC", "3600"))
 
         self.GEMINI_TIMEOUT_SEC: int = int(os.getenv("GEMINI_TIMEOUT_SEC", "300"))
 
+        # 요청 전체 시간 예산 (gunicorn --timeout 60 보다 짧게). X-Request-Timeout 헤더로 줄일 수 있다
+        self.PLAN_DEADLINE_SEC: float = float(os.getenv("PLAN_DEADLINE_SEC", "55"))
+        self.PLAN_DEADLINE_MAX_SEC: float = float(os.getenv("PLAN_DEADLINE_MAX_SEC", "55"))
+        # 남은 예산이 이보다 적으면 Gemini 를 (다시) 부르지 않고 fallback 으로 응답
+        self.GEMINI_MIN_ATTEMPT_SEC: float = float(os.getenv("GEMINI_MIN_ATTEMPT_SEC", "5"))
+
+        # 공유 HTTP 커넥션 풀 (keep-alive / 동시 연결 수 제한)
+        self.HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+        self.HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "50"))
+        self.HTTP_KEEPALIVE_EXPIRY_SEC: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SEC", "60"))
+        self.HTTP_CONNECT_TIMEOUT_SEC: float = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", "10"))
+        self.HTTP_POOL_TIMEOUT_SEC: float = float(os.getenv("HTTP_POOL_TIMEOUT_SEC", "30"))
+
+        # 컨테이너 내 워커들이 공유하는 로컬 데이터 디렉터리
+        self.DATA_DIR: str = os.getenv("DATA_DIR", "/tmp/life-cycle-ai")
+
+        # 청약 기반 지식 파일 (시작 시 한 번 파싱해 설문별로 필요한 섹션만 프롬프트에 넣는다)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.KNOWLEDGE_PATH: str = os.getenv("KNOWLEDGE_PATH", os.path.join(project_root, "life_cycle_plan.txt"))
+
+        # Gemini 호출 AIMD 리미터 (워커 간 공유 SQLite, 빈 문자열이면 끈다)
+        self.GEMINI_LIMITER_DB_PATH: str = os.getenv(
+            "GEMINI_LIMITER_DB_PATH", os.path.join(self.DATA_DIR, "gemini_limiter.sqlite3")
+        )
+        self.GEMINI_LIMITER_INITIAL_WINDOW: float = float(os.getenv("GEMINI_LIMITER_INITIAL_WINDOW", "8"))
+        self.GEMINI_LIMITER_MIN_WINDOW: float = float(os.getenv("GEMINI_LIMITER_MIN_WINDOW", "1"))
+        self.GEMINI_LIMITER_MAX_WINDOW: float = float(os.getenv("GEMINI_LIMITER_MAX_WINDOW", "64"))
+        self.GEMINI_LIMITER_MAX_WAIT_SEC: float = float(os.getenv("GEMINI_LIMITER_MAX_WAIT_SEC", "30"))
+        # 초당 호출 수 상한 (0 이면 동시성 window 만 적용)
+        self.GEMINI_RATE_LIMIT_RPS: float = float(os.getenv("GEMINI_RATE_LIMIT_RPS", "0"))
+        self.GEMINI_RATE_LIMIT_BURST: float = float(os.getenv("GEMINI_RATE_LIMIT_BURST", "10"))
+
+        # 여러 API 키/엔드포인트 분산: "key1,key2@https://host/v1beta" (@ 가 없으면 GEMINI_API_BASE)
+        # 비어 있으면 GEMINI_API_KEY 하나만 쓴다. 리미터 window/RPS 는 키 개수만큼 늘어난다
+        self.GEMINI_API_KEYS: str = os.getenv("GEMINI_API_KEYS", "")
+        self.GEMINI_KEY_POOL_DB_PATH: str = os.getenv(
+            "GEMINI_KEY_POOL_DB_PATH", os.path.join(self.DATA_DIR, "gemini_keys.sqlite3")
+        )
+        # 키당 분당 요청/토큰 쿼터 (0 이면 제한 없음, 워커 간 공유)
+        self.GEMINI_KEY_RPM: int = int(os.getenv("GEMINI_KEY_RPM", "0"))
+        self.GEMINI_KEY_TPM: int = int(os.getenv("GEMINI_KEY_TPM", "0"))
+        # 429 를 받은 키는 QUARANTINE_SEC 부터 연속 실패마다 두 배로 (최대 MAX_QUARANTINE_SEC) 쉬게 한다
+        self.GEMINI_KEY_QUARANTINE_SEC: float = float(os.getenv("GEMINI_KEY_QUARANTINE_SEC", "30"))
+        self.GEMINI_KEY_MAX_QUARANTINE_SEC: float = float(os.getenv("GEMINI_KEY_MAX_QUARANTINE_SEC", "300"))
+        self.GEMINI_KEY_MAX_WAIT_SEC: float = float(os.getenv("GEMINI_KEY_MAX_WAIT_SEC", "10"))
+        # TPM 선점용 예상 출력 토큰 수 (응답의 usageMetadata 로 나중에 고친다)
+        self.GEMINI_KEY_EST_OUTPUT_TOKENS: int = int(os.getenv("GEMINI_KEY_EST_OUTPUT_TOKENS", "1500"))
+        # 시작 시 엔드포인트마다 커넥션을 미리 열어 둔다 (첫 요청의 TLS 핸드셰이크 제거)
+        self.GEMINI_WARM_UP: bool = os.getenv("GEMINI_WARM_UP", "true").lower() == "true"
+
+        # 헤지 요청: 기본 모델이 지연 백분위 안에 답하지 않으면 빠른 모델로 한 번 더 보내고 먼저 유효한 응답을 쓴다
+        # 헤지된 요청은 토큰/쿼터를 두 번 쓰므로 기본은 꺼 둔다. 켜려면 GEMINI_HEDGE_ENABLED=true 로 설정하고,
+        # 기본 모델 호출이 GEMINI_HEDGE_PERCENTILE 백분위 지연(표본이 GEMINI_HEDGE_MIN_SAMPLES 건 미만이면
+        # GEMINI_HEDGE_DEFAULT_DELAY_SEC)을 넘긴 요청만 헤지된다
+        # (/ai/stats 의 hedging 항목으로 헤지 횟수와 어느 쪽이 이겼는지 확인한다)
+        self.GEMINI_HEDGE_ENABLED: bool = os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() == "true"
+        self.GEMINI_HEDGE_MODEL: str = os.getenv("GEMINI_HEDGE_MODEL", "gemini-2.5-flash")
+        self.GEMINI_HEDGE_PERCENTILE: float = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+        self.GEMINI_HEDGE_MIN_SAMPLES: int = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+        self.GEMINI_HEDGE_DEFAULT_DELAY_SEC: float = float(os.getenv("GEMINI_HEDGE_DEFAULT_DELAY_SEC", "20"))
+        self.GEMINI_HEDGE_MIN_DELAY_SEC: float = float(os.getenv("GEMINI_HEDGE_MIN_DELAY_SEC", "2"))
+
+        # Gemini 회로 차단기 (최근 WINDOW 건 중 실패/느린 호출 비율이 임계값 이상이면 OPEN_SEC 동안 즉시 fallback)
+        self.GEMINI_BREAKER_ENABLED: bool = os.getenv("GEMINI_BREAKER_ENABLED", "true").lower() == "true"
+        self.GEMINI_BREAKER_WINDOW: int = int(os.getenv("GEMINI_BREAKER_WINDOW", "20"))
+        self.GEMINI_BREAKER_MIN_CALLS: int = int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "5"))
+        self.GEMINI_BREAKER_FAILURE_RATIO: float = float(os.getenv("GEMINI_BREAKER_FAILURE_RATIO", "0.5"))
+        self.GEMINI_BREAKER_SLOW_CALL_SEC: float = float(os.getenv("GEMINI_BREAKER_SLOW_CALL_SEC", "45"))
+        self.GEMINI_BREAKER_SLOW_CALL_RATIO: float = float(os.getenv("GEMINI_BREAKER_SLOW_CALL_RATIO", "0.8"))
+        self.GEMINI_BREAKER_OPEN_SEC: float = float(os.getenv("GEMINI_BREAKER_OPEN_SEC", "30"))
+        self.GEMINI_BREAKER_HALF_OPEN_PROBES: int = int(os.getenv("GEMINI_BREAKER_HALF_OPEN_PROBES", "1"))
+
+        # 배치 플랜 (/ai/cheongyak-plan/batch)
+        self.PLAN_BATCH_CONCURRENCY: int = int(os.getenv("PLAN_BATCH_CONCURRENCY", "8"))
+        self.PLAN_BATCH_MAX_CONCURRENCY: int = int(os.getenv("PLAN_BATCH_MAX_CONCURRENCY", "64"))
+        self.PLAN_BATCH_MAX_ITEMS: int = int(os.getenv("PLAN_BATCH_MAX_ITEMS", "5000"))
+
+        # 비동기 플랜 작업 (/ai/cheongyak-plan/jobs). 상태/결과는 워커 간 공유 SQLite 에 저장
+        self.PLAN_JOB_DB_PATH: str = os.getenv("PLAN_JOB_DB_PATH", os.path.join(self.DATA_DIR, "plan_jobs.sqlite3"))
+        self.PLAN_JOB_WORKERS: int = int(os.getenv("PLAN_JOB_WORKERS", "4"))
+        self.PLAN_JOB_MAX_QUEUED: int = int(os.getenv("PLAN_JOB_MAX_QUEUED", "500"))
+        # HTTP 연결에 묶이지 않으므로 동기 요청(PLAN_DEADLINE_SEC)보다 긴 예산을 준다
+        self.PLAN_JOB_DEADLINE_SEC: float = float(os.getenv("PLAN_JOB_DEADLINE_SEC", "180"))
+        self.PLAN_JOB_TTL_SEC: int = int(os.getenv("PLAN_JOB_TTL_SEC", "86400"))
+        self.PLAN_JOB_LONG_POLL_MAX_SEC: float = float(os.getenv("PLAN_JOB_LONG_POLL_MAX_SEC", "30"))
+        # 워커 생존 신호 주기. 3 회 넘게 끊긴 워커의 미완료 작업은 다른 워커가 가져간다
+        self.PLAN_JOB_HEARTBEAT_SEC: float = float(os.getenv("PLAN_JOB_HEARTBEAT_SEC", "10"))
+
+        # surveyId 별 LLM 플랜 버전 (로컬 전용 필드만 바뀐 재제출은 LLM 을 다시 부르지 않는다). 빈 문자열이면 끈다
+        self.SURVEY_PLAN_DB_PATH: str = os.getenv(
+            "SURVEY_PLAN_DB_PATH", os.path.join(self.DATA_DIR, "survey_plans.sqlite3")
+        )
+        self.SURVEY_PLAN_MAX_VERSIONS: int = int(os.getenv("SURVEY_PLAN_MAX_VERSIONS", "5"))
+
+        # 요청/응답 기록 저장 (sqlite | jsonl | console). 백그라운드 스레드가 모아서 한 번에 커밋
+        self.RECORD_STORE_BACKEND: str = os.getenv("RECORD_STORE_BACKEND", "sqlite")
+        self.RECORD_STORE_PATH: str = os.getenv(
+            "RECORD_STORE_PATH", os.path.join(self.DATA_DIR, "life_cycle_records.sqlite3")
+        )
+        self.RECORD_QUEUE_MAX: int = int(os.getenv("RECORD_QUEUE_MAX", "10000"))
+        self.RECORD_BATCH_SIZE: int = int(os.getenv("RECORD_BATCH_SIZE", "200"))
+        self.RECORD_FLUSH_INTERVAL_SEC: float = float(os.getenv("RECORD_FLUSH_INTERVAL_SEC", "0.5"))
+
+        # 플랜 캐시 (메모리 LRU + 공유 SQLite)
+        self.PLAN_CACHE_MAX_ENTRIES: int = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "512"))
+        self.PLAN_CACHE_TTL_SEC: int = int(os.getenv("PLAN_CACHE_TTL_SEC", "86400"))
+        self.PLAN_CACHE_MAX_DISK_ENTRIES: int = int(os.getenv("PLAN_CACHE_MAX_DISK_ENTRIES", "10000"))
+        # 디스크 캐시 만료/초과분 정리 주기 (워커당 쓰기 N 번마다)
+        self.PLAN_CACHE_PRUNE_EVERY: int = int(os.getenv("PLAN_CACHE_PRUNE_EVERY", "100"))
+        # 빈 문자열이면 디스크 2단 캐시를 끈다
+        self.PLAN_CACHE_DB_PATH: str = os.getenv(
+            "PLAN_CACHE_DB_PATH", os.path.join(self.DATA_DIR, "plan_cache.sqlite3")
+        )
+
+        # 설문 복잡도 기반 모델 라우팅: 점수가 LIGHT_MAX_SCORE 이하면 LIGHT_MODEL, 아니면 GEMINI_MODEL
+        # 점수 가중치/임계값이 실제 설문 분포로 검증되기 전까지는 기본으로 꺼 둔다 (MODEL_ROUTER_ENABLED=true 로 켠다)
+        self.MODEL_ROUTER_ENABLED: bool = os.getenv("MODEL_ROUTER_ENABLED", "false").lower() == "true"
+        self.MODEL_ROUTER_LIGHT_MODEL: str = os.getenv("MODEL_ROUTER_LIGHT_MODEL", "gemini-2.5-flash")
+        self.MODEL_ROUTER_LIGHT_TIMEOUT_SEC: float = float(os.getenv("MODEL_ROUTER_LIGHT_TIMEOUT_SEC", "20"))
+        self.MODEL_ROUTER_LIGHT_MAX_SCORE: float = float(os.getenv("MODEL_ROUTER_LIGHT_MAX_SCORE", "2"))
+        # 특성별 가중치 덮어쓰기 (JSON 객체, 예: {"debt": 3, "missingField": 0.5})
+        self.MODEL_ROUTER_WEIGHTS: str = os.getenv("MODEL_ROUTER_WEIGHTS", "")
+
+        # what-if 시나리오 비교: 기준 포함 최대 시나리오 수 (LLM 호출은 시나리오 수와 상관없이 한 번)
+        self.PLAN_SCENARIO_MAX: int = int(os.getenv("PLAN_SCENARIO_MAX", "24"))
+
+        # 동기 플랜 요청 입장 제어 (워커 단위). LLM 이 필요한 요청만 대상이며 캐시/버전 적중은 바로 처리한다
+        self.PLAN_ADMISSION_ENABLED: bool = os.getenv("PLAN_ADMISSION_ENABLED", "true").lower() == "true"
+        self.PLAN_ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("PLAN_ADMISSION_MAX_IN_FLIGHT", "32"))
+        self.PLAN_ADMISSION_MAX_QUEUE: int = int(os.getenv("PLAN_ADMISSION_MAX_QUEUE", "64"))
+        # 예상 처리 시간 = 최근 Gemini 지연의 이 백분위 (표본이 MIN_SAMPLES 미만이면 DEFAULT_SERVICE_SEC)
+        self.PLAN_ADMISSION_LATENCY_PERCENTILE: float = float(os.getenv("PLAN_ADMISSION_LATENCY_PERCENTILE", "75"))
+        self.PLAN_ADMISSION_MIN_SAMPLES: int = int(os.getenv("PLAN_ADMISSION_MIN_SAMPLES", "20"))
+        self.PLAN_ADMISSION_DEFAULT_SERVICE_SEC: float = float(
+            os.getenv("PLAN_ADMISSION_DEFAULT_SERVICE_SEC", "10")
+        )
+        # 거절된 요청 처리: fallback (임시 플랜 200) | reject (503 + Retry-After)
+        self.PLAN_SHED_POLICY: str = os.getenv("PLAN_SHED_POLICY", "fallback")
+
+        # 요청 단위 CPU 프로파일 (X-Profile-Token 헤더 또는 샘플링). 토큰이 비어 있으면 헤더/관리 API 를 끈다
+        self.PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN", "")
+        self.PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.PROFILE_DIR: str = os.getenv("PROFILE_DIR", os.path.join(self.DATA_DIR, "profiles"))
+        self.PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+    def gemini_model_url(self, model: str, method: str) -> str:
+        return f"{self.GEMINI_API_BASE}/models/{model}:{method}"
+
 settings = Settings()
@@ -1,9 +1,71 @@
-import requests
-
-def post_json(url: str, payload: dict, timeout_sec: int) -> requests.Response:
-    return requests.post(
-        url,
-        json=payload,
-        timeout=timeout_sec,
-        headers={"Content-Type": "application/json"},
-    )
\ No newline at end of file
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+import httpx
+
+from app.core.config import settings
+
+# 워커 프로세스당 엔드포인트(origin)별 커넥션 풀을 공유한다 (keep-alive 로 TLS 핸드셰이크 재사용)
+# 엔드포인트마다 풀을 나눠 한 곳이 느려져도 다른 엔드포인트의 커넥션 한도를 잠식하지 않게 한다
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _origin(url: str) -> str:
+    parsed = httpx.URL(url)
+    return f"{parsed.scheme}://{parsed.host}:{parsed.port or ''}"
+
+
+def get_async_client(url: str = "") -> httpx.AsyncClient:
+    origin = _origin(url) if url else ""
+    client = _async_clients.get(origin)
+    if client is None or client.is_closed:
+        client = _async_clients[origin] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+            ),
+            timeout=httpx.Timeout(
+                settings.GEMINI_TIMEOUT_SEC,
+                connect=settings.HTTP_CONNECT_TIMEOUT_SEC,
+                pool=settings.HTTP_POOL_TIMEOUT_SEC,
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+    return client
+
+
+async def close_async_client() -> None:
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+async def warm_up(urls: List[str], timeout_sec: float) -> int:
+    """
+    엔드포인트마다 가벼운 GET 을 한 번 보내 커넥션(TLS 포함)을 미리 열어 둔다.
+    응답 상태와 상관없이 연결만 되면 성공으로 센다. 실패는 무시한다 (첫 호출에서 다시 연결).
+    """
+    async def one(url: str) -> bool:
+        try:
+            await get_async_client(url).get(url, timeout=timeout_sec)
+            return True
+        except httpx.HTTPError:
+            return False
+
+    results = await asyncio.gather(*(one(url) for url in urls))
+    return sum(results)
+
+
+async def post_json(url: str, payload: dict, timeout_sec: float) -> httpx.Response:
+    client = get_async_client(url)
+    return await client.post(url, json=payload, timeout=timeout_sec)
+
+
+@asynccontextmanager
+async def stream_post_json(url: str, payload: dict, timeout_sec: float) -> AsyncIterator[httpx.Response]:
+    client = get_async_client(url)
+    async with client.stream("POST", url, json=payload, timeout=timeout_sec) as resp:
+        yield resp
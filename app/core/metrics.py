@@ -0,0 +1,253 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 초 단위 기본 버킷: CPU 단계(수백 µs)부터 Gemini 호출(수십 초)까지
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self, worker: str) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        # scrape 는 스레드풀에서 돌 수 있으므로 복사본을 순회한다
+        for key, value in sorted(self._values.copy().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key, worker)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합 → [버킷별 개수..., +Inf 개수, 합계]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, worker: str) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.copy().items()):
+            series = list(series)
+            cumulative = 0
+            for upper, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_number(upper)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, worker + ',' + le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key, worker)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key, worker)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    # 값은 scrape 시점에 collect() 로 읽는다 (큐 길이, 회로 상태 등 이미 다른 객체가 가진 값)
+    # blocking=True: collect 가 SQLite 를 읽으므로 render_async 에서 스레드로 뺀다
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[LabelValues, float]],
+        blocking: bool = False,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.blocking = blocking
+
+    def read(self) -> Dict[LabelValues, float]:
+        try:
+            return self.collect()
+        except Exception:
+            return {}
+
+    def render(self, worker: str, values: Optional[Dict[LabelValues, float]] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        if values is None:
+            values = self.read()
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key, worker)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Prometheus 텍스트 형식 지표 (워커 프로세스 단위)
+    - gunicorn 워커마다 따로 집계하므로 모든 시계열에 worker(pid) 라벨을 붙인다 → PromQL 에서 sum by 로 합산
+    - 이벤트 루프 스레드에서만 갱신하므로 잠금 없이 dict 만 갱신한다 (hot path 비용 최소화)
+    """
+
+    def __init__(self):
+        self._metrics: List[object] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[LabelValues, float]],
+        blocking: bool = False,
+    ) -> Gauge:
+        metric = Gauge(name, documentation, labelnames, collect, blocking)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        worker = f'worker="{os.getpid()}"'
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render(worker))
+        return "\n".join(lines) + "\n"
+
+    async def render_async(self) -> str:
+        """
+        /metrics 용. 이벤트 루프가 갱신하는 값(deque, dict 등)은 루프 스레드에서 읽어 갱신과 겹치지 않게 하고,
+        SQLite 를 읽는 blocking gauge 만 먼저 스레드에서 모아 둔다.
+        """
+        blocking = [metric for metric in self._metrics if isinstance(metric, Gauge) and metric.blocking]
+        collected = await asyncio.to_thread(lambda: [metric.read() for metric in blocking])
+        values = dict(zip(map(id, blocking), collected))
+        worker = f'worker="{os.getpid()}"'
+        lines: List[str] = []
+        for metric in self._metrics:
+            if id(metric) in values:
+                lines.extend(metric.render(worker, values[id(metric)]))
+            else:
+                lines.extend(metric.render(worker))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PLAN_REQUESTS = REGISTRY.counter(
+    "plan_requests_total", "Plan API responses by endpoint and HTTP status", ("endpoint", "status")
+)
+PLAN_REQUEST_SECONDS = REGISTRY.histogram(
+    "plan_request_seconds", "Plan API request latency", ("endpoint",)
+)
+PLAN_OUTCOMES = REGISTRY.counter(
+    "plan_outcomes_total", "Where a served plan came from (llm, cache, version, fallback)", ("outcome",)
+)
+PLAN_SHED = REGISTRY.counter(
+    "plan_shed_total", "Plan requests shed by admission control (reason, fallback or reject)", ("reason", "action")
+)
+PLAN_MODEL_ROUTES = REGISTRY.counter(
+    "plan_model_routes_total", "LLM plan generations by routed model and complexity tier", ("model", "tier")
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "plan_stage_seconds", "Time spent in each plan pipeline stage", ("stage",)
+)
+GEMINI_ATTEMPTS = REGISTRY.counter(
+    "gemini_attempts_total",
+    "Gemini HTTP attempts by result (status code, timeout, network_error, circuit_open, limiter_timeout, keys_exhausted)",
+    ("model", "method", "result"),
+)
+GEMINI_ATTEMPT_SECONDS = REGISTRY.histogram(
+    "gemini_attempt_seconds", "Gemini round trip per attempt (after acquiring a limiter slot)", ("model", "method")
+)
+GEMINI_RETRIES = REGISTRY.counter(
+    "gemini_retries_total", "Gemini attempts beyond the first", ("model", "method")
+)
+GEMINI_TOKENS = REGISTRY.counter(
+    "gemini_tokens_total", "Gemini usageMetadata token counts", ("model", "kind")
+)
+GEMINI_KEY_EVENTS = REGISTRY.counter(
+    "gemini_key_events_total", "Gemini API key pool events (acquired, quarantined)", ("key", "event")
+)
+RECORDS_LOST = REGISTRY.counter(
+    "records_lost_total", "Request/response records that were not persisted (queue_full, write_error)", ("reason",)
+)
+
+_USAGE_KINDS = {
+    "promptTokenCount": "prompt",
+    "candidatesTokenCount": "candidates",
+    "cachedContentTokenCount": "cached",
+    "thoughtsTokenCount": "thoughts",
+    "totalTokenCount": "total",
+}
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    # 예외로 끝난 단계도 걸린 시간은 기록한다
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def record_usage(model: str, usage: Dict[str, int]) -> None:
+    for key, kind in _USAGE_KINDS.items():
+        count = usage.get(key)
+        if count:
+            GEMINI_TOKENS.inc(count, model=model, kind=kind)
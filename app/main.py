@@ -1,6 +1,32 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routes.life_cycle import router as life_cycle_router
+from app.core.config import settings
+from app.core.http_client import close_async_client, warm_up
+from app.routes.life_cycle import gemini_service, plan_jobs, repo, router as life_cycle_router
+from app.routes.metrics import router as metrics_router
+
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    repo.start()
+    await plan_jobs.start()
+    if settings.GEMINI_WARM_UP:
+        # 엔드포인트별 커넥션을 미리 열어 첫 요청이 TLS 핸드셰이크를 기다리지 않게 한다
+        await warm_up(gemini_service.warm_up_urls(), settings.HTTP_CONNECT_TIMEOUT_SEC)
+    yield
+    await plan_jobs.stop()
+    # 남은 요청/응답 기록을 모두 쓴 뒤 종료
+    await asyncio.to_thread(repo.close)
+    # 워커 종료 시 keep-alive 커넥션 정리
+    await close_async_client()
+
 
-app = FastAPI(title="Life Cycle API")
+app = FastAPI(title="Life Cycle API", lifespan=lifespan)
 
-app.include_router(life_cycle_router)
\ No newline at end of file
+app.include_router(life_cycle_router)
+app.include_router(metrics_router)
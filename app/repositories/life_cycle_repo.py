@@ -1,24 +1,286 @@
-from typing import Any, Dict, Optional
-from datetime import datetime
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from app.core.metrics import RECORDS_LOST
+
+logger = logging.getLogger(__name__)
+
+# (ts, task, surveyId, question, user_data, result)
+Record = Tuple[float, str, Optional[int], Optional[str], Dict[str, Any], Union[str, BaseModel]]
+Row = Tuple[str, str, Optional[int], Optional[str], str, str]
+
+_STOP = object()
+
+
+class SqliteRecordStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = None
+        # 경로/권한 문제는 첫 쓰기가 아니라 시작 시점에 드러나게 한다
+        self._open()
+        self.close()
+
+    def _open(self) -> sqlite3.Connection:
+        # 쓰기 스레드 하나만 사용한다. close() 뒤에 다시 쓰면 새로 연다
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS life_cycle_records ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " ts TEXT NOT NULL,"
+                " task TEXT NOT NULL,"
+                " survey_id INTEGER,"
+                " question TEXT,"
+                " user_data_json TEXT NOT NULL,"
+                " result_json TEXT NOT NULL"
+                ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_life_cycle_records_survey ON life_cycle_records (survey_id)")
+            self._conn = conn
+        return self._conn
+
+    def write_batch(self, rows: List[Row]) -> None:
+        # 배치 전체를 한 트랜잭션으로 커밋 (group commit)
+        conn = self._open()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO life_cycle_records (ts, task, survey_id, question, user_data_json, result_json)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class JsonlRecordStore:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = None
+
+    def write_batch(self, rows: List[Row]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        lines = []
+        for ts, task, survey_id, question, user_data_json, result_json in rows:
+            lines.append(
+                f'{{"ts": {json.dumps(ts)}, "task": {json.dumps(task)}, "surveyId": {json.dumps(survey_id)}, '
+                f'"question": {json.dumps(question, ensure_ascii=False)}, '
+                f'"userData": {user_data_json}, "result": {result_json}}}\n'
+            )
+        self._file.write("".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ConsoleRecordStore:
+    # 로컬 개발용: 예전처럼 미리보기만 출력
+    def write_batch(self, rows: List[Row]) -> None:
+        for ts, task, _, question, user_data_json, result_json in rows:
+            print("[LifeCycleRecord]", {
+                "ts": ts,
+                "task": task,
+                "question": question,
+                "user_data_keys": list(json.loads(user_data_json).keys()),
+                "result_preview": result_json[:120],
+            })
+
+    def close(self) -> None:
+        pass
+
+
+def build_record_store(backend: str, path: str):
+    if backend == "sqlite":
+        return SqliteRecordStore(path)
+    if backend == "jsonl":
+        return JsonlRecordStore(path)
+    if backend == "console":
+        return ConsoleRecordStore()
+    raise ValueError(f"Unknown record store backend: {backend}")
+
 
 class LifeCycleRepo:
     """
-    지금은 DB 없음 → 나중에 Mongo/MySQL/Redis 등으로 교체 가능
-    현재는 요청/응답을 저장할 '자리'만 제공
+    요청/응답 기록 저장소
+    - save_record 는 요청 경로에서 메모리 큐에 넣기만 한다 (직렬화/디스크 I/O 없음)
+    - 백그라운드 스레드가 batch_size 건 또는 flush_interval_sec 마다 모아서 한 번에 커밋한다
+    - 큐는 max_queue 건으로 제한한다. save_record 는 이벤트 루프에서 불리므로 가득 차도 기다리지 않고 기록을 버린다.
+      버린 기록은 dropped 와 records_lost_total{reason="queue_full"} 로 집계하고, 버리기 시작할 때 오류 로그를 남긴다
+    - close() 는 남은 기록을 모두 쓰고 종료한다
     """
+
+    def __init__(
+        self,
+        store=None,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval_sec: float = 0.5,
+    ):
+        self.store = store if store is not None else ConsoleRecordStore()
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "enqueued": 0,
+            "dropped": 0,
+            "written": 0,
+            "batches": 0,
+            "write_errors": 0,
+        }
+        self._flush_ms = {"last": 0.0, "max": 0.0, "total": 0.0}
+        self._last_batch_size = 0
+        # 큐가 가득 차서 버리는 중인지 (버리기 시작할 때 한 번만 로그를 남긴다)
+        self._dropping = False
+        self._thread: Optional[threading.Thread] = None
+        self.start()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="life-cycle-repo-writer", daemon=True)
+        self._thread.start()
+
+    def _incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
     def save_record(
         self,
         task: str,
         user_data: Dict[str, Any],
         question: Optional[str],
-        result: str
+        result: Union[str, BaseModel],
     ) -> None:
-        # TODO: DB 저장 구현
-        # 지금은 그냥 콘솔 로그 정도만
-        print("[LifeCycleRecord]", {
-            "ts": datetime.utcnow().isoformat(),
-            "task": task,
-            "question": question,
-            "user_data_keys": list(user_data.keys()),
-            "result_preview": result[:120]
-        })
\ No newline at end of file
+        # result 는 문자열 또는 pydantic 모델 (모델은 쓰기 스레드에서 직렬화)
+        record: Record = (time.time(), task, user_data.get("surveyId"), question, user_data, result)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._incr("dropped")
+            RECORDS_LOST.inc(reason="queue_full")
+            if not self._dropping:
+                self._dropping = True
+                logger.error(
+                    "[LifeCycleRepo] record queue full (%d), dropping records until the writer catches up",
+                    self.max_queue,
+                )
+            return
+        if self._dropping:
+            self._dropping = False
+            logger.warning("[LifeCycleRepo] record queue drained, dropped so far: %d", self.stats()["dropped"])
+        self._incr("enqueued")
+
+    # ---------- 쓰기 스레드 ----------
+    @staticmethod
+    def _to_row(record: Record) -> Row:
+        ts, task, survey_id, question, user_data, result = record
+        result_json = result.model_dump_json() if isinstance(result, BaseModel) else result
+        return (
+            datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+            task,
+            survey_id,
+            question,
+            json.dumps(user_data, ensure_ascii=False),
+            result_json,
+        )
+
+    def _flush(self, batch: List[Record]) -> None:
+        started = time.perf_counter()
+        try:
+            self.store.write_batch([self._to_row(record) for record in batch])
+        except Exception as e:
+            self._incr("write_errors")
+            RECORDS_LOST.inc(len(batch), reason="write_error")
+            logger.error("[LifeCycleRepo] write failed (%d records): %r", len(batch), e)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._counters["written"] += len(batch)
+            self._counters["batches"] += 1
+            self._flush_ms["last"] = elapsed_ms
+            self._flush_ms["max"] = max(self._flush_ms["max"], elapsed_ms)
+            self._flush_ms["total"] += elapsed_ms
+            self._last_batch_size = len(batch)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            # 첫 기록 이후 flush_interval_sec 동안 더 모은다 (종료 신호가 오면 바로 쓴다)
+            flush_at = time.monotonic() + self.flush_interval_sec
+            while len(batch) < self.batch_size:
+                remaining = flush_at - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+        # 종료: 큐에 남은 기록까지 모두 쓴다
+        rest: List[Record] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        for start in range(0, len(rest), self.batch_size):
+            self._flush(rest[start:start + self.batch_size])
+
+    def close(self, timeout_sec: float = 10.0) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            return
+        # 큐가 가득 차 있어도 종료 신호는 반드시 넣는다
+        self._queue.put(_STOP)
+        self._thread.join(timeout_sec)
+        if not self._thread.is_alive():
+            self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            batches = self._counters["batches"]
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue": self.max_queue,
+                "last_batch_size": self._last_batch_size,
+                "last_flush_ms": round(self._flush_ms["last"], 3),
+                "max_flush_ms": round(self._flush_ms["max"], 3),
+                "avg_flush_ms": round(self._flush_ms["total"] / batches, 3) if batches else 0.0,
+                **self._counters,
+            }
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.life_cycle import LifeCycleSurveyRequest
-from app.schemas.life_cycle_response import LifeCyclePlanResponse
+import json
+import math
+import os
+import time
+from contextlib import aclosing
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from app.schemas.life_cycle import LifeCycleBatchRequest, LifeCycleScenarioRequest, LifeCycleSurveyRequest
+from app.schemas.life_cycle_response import LifeCyclePlanResponse, LifeCycleScenarioResponse
+from app.services.admission import AdmissionController, AdmissionRejected
 from app.services.life_cycle_service import LifeCycleService
 from app.services.gemini_service import (
     GeminiService,
@@ -8,41 +16,463 @@ from app.services.gemini_service import (
     GeminiServiceTimeout,
     GeminiServiceUnavailable,
 )
-from app.repositories.life_cycle_repo import LifeCycleRepo
+from app.services.key_pool import GeminiKeyPool, parse_keys
+from app.services.knowledge_base import KnowledgeBase
+from app.services.model_router import ModelRouter, parse_weights
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.plan_cache import PlanCache
+from app.services.plan_jobs import JobQueueFull, PlanJobQueue
+from app.services.rate_limiter import AdaptiveRateLimiter
+from app.services.request_profiler import RequestProfiler
+from app.services.scenarios import scenario_count
+from app.services.survey_plans import SurveyPlanStore
+from app.repositories.life_cycle_repo import LifeCycleRepo, build_record_store
+from app.core.config import settings
+from app.core.metrics import PLAN_REQUEST_SECONDS, PLAN_REQUESTS, REGISTRY
+
+gemini_keys = parse_keys(settings.GEMINI_API_KEYS, settings.GEMINI_API_KEY, settings.GEMINI_API_BASE)
+# 키가 하나이고 쿼터도 없으면 풀 없이 GEMINI_API_KEY 로 바로 호출한다
+key_pool = (
+    GeminiKeyPool(
+        db_path=settings.GEMINI_KEY_POOL_DB_PATH,
+        keys=gemini_keys,
+        rpm=settings.GEMINI_KEY_RPM,
+        tpm=settings.GEMINI_KEY_TPM,
+        quarantine_sec=settings.GEMINI_KEY_QUARANTINE_SEC,
+        max_quarantine_sec=settings.GEMINI_KEY_MAX_QUARANTINE_SEC,
+        lease_sec=settings.GEMINI_TIMEOUT_SEC + 30,
+        max_wait_sec=settings.GEMINI_KEY_MAX_WAIT_SEC,
+    )
+    if settings.GEMINI_KEY_POOL_DB_PATH
+    and (len(gemini_keys) > 1 or settings.GEMINI_KEY_RPM > 0 or settings.GEMINI_KEY_TPM > 0)
+    else None
+)
+# 리미터 window/RPS 는 키 하나 기준 값이므로 키 개수만큼 늘린다 (키별 한도는 풀이 따로 지킨다)
+key_count = max(len(gemini_keys), 1)
+rate_limiter = (
+    AdaptiveRateLimiter(
+        db_path=settings.GEMINI_LIMITER_DB_PATH,
+        initial_window=settings.GEMINI_LIMITER_INITIAL_WINDOW * key_count,
+        min_window=settings.GEMINI_LIMITER_MIN_WINDOW,
+        max_window=settings.GEMINI_LIMITER_MAX_WINDOW * key_count,
+        rate_per_sec=settings.GEMINI_RATE_LIMIT_RPS * key_count,
+        burst=settings.GEMINI_RATE_LIMIT_BURST * key_count,
+        lease_sec=settings.GEMINI_TIMEOUT_SEC + 30,
+        max_wait_sec=settings.GEMINI_LIMITER_MAX_WAIT_SEC,
+    )
+    if settings.GEMINI_LIMITER_DB_PATH
+    else None
+)
+circuit_breaker = (
+    CircuitBreaker(
+        window=settings.GEMINI_BREAKER_WINDOW,
+        min_calls=settings.GEMINI_BREAKER_MIN_CALLS,
+        failure_ratio=settings.GEMINI_BREAKER_FAILURE_RATIO,
+        slow_call_sec=settings.GEMINI_BREAKER_SLOW_CALL_SEC,
+        slow_call_ratio=settings.GEMINI_BREAKER_SLOW_CALL_RATIO,
+        open_sec=settings.GEMINI_BREAKER_OPEN_SEC,
+        half_open_probes=settings.GEMINI_BREAKER_HALF_OPEN_PROBES,
+    )
+    if settings.GEMINI_BREAKER_ENABLED
+    else None
+)
+gemini_service = GeminiService(limiter=rate_limiter, breaker=circuit_breaker, key_pool=key_pool)
+repo = LifeCycleRepo(
+    store=build_record_store(settings.RECORD_STORE_BACKEND, settings.RECORD_STORE_PATH),
+    max_queue=settings.RECORD_QUEUE_MAX,
+    batch_size=settings.RECORD_BATCH_SIZE,
+    flush_interval_sec=settings.RECORD_FLUSH_INTERVAL_SEC,
+)
+plan_cache = PlanCache(
+    max_entries=settings.PLAN_CACHE_MAX_ENTRIES,
+    ttl_sec=settings.PLAN_CACHE_TTL_SEC,
+    db_path=settings.PLAN_CACHE_DB_PATH or None,
+    max_disk_entries=settings.PLAN_CACHE_MAX_DISK_ENTRIES,
+    prune_every=settings.PLAN_CACHE_PRUNE_EVERY,
+)
+knowledge = KnowledgeBase.from_file(settings.KNOWLEDGE_PATH)
+survey_plans = (
+    SurveyPlanStore(db_path=settings.SURVEY_PLAN_DB_PATH, max_versions=settings.SURVEY_PLAN_MAX_VERSIONS)
+    if settings.SURVEY_PLAN_DB_PATH
+    else None
+)
+model_router = (
+    ModelRouter(
+        default_model=settings.GEMINI_MODEL,
+        default_timeout_sec=settings.GEMINI_TIMEOUT_SEC,
+        light_model=settings.MODEL_ROUTER_LIGHT_MODEL,
+        light_timeout_sec=settings.MODEL_ROUTER_LIGHT_TIMEOUT_SEC,
+        light_max_score=settings.MODEL_ROUTER_LIGHT_MAX_SCORE,
+        weights=parse_weights(settings.MODEL_ROUTER_WEIGHTS),
+    )
+    if settings.MODEL_ROUTER_ENABLED
+    else None
+)
+life_cycle_service = LifeCycleService(
+    gemini=gemini_service,
+    repo=repo,
+    cache=plan_cache,
+    knowledge=knowledge,
+    survey_plans=survey_plans,
+    router=model_router,
+)
 
-gemini_service = GeminiService()
-repo = LifeCycleRepo()
-life_cycle_service = LifeCycleService(gemini=gemini_service, repo=repo)
+
+def _service_estimate(model: Optional[str]) -> float:
+    # 라우터가 고른 모델(Flash/Pro)의 관측 지연으로 추정한다
+    observed = gemini_service.latency_percentile(
+        model or settings.GEMINI_MODEL,
+        settings.PLAN_ADMISSION_LATENCY_PERCENTILE,
+        settings.PLAN_ADMISSION_MIN_SAMPLES,
+    )
+    return observed if observed is not None else settings.PLAN_ADMISSION_DEFAULT_SERVICE_SEC
+
+
+admission = (
+    AdmissionController(
+        max_in_flight=settings.PLAN_ADMISSION_MAX_IN_FLIGHT,
+        max_queue=settings.PLAN_ADMISSION_MAX_QUEUE,
+        service_estimate=_service_estimate,
+        policy=settings.PLAN_SHED_POLICY,
+    )
+    if settings.PLAN_ADMISSION_ENABLED
+    else None
+)
+request_profiler = RequestProfiler(
+    directory=settings.PROFILE_DIR,
+    max_files=settings.PROFILE_MAX_FILES,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    token=settings.PROFILE_TOKEN,
+)
 
 router = APIRouter(prefix="/ai", tags=["life-cycle"])
 
 
+def _observe_request(endpoint: str, status: int, started: float) -> None:
+    PLAN_REQUESTS.inc(endpoint=endpoint, status=str(status))
+    PLAN_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+
+
+def _deadline(request_timeout: Optional[float]) -> float:
+    # X-Request-Timeout(초) 이 없으면 기본 예산, 있어도 PLAN_DEADLINE_MAX_SEC 를 넘지 않는다
+    budget = settings.PLAN_DEADLINE_SEC if request_timeout is None else request_timeout
+    return time.monotonic() + min(max(budget, 0.0), settings.PLAN_DEADLINE_MAX_SEC)
+
+
+async def _generate_plan(
+    user_data: dict, deadline: float, profile_token: Optional[str], response: Response
+) -> LifeCyclePlanResponse:
+    with request_profiler.track():
+        if not request_profiler.should_profile(profile_token):
+            return await life_cycle_service.generate_plan(user_data=user_data, deadline=deadline, admission=admission)
+        # 업스트림 대기는 CPU 타이머에 잡히지 않으므로 로컬 경로(사실 계산/파싱/렌더링)만 남는다
+        async with request_profiler.profile("plan", {"surveyId": user_data.get("surveyId")}) as profile_id:
+            if profile_id is not None:
+                response.headers["X-Profile-Id"] = profile_id
+            return await life_cycle_service.generate_plan(user_data=user_data, deadline=deadline, admission=admission)
+
+
 @router.post("/cheongyak-plan", response_model=LifeCyclePlanResponse)
-def generate_life_cycle_plan(req: LifeCycleSurveyRequest):
+async def generate_life_cycle_plan(
+    req: LifeCycleSurveyRequest,
+    response: Response,
+    x_request_timeout: Optional[float] = Header(default=None),
+    x_profile_token: Optional[str] = Header(default=None),
+):
+    started = time.perf_counter()
+    status = 200
     try:
         # ✅ Pydantic v2
-        return life_cycle_service.generate_plan(user_data=req.model_dump())
+        return await _generate_plan(req.model_dump(), _deadline(x_request_timeout), x_profile_token, response)
+
+    # ✅ 입장 제어 거절 (PLAN_SHED_POLICY=reject) → 503 + Retry-After
+    except AdmissionRejected as e:
+        status = 503
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
 
     # ✅ Gemini 타임아웃 → 504
     except GeminiServiceTimeout as e:
+        status = 504
         raise HTTPException(status_code=504, detail=str(e))
 
     # ✅ Gemini 과부하/일시 장애(503/429) → 503
     except GeminiServiceUnavailable as e:
+        status = 503
         raise HTTPException(status_code=503, detail=str(e))
 
     # ✅ Gemini 기타 업스트림 오류 → 502
     except GeminiServiceError as e:
+        status = 502
         raise HTTPException(status_code=502, detail=str(e))
 
     # ✅ LLM 결과(JSON 깨짐/스키마 불일치) → 502
     except ValueError as e:
+        status = 502
         raise HTTPException(status_code=502, detail=str(e))
 
     # ✅ 진짜 우리 서버 버그만 500
     except Exception:
+        status = 500
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    finally:
+        _observe_request("plan", status, started)
+
+
+@router.post("/cheongyak-plan/scenarios", response_model=LifeCycleScenarioResponse)
+async def compare_life_cycle_scenarios(
+    req: LifeCycleScenarioRequest,
+    x_request_timeout: Optional[float] = Header(default=None),
+):
+    count = scenario_count(req.grid)
+    if count < 2:
+        raise HTTPException(status_code=422, detail="grid must set at least one field to compare")
+    if count > settings.PLAN_SCENARIO_MAX:
+        raise HTTPException(
+            status_code=413, detail=f"Too many scenarios: {count} > {settings.PLAN_SCENARIO_MAX}"
+        )
+
+    started = time.perf_counter()
+    status = 200
+    try:
+        # LLM 실패는 서비스에서 계산값 기반 설명으로 대체되므로 여기까지 오는 건 입장 거절/서버 오류뿐이다
+        return await life_cycle_service.compare_scenarios(
+            req.base.model_dump(), req.grid, deadline=_deadline(x_request_timeout), admission=admission
+        )
+
+    except AdmissionRejected as e:
+        status = 503
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+    except Exception:
+        status = 500
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    finally:
+        _observe_request("scenarios", status, started)
+
+
+def _error_status(exc: Exception) -> int:
+    # generate_life_cycle_plan 의 예외 → HTTP 상태 매핑과 동일
+    if isinstance(exc, GeminiServiceTimeout):
+        return 504
+    if isinstance(exc, (GeminiServiceUnavailable, AdmissionRejected)):
+        return 503
+    if isinstance(exc, (GeminiServiceError, ValueError)):
+        return 502
+    return 500
+
+
+def _error_payload(exc: Exception) -> dict:
+    status = _error_status(exc)
+    return {"status": status, "detail": str(exc) if status != 500 else "Internal Server Error"}
+
+
+async def _run_plan_job(user_data: dict) -> LifeCyclePlanResponse:
+    return await life_cycle_service.generate_plan(
+        user_data=user_data, deadline=time.monotonic() + settings.PLAN_JOB_DEADLINE_SEC
+    )
+
+
+plan_jobs = PlanJobQueue(
+    db_path=settings.PLAN_JOB_DB_PATH,
+    run=_run_plan_job,
+    describe_error=_error_payload,
+    workers=settings.PLAN_JOB_WORKERS,
+    max_queued=settings.PLAN_JOB_MAX_QUEUED,
+    ttl_sec=settings.PLAN_JOB_TTL_SEC,
+    heartbeat_sec=settings.PLAN_JOB_HEARTBEAT_SEC,
+)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/cheongyak-plan/stream")
+async def stream_life_cycle_plan(
+    req: LifeCycleSurveyRequest,
+    x_request_timeout: Optional[float] = Header(default=None),
+):
+    deadline = _deadline(x_request_timeout)
+    started = time.perf_counter()
+
+    async def event_stream():
+        # 스트림은 항상 200 으로 열리므로 error 이벤트의 상태 코드로 집계한다 (done 까지 걸린 시간)
+        status = 200
+        try:
+            events = life_cycle_service.stream_plan(user_data=req.model_dump(), deadline=deadline)
+            async with aclosing(events):
+                async for event, data in events:
+                    yield _sse(event, data)
+        except Exception as e:
+            status = _error_status(e)
+            yield _sse("error", _error_payload(e))
+        finally:
+            _observe_request("stream", status, started)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/cheongyak-plan/batch")
+async def generate_life_cycle_plans(req: LifeCycleBatchRequest):
+    if len(req.items) > settings.PLAN_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items: {len(req.items)} > {settings.PLAN_BATCH_MAX_ITEMS}",
+        )
+    concurrency = min(req.concurrency or settings.PLAN_BATCH_CONCURRENCY, settings.PLAN_BATCH_MAX_CONCURRENCY)
+    user_datas = [item.model_dump() for item in req.items]
+
+    async def ndjson_stream():
+        async for index, plan, error in life_cycle_service.generate_plans(
+            user_datas, concurrency=concurrency, item_budget_sec=settings.PLAN_DEADLINE_SEC
+        ):
+            line = {"index": index, "surveyId": user_datas[index].get("surveyId")}
+            if error is None:
+                line.update(status="ok", plan=plan.model_dump())
+            else:
+                line.update(status="error", error=_error_payload(error))
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+
+@router.post("/cheongyak-plan/jobs", status_code=202)
+async def submit_life_cycle_plan_job(req: LifeCycleSurveyRequest):
+    try:
+        job = await plan_jobs.submit(req.model_dump())
+    except JobQueueFull as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": "5"})
+    return JSONResponse(
+        status_code=202,
+        content=job,
+        headers={"Location": f"{router.prefix}/cheongyak-plan/jobs/{job['jobId']}"},
+    )
+
+
+@router.get("/cheongyak-plan/jobs/{job_id}")
+async def get_life_cycle_plan_job(job_id: str, wait: float = Query(default=0.0, ge=0.0)):
+    # wait(초) > 0 이면 작업이 끝날 때까지 최대 PLAN_JOB_LONG_POLL_MAX_SEC 동안 기다린다
+    job = await plan_jobs.get(job_id, wait_sec=min(wait, settings.PLAN_JOB_LONG_POLL_MAX_SEC))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+# scrape 시점에 각 구성요소의 현재 값을 읽는 gauge (/metrics)
+REGISTRY.gauge(
+    "gemini_breaker_open", "1 while the Gemini circuit breaker rejects calls (open or half_open)", (),
+    lambda: {(): float(circuit_breaker.stats()["state"] != "closed")} if circuit_breaker is not None else {},
+)
+REGISTRY.gauge(
+    "gemini_limiter_window", "Shared AIMD concurrency window and leases in flight", ("kind",),
+    lambda: {
+        (kind,): float(value)
+        for kind, value in rate_limiter.stats().items()
+        if kind in ("window", "in_flight", "queue_depth") and value is not None
+    } if rate_limiter is not None else {},
+    blocking=True,
+)
+REGISTRY.gauge(
+    "gemini_key_pool", "Per-key leases in flight, last-minute usage and quarantine (shared SQLite)", ("key", "kind"),
+    lambda: {
+        (key_id, kind): float(row[field])
+        for key_id, row in key_pool.stats()["keys"].items()
+        for kind, field in (
+            ("in_flight", "inFlight"),
+            ("requests_last_minute", "requestsLastMinute"),
+            ("tokens_last_minute", "tokensLastMinute"),
+            ("quarantined_sec", "quarantinedForSec"),
+        )
+    } if key_pool is not None else {},
+    blocking=True,
+)
+REGISTRY.gauge(
+    "plan_admission", "Admission control state in this worker", ("kind",),
+    lambda: {
+        ("in_flight",): float(admission.in_flight),
+        ("queue_depth",): float(admission.queue_depth),
+        ("expected_wait_sec",): admission.expected_wait(),
+    } if admission is not None else {},
+)
+REGISTRY.gauge(
+    "record_queue_depth", "Records waiting for the background writer", (),
+    lambda: {(): float(repo.stats()["queue_depth"])},
+)
+REGISTRY.gauge(
+    "plan_jobs", "Plan jobs by status (shared SQLite queue)", ("status",),
+    lambda: {(status,): float(count) for status, count in plan_jobs.stats()["by_status"].items()},
+    blocking=True,
+)
+REGISTRY.gauge(
+    "plan_cache_entries", "Plan cache entries held in this worker", (),
+    lambda: {(): float(plan_cache.stats()["memory_entries"])},
+)
+
+
+@router.get("/stats")
+def get_stats():
+    return {
+        "planCache": plan_cache.stats(),
+        "singleFlight": life_cycle_service.single_flight.stats(),
+        "structuredOutput": dict(life_cycle_service.output_stats),
+        "rateLimiter": rate_limiter.stats() if rate_limiter is not None else None,
+        "circuitBreaker": circuit_breaker.stats() if circuit_breaker is not None else None,
+        "keyPool": key_pool.stats() if key_pool is not None else None,
+        "hedging": {
+            **life_cycle_service.hedge_stats,
+            "delaySec": round(gemini_service.hedge_delay(settings.GEMINI_MODEL), 3),
+        },
+        "latency": gemini_service.latency_stats(),
+        "planJobs": plan_jobs.stats(),
+        "persistence": repo.stats(),
+        "profiler": request_profiler.stats(),
+        "admission": admission.stats() if admission is not None else None,
+        "modelRouter": model_router.stats() if model_router is not None else None,
+        "scenarios": dict(life_cycle_service.scenario_stats),
+        "surveyPlans": {
+            **life_cycle_service.replan_stats,
+            **(survey_plans.stats() if survey_plans is not None else {}),
+        },
+    }
+
+
+def _require_profile_token(token: Optional[str]) -> None:
+    if not request_profiler.authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+@router.get("/admin/profiles")
+def list_profiles(x_profile_token: Optional[str] = Header(default=None)):
+    _require_profile_token(x_profile_token)
+    return {"profiles": request_profiler.entries(), **request_profiler.stats()}
+
+
+@router.get("/admin/profiles/{name}")
+def get_profile(
+    name: str,
+    format: str = Query(default="pstats", pattern="^(pstats|text)$"),
+    sort: str = Query(default="cumulative", pattern="^(cumulative|tottime|calls)$"),
+    x_profile_token: Optional[str] = Header(default=None),
+):
+    # pstats: python -m pstats / snakeviz 로 여는 원본, text: 상위 함수 요약
+    _require_profile_token(x_profile_token)
+    path = request_profiler.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {name}")
+    if format == "text":
+        return PlainTextResponse(request_profiler.summary(name, sort=sort))
+    return FileResponse(path, media_type="application/octet-stream", filename=os.path.basename(path))
+
 
 @router.get("/health")
 def test_connection():
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+
+# 루프가 갱신하는 값은 루프에서 읽는다 (SQLite 를 읽는 gauge 만 render_async 가 스레드로 뺀다)
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(
+        await REGISTRY.render_async(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from typing import Annotated, List, Literal, Optional
 
 MarryStatus = Literal["single", "married", "divorced_or_widowed"]
 DebtType = Literal["housing", "student", "credit", "mixed", "none"]
@@ -62,3 +62,29 @@ class LifeCycleSurveyRequest(BaseModel):
     preferredRegion: Optional[str] = None
     priorityCriteria: Optional[List[PriorityCriteria]] = None
     preferredHousingSize: Optional[str] = None
+
+
+class LifeCycleBatchRequest(BaseModel):
+    items: List[LifeCycleSurveyRequest] = Field(..., min_length=1, description="설문 목록")
+    concurrency: Optional[int] = Field(default=None, ge=1, description="Gemini 동시 호출 수 (미지정 시 서버 기본값)")
+
+
+class ScenarioGrid(BaseModel):
+    # 축마다 비교할 값 목록. 지정한 축들의 모든 조합이 시나리오가 된다 (기준 설문은 항상 첫 시나리오로 포함)
+    monthlySavingAmount: Optional[List[Annotated[int, Field(ge=0)]]] = Field(
+        default=None, min_length=1, description="월 저축액 후보 (원)"
+    )
+    isDoubleIncome: Optional[List[bool]] = Field(default=None, min_length=1, description="맞벌이 여부 후보")
+    targetSavingRate: Optional[List[Annotated[int, Field(ge=0, le=100)]]] = Field(
+        default=None,
+        min_length=1,
+        description="목표 저축률 후보 (%). 월 저축액을 함께 바꾸지 않으면 소득 × 저축률로 다시 추정",
+    )
+    waitYears: Optional[List[Annotated[int, Field(ge=0, le=10)]]] = Field(
+        default=None, min_length=1, description="청약 신청을 미루는 기간 후보 (년, 최대 10)"
+    )
+
+
+class LifeCycleScenarioRequest(BaseModel):
+    base: LifeCycleSurveyRequest = Field(..., description="기준 설문")
+    grid: ScenarioGrid = Field(..., description="바꿔 볼 필드와 값 목록")
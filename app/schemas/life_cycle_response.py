@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 ConfidenceLevel = Literal["HIGH", "MEDIUM", "LOW"]
 RecommendedHorizon = Literal["SHORT_3", "MID_5", "LONG_10"]
@@ -36,3 +36,35 @@ class LifeCyclePlanResponse(BaseModel):
     chartData: ChartData
     planMeta: PlanMeta
     report: str
+
+class ScenarioOverrides(BaseModel):
+    monthlySavingAmount: Optional[int] = None
+    isDoubleIncome: Optional[bool] = None
+    targetSavingRate: Optional[int] = None
+    waitYears: Optional[int] = None
+
+class ScenarioProjection(BaseModel):
+    scenarioId: str
+    label: str
+    overrides: ScenarioOverrides
+    monthlySaving: int
+    waitYears: int
+    assetsAtApplication: int
+    subscriptionScore: int
+    eligibleSupplies: List[str]
+    canBuyWithCheongyak: bool
+    recommendedHorizon: RecommendedHorizon
+    chartData: ChartData
+
+class ScenarioComment(BaseModel):
+    scenarioId: str
+    comment: str
+
+class ScenarioNarrative(BaseModel):
+    summary: Summary
+    comparisons: List[ScenarioComment]
+    recommendation: str
+
+class LifeCycleScenarioResponse(BaseModel):
+    scenarios: List[ScenarioProjection]
+    narrative: ScenarioNarrative
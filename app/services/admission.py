@@ -0,0 +1,151 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+from app.core.metrics import PLAN_SHED
+
+SHED_FALLBACK = "fallback"
+SHED_REJECT = "reject"
+
+_SHED_COUNTERS = {"queue_full": "shedQueueFull", "deadline": "shedDeadline", "wait_timeout": "shedWaitTimeout"}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, reason: str, retry_after: float):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    LLM 호출이 필요한 플랜 요청의 워커 단위 입장 제어
+    - 동시에 max_in_flight 개만 실행하고 나머지는 최대 max_queue 개까지 FIFO 로 기다린다
+    - 새 요청의 예상 완료 시각 = 지금 + 앞선 요청들이 빠지는 시간 + 자기 처리 시간
+      (처리 시간은 service_estimate(model): 라우팅된 모델의 관측 지연 백분위, 표본이 부족하면 기본값)
+    - 기다려야 하는데 대기열이 가득 찼거나 예상 완료가 deadline 을 넘으면 기다리지 않고 바로 AdmissionRejected
+      (빈 자리가 있으면 추정치와 무관하게 들여보낸다: 거절된 요청은 Gemini 를 부르지 않아 추정치가 갱신되지 않으므로,
+      추정만으로 막으면 한가한 워커가 계속 fallback 만 줄 수 있다)
+    - 기다리는 도중 deadline 이 지나도 같은 예외로 빠진다 (업스트림 호출을 시작하지 않는다)
+    거절된 요청을 fallback 플랜으로 돌려줄지 503 으로 돌려줄지는 policy 로 정한다.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        service_estimate: Callable[[Optional[str]], float],
+        policy: str = SHED_FALLBACK,
+    ):
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max_queue
+        self.service_estimate = service_estimate
+        self.policy = policy
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._counters: Dict[str, int] = {
+            "admitted": 0,
+            "queued": 0,
+            "shedQueueFull": 0,
+            "shedDeadline": 0,
+            "shedWaitTimeout": 0,
+        }
+
+    @property
+    def fallback(self) -> bool:
+        return self.policy == SHED_FALLBACK
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def expected_wait(self, service_sec: Optional[float] = None) -> float:
+        # 지금 도착한 요청이 자리를 얻기까지의 예상 시간 (앞선 대기열이 max_in_flight 개씩 빠진다고 본다)
+        ahead = self._in_flight + len(self._waiters) - self.max_in_flight + 1
+        if ahead <= 0:
+            return 0.0
+        service_sec = self.service_estimate(None) if service_sec is None else service_sec
+        return math.ceil(ahead / self.max_in_flight) * service_sec
+
+    def _shed(self, reason: str, message: str, retry_after: float) -> AdmissionRejected:
+        self._counters[_SHED_COUNTERS[reason]] += 1
+        PLAN_SHED.inc(reason=reason, action=self.policy)
+        return AdmissionRejected(message, reason, max(retry_after, 1.0))
+
+    def _release(self) -> None:
+        # 자리를 반납하지 않고 다음 대기자에게 그대로 넘긴다 (in_flight 유지)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    @asynccontextmanager
+    async def admit(self, deadline: Optional[float] = None, model: Optional[str] = None) -> AsyncIterator[None]:
+        # model: 이 요청이 라우팅된 모델 (없으면 기본 모델 기준 추정)
+        service_sec = self.service_estimate(model)
+        wait_sec = self.expected_wait(service_sec)
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                raise self._shed(
+                    "queue_full", f"Plan queue full ({len(self._waiters)} waiting)", wait_sec + service_sec
+                )
+            if deadline is not None and wait_sec > 0 and time.monotonic() + wait_sec + service_sec > deadline:
+                raise self._shed(
+                    "deadline",
+                    f"Expected completion in {wait_sec + service_sec:.0f}s exceeds the request deadline",
+                    wait_sec + service_sec,
+                )
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._counters["queued"] += 1
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                await asyncio.wait({waiter}, timeout=timeout)
+            except asyncio.CancelledError:
+                # 자리를 넘겨받은 직후 취소됐다면 다음 대기자에게 다시 넘긴다
+                if waiter.done():
+                    self._release()
+                else:
+                    self._abandon(waiter)
+                raise
+            if not waiter.done():
+                self._abandon(waiter)
+                raise self._shed("wait_timeout", "Request deadline passed while queued", self.expected_wait())
+
+        self._counters["admitted"] += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self._counters,
+            "policy": self.policy,
+            "inFlight": self._in_flight,
+            "maxInFlight": self.max_in_flight,
+            "queueDepth": len(self._waiters),
+            "maxQueue": self.max_queue,
+            "serviceEstimateSec": round(self.service_estimate(None), 3),
+            "expectedWaitSec": round(self.expected_wait(), 3),
+        }
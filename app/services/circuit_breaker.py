@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Gemini 호출용 회로 차단기 (워커 프로세스 단위)
+    - closed: 최근 window 건 중 실패 비율 또는 느린 호출 비율이 임계값을 넘으면 open
+    - open: open_sec 동안 호출을 즉시 거절 (호출자는 바로 fallback 플랜을 받는다)
+    - half_open: open_sec 가 지나면 probe 호출을 half_open_probes 건만 허용, 모두 성공하면 closed / 하나라도 실패하면 다시 open
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        slow_call_sec: float = 30.0,
+        slow_call_ratio: float = 0.8,
+        open_sec: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_sec = slow_call_sec
+        self.slow_call_ratio = slow_call_ratio
+        self.open_sec = open_sec
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # (실패 여부, 느린 호출 여부)
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._counters: Dict[str, int] = {
+            "rejected": 0,
+            "successes": 0,
+            "failures": 0,
+            "slow_calls": 0,
+        }
+        self._transitions: Dict[str, int] = {}
+        self._last_transition: Optional[Dict[str, object]] = None
+
+    def _transition(self, state: str, reason: str) -> None:
+        key = f"{self._state}->{state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        self._last_transition = {"from": self._state, "to": state, "reason": reason, "at": time.time()}
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state in (OPEN, CLOSED):
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+
+    def _refresh(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_sec:
+            self._transition(HALF_OPEN, "open timeout elapsed")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow(self) -> bool:
+        """호출 전 확인. half_open 에서 True 를 받은 호출은 반드시 record_* 로 결과를 알려야 한다"""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(self.open_sec - (time.monotonic() - self._opened_at), 0.0)
+
+    def record_success(self, latency_sec: float) -> None:
+        slow = latency_sec >= self.slow_call_sec
+        with self._lock:
+            self._counters["successes"] += 1
+            if slow:
+                self._counters["slow_calls"] += 1
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                if slow:
+                    self._transition(OPEN, f"slow probe ({latency_sec:.1f}s)")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED, "probe succeeded")
+                return
+            self._outcomes.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self, reason: str = "") -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            if self._state == HALF_OPEN:
+                self._transition(OPEN, f"probe failed: {reason}"[:200])
+                return
+            if self._state == OPEN:
+                return
+            self._outcomes.append((True, False))
+            self._evaluate()
+
+    def record_ignored(self) -> None:
+        # 결과가 업스트림 상태와 무관한 경우 (예: 호출자 취소) half_open probe 자리만 돌려준다
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def _evaluate(self) -> None:
+        calls = len(self._outcomes)
+        if self._state != CLOSED or calls < self.min_calls:
+            return
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        if failures / calls >= self.failure_ratio:
+            self._transition(OPEN, f"failure ratio {failures}/{calls}")
+        elif slow / calls >= self.slow_call_ratio:
+            self._transition(OPEN, f"slow call ratio {slow}/{calls}")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._refresh()
+            calls = len(self._outcomes)
+            failures = sum(1 for failed, _ in self._outcomes if failed)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "window_failure_ratio": round(failures / calls, 4) if calls else 0.0,
+                "transitions": dict(self._transitions),
+                "last_transition": dict(self._last_transition) if self._last_transition else None,
+                **self._counters,
+            }
@@ -0,0 +1,309 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.schemas.life_cycle_response import RecommendedHorizon, SavingProjection
+
+PROJECTION_YEARS = 10
+
+# 부채 금리 구간별 대표 연이율 (구간 중앙값 근사)
+DEBT_RATE_BY_BAND = {
+    "LT_2": 0.015,
+    "BETWEEN_2_4": 0.03,
+    "BETWEEN_4_6": 0.05,
+    "GT_6": 0.07,
+    "UNKNOWN": 0.045,
+}
+DEFAULT_DEBT_RATE = DEBT_RATE_BY_BAND["UNKNOWN"]
+
+# 도시근로자 가구당 월평균소득 (3인 이하, 2024년 공고 기준 근사치)
+URBAN_WORKER_MONTHLY_INCOME = 7_004_509
+
+# 특별공급 유형별 소득 기준 (도시근로자 월평균소득 대비 비율: 외벌이, 맞벌이) - 공공분양 기준 근사치
+INCOME_LIMIT_RATIO = {
+    "newborn": (1.5, 2.0),
+    "multiChild": (1.2, 1.2),
+    "newlywed": (1.4, 1.6),
+    "firstHome": (1.3, 1.6),
+}
+
+# 월 상환액이 월 소득의 30% 이상이면 부채 부담형 (청약보다 부채 상환 우선)
+HEAVY_DEBT_RATIO = 0.3
+
+
+class SubscriptionScore(BaseModel):
+    unhousedPeriod: int       # 무주택 기간 (최대 32)
+    dependents: int           # 부양가족 수 (최대 35)
+    accountPeriod: int        # 청약통장 가입 기간 (최대 17)
+    total: int                # 84점 만점
+
+
+class SpecialSupplyEligibility(BaseModel):
+    newborn: bool
+    multiChild: bool
+    newlywed: bool
+    firstHome: bool
+    generalFirstRank: bool
+
+
+class FinancialFacts(BaseModel):
+    monthlySaving: int
+    monthlyDebtPayment: int
+    debtServiceRatio: float
+    remainingDebtByYear: List[int]
+    debtFreeYear: Optional[int]
+    savingProjectionByYear: List[SavingProjection]
+    subscriptionScore: SubscriptionScore
+    eligibility: SpecialSupplyEligibility
+    futureEligibility: SpecialSupplyEligibility
+    canBuyWithCheongyak: bool
+    recommendedHorizon: RecommendedHorizon
+
+
+def _column(user_datas: List[Dict[str, Any]], key: str, default: float = 0.0) -> np.ndarray:
+    return np.array(
+        [float(u.get(key)) if u.get(key) is not None else default for u in user_datas],
+        dtype=np.float64,
+    )
+
+
+def _flag(user_datas: List[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.array([u.get(key) is True for u in user_datas], dtype=bool)
+
+
+def _months_since(value: Optional[str], as_of: date) -> float:
+    # "YYYY-MM-DD" → 기준일까지 경과 개월 수 (미래 날짜면 음수, 없거나 잘못된 값이면 NaN)
+    if not value:
+        return np.nan
+    try:
+        start = date.fromisoformat(value[:10])
+    except ValueError:
+        return np.nan
+    months = (as_of.year - start.year) * 12 + (as_of.month - start.month)
+    if as_of.day < start.day:
+        months -= 1
+    return float(months)
+
+
+def _effective_monthly_saving(user_datas: List[Dict[str, Any]]) -> np.ndarray:
+    # 월 저축액이 없으면 (본업+부업 소득) × 목표 저축률로 추정
+    income = _column(user_datas, "annualIncome") + _column(user_datas, "annualSideIncome")
+    rate = _column(user_datas, "targetSavingRate")
+    derived = income / 12 * rate / 100
+    explicit = _column(user_datas, "monthlySavingAmount", default=np.nan)
+    return np.where(np.isnan(explicit), derived, explicit)
+
+
+def _project(
+    base_assets: np.ndarray,
+    monthly_saving: np.ndarray,
+    debt: np.ndarray,
+    monthly_rate: np.ndarray,
+    payment: np.ndarray,
+    years: int,
+):
+    # 월 단위 시뮬레이션을 닫힌 식으로 계산한다: 부채 상환이 끝나면 상환액만큼 저축 여력이 늘어난다
+    # (월별 반복문 대신 (설문 수, 개월 수) 배열 한 번으로 원리금 균등 상환 잔액을 구한다)
+    months = np.arange(years * 12 + 1, dtype=np.float64)
+    rate = monthly_rate[:, None]
+    growth = (1.0 + rate) ** months
+    # 매달 1 씩 k 개월 갚은 금액의 k 개월 시점 가치 = sum_{j<k} (1+r)^j
+    annuity = np.divide(growth - 1.0, rate, out=np.broadcast_to(months, growth.shape).copy(), where=rate > 0)
+    balance = debt[:, None] * growth - payment[:, None] * annuity
+
+    # 상환액이 이자 이하이면 원금이 줄지 않는다 (잔액 유지)
+    stuck = (debt > 0) & (payment <= debt * monthly_rate)
+    paid = (balance <= 0) & ~stuck[:, None]
+    paid[:, 0] = debt <= 0
+    payoff_month = np.where(paid.any(axis=1), paid.argmax(axis=1), months[-1] + 1)
+
+    debt_path = np.where(
+        months >= payoff_month[:, None],
+        0.0,
+        np.where(stuck[:, None], debt[:, None], balance),
+    )
+    # 상환이 끝난 다음 달부터 상환액이 저축으로 돌아온다
+    freed_months = np.maximum(months - payoff_month[:, None], 0.0)
+    assets_path = (
+        base_assets[:, None] + monthly_saving[:, None] * months + payment[:, None] * freed_months
+    )
+    return assets_path[:, ::12], debt_path[:, ::12]
+
+
+def _eligibility(
+    homeless: np.ndarray,
+    never_owned: np.ndarray,
+    account_months: np.ndarray,
+    married: np.ndarray,
+    single_parent: np.ndarray,
+    children: np.ndarray,
+    has_income: np.ndarray,
+    income_ratio: np.ndarray,
+    double_income: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    def within(track: str) -> np.ndarray:
+        single_limit, double_limit = INCOME_LIMIT_RATIO[track]
+        return income_ratio <= np.where(double_income, double_limit, single_limit)
+
+    special_base = homeless & (account_months >= 6)
+    return {
+        "newborn": special_base & (children >= 1) & within("newborn"),
+        "multiChild": special_base & (children >= 2) & within("multiChild"),
+        "newlywed": special_base & (married | (single_parent & (children >= 1))) & within("newlywed"),
+        "firstHome": (
+            homeless & never_owned & (account_months >= 12) & has_income
+            & (married | (children >= 1)) & within("firstHome")
+        ),
+        "generalFirstRank": homeless & (account_months >= 12),
+    }
+
+
+def compute_facts_batch(
+    user_datas: List[Dict[str, Any]],
+    as_of: Optional[date] = None,
+    years: int = PROJECTION_YEARS,
+    wait_years: Optional[Sequence[int]] = None,
+) -> List[FinancialFacts]:
+    """
+    설문 목록을 한 번에 벡터 연산으로 계산한다.
+    - 연도별 가용 자산/잔여 부채 (monthlyDebtPayment 상환 반영)
+    - 청약 가점 (무주택 기간 / 부양가족 / 통장 가입 기간)
+    - 특별공급 자격 (현재 / 계획 실현 시)
+    wait_years: 설문별로 가점/자격을 as_of 로부터 몇 년 뒤 시점에서 판정할지 (없으면 모두 0).
+    자산/부채 추정은 항상 as_of 부터 시작한다.
+    """
+    if not user_datas:
+        return []
+    as_of = as_of or date.today()
+    wait = np.zeros(len(user_datas)) if wait_years is None else np.asarray(wait_years, dtype=np.float64)
+    judged_year = as_of.year + wait
+
+    # ---------- 자산 / 부채 시뮬레이션 ----------
+    base_assets = _column(user_datas, "currentFinancialAssets") + _column(user_datas, "additionalAssets")
+    monthly_saving = _effective_monthly_saving(user_datas)
+    no_debt = np.array([u.get("hasDebt") is False or u.get("debtType") == "none" for u in user_datas])
+    debt = np.maximum(_column(user_datas, "debtPrincipal") - _column(user_datas, "debtPrincipalPaid"), 0.0)
+    debt = np.where(no_debt, 0.0, debt)
+    payment = np.where(no_debt, 0.0, _column(user_datas, "monthlyDebtPayment"))
+    annual_rate = np.array(
+        [DEBT_RATE_BY_BAND.get(u.get("debtInterestRateBand"), DEFAULT_DEBT_RATE) for u in user_datas]
+    )
+    assets_by_year, debt_by_year = _project(base_assets, monthly_saving, debt, annual_rate / 12, payment, years)
+
+    monthly_income = (_column(user_datas, "annualIncome") + _column(user_datas, "annualSideIncome")) / 12
+    debt_ratio = np.divide(payment, monthly_income, out=np.zeros_like(payment), where=monthly_income > 0)
+
+    # ---------- 청약 가점 ----------
+    age = _column(user_datas, "age", default=np.nan)
+    married = np.array([u.get("marryStatus") == "married" for u in user_datas])
+    single_parent = np.array([u.get("marryStatus") == "divorced_or_widowed" for u in user_datas])
+    children = _column(user_datas, "childCount")
+    planned_children = np.maximum(children, _column(user_datas, "fChildCount"))
+    ever_owned = _flag(user_datas, "hasOwnedHouse")
+    unhoused_start = _column(user_datas, "unhousedStartYear", default=np.nan)
+    homeless = ~ever_owned | ~np.isnan(unhoused_start)
+
+    # 무주택 기간은 만 30세 이후부터 산정 (기혼이면 무주택 시작 시점부터; 혼인신고일은 설문에 없음)
+    birth_year = as_of.year - age
+    counted_from = np.where(np.isnan(unhoused_start) & ~ever_owned, birth_year + 30, unhoused_start)
+    counted_from = np.where(married, counted_from, np.fmax(counted_from, birth_year + 30))
+    unhoused_years = np.nan_to_num(judged_year - counted_from, nan=-1.0)
+    unhoused_points = np.where(
+        homeless & (unhoused_years >= 0),
+        2 + 2 * np.minimum(np.floor(unhoused_years), 15),
+        0,
+    )
+
+    # 부양가족: 배우자 + 자녀 + 부양 중인 직계존속(보수적으로 1명)
+    dependents = married.astype(np.float64) + children + _flag(user_datas, "isSupportingParents")
+    dependents_points = 5 + 5 * np.minimum(dependents, 6)
+
+    has_account = np.array([u.get("hasSubscriptionAccount") is not False for u in user_datas])
+    account_months = np.array([_months_since(u.get("subscriptionStartDate"), as_of) for u in user_datas])
+    account_months = np.where(
+        has_account & ~np.isnan(account_months), np.maximum(account_months, 0) + wait * 12, -1.0
+    )
+    account_points = np.select(
+        [account_months < 0, account_months < 6, account_months < 12],
+        [0, 1, 2],
+        default=np.minimum(2 + np.floor(account_months / 12), 17),
+    )
+    total_points = unhoused_points + dependents_points + account_points
+
+    # ---------- 특별공급 자격 ----------
+    income_ratio = monthly_income / URBAN_WORKER_MONTHLY_INCOME
+    has_income = monthly_income > 0
+    double_income = _flag(user_datas, "isDoubleIncome")
+    now = _eligibility(
+        homeless, ~ever_owned, account_months, married, single_parent, children,
+        has_income, income_ratio, double_income,
+    )
+
+    # 계획(f* 필드)이 실현되고 5년이 지났을 때 (통장이 없으면 fSubscriptionStartDate 에 개설한다고 가정)
+    planned_account = np.array([_months_since(u.get("fSubscriptionStartDate"), as_of) for u in user_datas])
+    future_account = np.where(
+        account_months >= 0,
+        account_months + 60,
+        np.where(np.isnan(planned_account), -1.0, np.maximum(planned_account + wait * 12, 0) + 60),
+    )
+    future_married = married | _flag(user_datas, "fMarryStatus")
+    future_double = np.where(
+        np.array([u.get("fIsDoubleIncome") is not None for u in user_datas]),
+        _flag(user_datas, "fIsDoubleIncome"),
+        double_income,
+    )
+    future = _eligibility(
+        homeless, ~ever_owned, future_account, future_married, single_parent, planned_children,
+        has_income, income_ratio, future_double,
+    )
+
+    any_now = np.logical_or.reduce([now[k] for k in now])
+    any_special_now = np.logical_or.reduce([now[k] for k in now if k != "generalFirstRank"])
+    any_future = np.logical_or.reduce([future[k] for k in future])
+    # 기다리는 동안 상환이 끝나는 부채는 판정 시점의 부담에서 뺀다
+    wait_index = np.clip(wait.astype(int), 0, years)
+    debt_at_judgement = debt_by_year[np.arange(len(user_datas)), wait_index]
+    judged_ratio = np.where((wait > 0) & (debt_at_judgement <= 0), 0.0, debt_ratio)
+    heavy_debt = judged_ratio >= HEAVY_DEBT_RATIO
+
+    can_buy = any_now & ~heavy_debt
+    horizon = np.where(
+        can_buy & (any_special_now | (total_points >= 50)),
+        "SHORT_3",
+        np.where(~heavy_debt & (any_now | any_future), "MID_5", "LONG_10"),
+    )
+
+    # ---------- 결과 ----------
+    facts = []
+    for i in range(len(user_datas)):
+        paid_off = np.nonzero(debt_by_year[i] <= 0)[0]
+        facts.append(
+            FinancialFacts(
+                monthlySaving=int(round(monthly_saving[i])),
+                monthlyDebtPayment=int(round(payment[i])),
+                debtServiceRatio=round(float(debt_ratio[i]), 3),
+                remainingDebtByYear=[int(round(v)) for v in debt_by_year[i]],
+                debtFreeYear=int(paid_off[0]) if paid_off.size else None,
+                savingProjectionByYear=[
+                    SavingProjection(year=year, amount=int(round(amount)))
+                    for year, amount in enumerate(assets_by_year[i])
+                ],
+                subscriptionScore=SubscriptionScore(
+                    unhousedPeriod=int(unhoused_points[i]),
+                    dependents=int(dependents_points[i]),
+                    accountPeriod=int(account_points[i]),
+                    total=int(total_points[i]),
+                ),
+                eligibility=SpecialSupplyEligibility(**{k: bool(v[i]) for k, v in now.items()}),
+                futureEligibility=SpecialSupplyEligibility(**{k: bool(v[i]) for k, v in future.items()}),
+                canBuyWithCheongyak=bool(can_buy[i]),
+                recommendedHorizon=str(horizon[i]),
+            )
+        )
+    return facts
+
+
+def compute_facts(user_data: Dict[str, Any], as_of: Optional[date] = None) -> FinancialFacts:
+    return compute_facts_batch([user_data], as_of=as_of)[0]
@@ -1,9 +1,25 @@
+import asyncio
+import hashlib
 import json
 import random
 import time
-import requests
+import httpx
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 from app.core.config import settings
-from app.core.http_client import post_json
+from app.core.http_client import post_json, stream_post_json
+from app.core.metrics import (
+    GEMINI_ATTEMPT_SECONDS,
+    GEMINI_ATTEMPTS,
+    GEMINI_RETRIES,
+    observe_stage,
+    record_usage,
+)
+from app.services.circuit_breaker import OPEN, CircuitBreaker
+from app.services.key_pool import GeminiKeyPool, KeyLease, KeyPoolExhausted, KeyPoolRequestTooLarge
+from app.services.latency_histogram import LatencyHistogram
+from app.services.rate_limiter import AdaptiveRateLimiter, RateLimiterTimeout, Slot
+from app.services.token_estimator import estimate_tokens
 
 
 class GeminiServiceError(Exception):
@@ -18,22 +34,318 @@ class GeminiServiceUnavailable(GeminiServiceError):
     pass
 
 
+class GeminiCircuitOpen(GeminiServiceUnavailable):
+    pass
+
+
+class GeminiDeadlineExceeded(GeminiServiceTimeout):
+    pass
+
+
+class GeminiKeysExhausted(GeminiServiceUnavailable):
+    pass
+
+
 class GeminiService:
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        key_pool: Optional[GeminiKeyPool] = None,
+    ) -> None:
+        self.limiter = limiter
+        self.breaker = breaker
+        # 없으면 GEMINI_API_KEY / GEMINI_API_BASE 하나로 호출한다
+        self.key_pool = key_pool
+        # 모델별 generate_text 전체 소요 시간 (재시도 포함, 성공한 호출만)
+        self.latency: Dict[str, LatencyHistogram] = {}
+        # (키 id, system_instruction 해시) → (cachedContents 이름, 만료 시각). 이름이 None 이면 등록 실패(만료 전까지 재시도 안 함)
+        # cachedContents 는 등록한 키의 프로젝트에서만 보이므로 키마다 따로 만든다
+        self._context_caches: Dict[str, tuple] = {}
+        self._context_cache_lock = asyncio.Lock()
+
     def init(self) -> None:
-        if not settings.GEMINI_API_KEY:
+        if self.key_pool is None and not settings.GEMINI_API_KEY:
             raise RuntimeError("GEMINI_API_KEY is not set in environment variables.")
 
-    def generate_text(self, prompt: str, retries: int = 5, backoff_factor: float = 0.5) -> str:
-        url = f"{settings.GEMINI_URL}?key={settings.GEMINI_API_KEY}"
-        last_exception = None
+    @property
+    def context_cache_active(self) -> bool:
+        now = time.monotonic()
+        return any(name and expires_at > now for name, expires_at in self._context_caches.values())
 
-        for attempt in range(retries):
+    async def _cached_content(self, system_instruction: str, lease: Optional[KeyLease] = None) -> Optional[str]:
+        if not settings.GEMINI_CONTEXT_CACHE:
+            return None
+        digest = hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()
+        if lease is not None:
+            digest = f"{lease.key_id}:{digest}"
+        entry = self._context_caches.get(digest)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        async with self._context_cache_lock:
+            entry = self._context_caches.get(digest)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+
+            ttl = settings.GEMINI_CONTEXT_CACHE_TTL_SEC
+            name = None
             try:
-                resp = post_json(
+                if lease is None:
+                    url = f"{settings.GEMINI_CACHED_CONTENTS_URL}?key={settings.GEMINI_API_KEY}"
+                else:
+                    url = f"{lease.base}/cachedContents?key={lease.key}"
+                resp = await post_json(
                     url=url,
-                    payload={"contents": [{"parts": [{"text": prompt}]}]},
-                    timeout_sec=settings.GEMINI_TIMEOUT_SEC,
+                    payload={
+                        "model": f"models/{settings.GEMINI_MODEL}",
+                        "systemInstruction": {"parts": [{"text": system_instruction}]},
+                        "ttl": f"{ttl}s",
+                    },
+                    timeout_sec=settings.HTTP_CONNECT_TIMEOUT_SEC,
                 )
+                if resp.status_code < 400:
+                    name = resp.json().get("name")
+            except (httpx.HTTPError, ValueError):
+                name = None
+            # 만료 1분 전에 미리 갱신한다. 실패 시에도 TTL 동안은 인라인 전송으로 버틴다
+            self._context_caches[digest] = (name, time.monotonic() + max(ttl - 60, 1))
+            return name
+
+    def _slot(self, deadline: Optional[float] = None):
+        # 리미터가 꺼져 있으면 자리 대기 없이 바로 호출한다
+        if self.limiter is None:
+            return nullcontext(Slot(0))
+        max_wait_sec = None
+        if deadline is not None:
+            # 자리를 얻고 나서도 한 번 호출할 시간은 남겨 둔다
+            max_wait_sec = max(deadline - time.monotonic() - settings.GEMINI_MIN_ATTEMPT_SEC, 0.0)
+        return self.limiter.slot(max_wait_sec=max_wait_sec)
+
+    def _estimate_tokens(self, prompt: str, system_instruction: Optional[str]) -> int:
+        # 키 쿼터(TPM) 선점용 예상치. 응답의 usageMetadata 로 나중에 고친다
+        if self.key_pool is None or self.key_pool.tpm <= 0:
+            return 0
+        return (
+            estimate_tokens(prompt)
+            + estimate_tokens(system_instruction or "")
+            + settings.GEMINI_KEY_EST_OUTPUT_TOKENS
+        )
+
+    @asynccontextmanager
+    async def _key(self, tokens: int, deadline: Optional[float] = None) -> AsyncIterator[Optional[KeyLease]]:
+        """
+        이번 시도에 쓸 API 키를 풀에서 빌린다 (풀이 없으면 None → 기본 키).
+        호출자가 lease.status_code / lease.tokens 를 채우면 반납할 때 429 격리와 토큰 사용량에 반영한다.
+        """
+        if self.key_pool is None:
+            yield None
+            return
+        max_wait_sec = None
+        if deadline is not None:
+            max_wait_sec = max(deadline - time.monotonic() - settings.GEMINI_MIN_ATTEMPT_SEC, 0.0)
+        try:
+            lease = await self.key_pool.acquire(tokens, max_wait_sec=max_wait_sec)
+        except KeyPoolExhausted as e:
+            raise GeminiKeysExhausted(f"{e} (retry after {e.retry_after:.0f}s)")
+        except KeyPoolRequestTooLarge as e:
+            # 재시도해도 같은 결과이므로 일반 오류로 끝낸다
+            raise GeminiServiceError(str(e))
+        try:
+            yield lease
+        finally:
+            await self.key_pool.release(lease, lease.status_code, lease.tokens)
+
+    def _url(self, lease: Optional[KeyLease], model: Optional[str], method: str) -> str:
+        if lease is None:
+            if model:
+                base_url = settings.gemini_model_url(model, method)
+            else:
+                base_url = settings.GEMINI_URL if method == "generateContent" else settings.GEMINI_STREAM_URL
+            key = settings.GEMINI_API_KEY
+        else:
+            base_url = f"{lease.base}/models/{model or settings.GEMINI_MODEL}:{method}"
+            key = lease.key
+        if method == "streamGenerateContent":
+            return f"{base_url}?alt=sse&key={key}"
+        return f"{base_url}?key={key}"
+
+    def warm_up_urls(self) -> List[str]:
+        # 엔드포인트마다 모델 메타데이터 조회 (생성 쿼터를 쓰지 않는 가벼운 GET)
+        if self.key_pool is None:
+            return [f"{settings.GEMINI_API_BASE}/models/{settings.GEMINI_MODEL}?key={settings.GEMINI_API_KEY}"]
+        return [
+            f"{gemini_key.base}/models/{settings.GEMINI_MODEL}?key={gemini_key.key}"
+            for gemini_key in self.key_pool.endpoints
+        ]
+
+    def _attempt_timeout(self, deadline: Optional[float], timeout_sec: Optional[float] = None) -> float:
+        # 이번 시도에 쓸 수 있는 시간 = min(시도 타임아웃, 남은 예산). 한 번 호출할 만큼도 없으면 시도하지 않는다
+        timeout_sec = settings.GEMINI_TIMEOUT_SEC if timeout_sec is None else timeout_sec
+        if deadline is None:
+            return timeout_sec
+        remaining = deadline - time.monotonic()
+        if remaining < settings.GEMINI_MIN_ATTEMPT_SEC:
+            raise GeminiDeadlineExceeded(f"Gemini deadline budget exhausted ({max(remaining, 0):.1f}s left)")
+        return min(timeout_sec, remaining)
+
+    async def _backoff(
+        self, attempt: int, backoff_factor: float, deadline: Optional[float], last_exception: Exception
+    ) -> None:
+        self._raise_if_open()
+        wait_time = (backoff_factor * (2 ** attempt)) + (random.random() * 0.3)
+        if deadline is not None and deadline - time.monotonic() - wait_time < settings.GEMINI_MIN_ATTEMPT_SEC:
+            # 기다린 뒤 다시 호출할 예산이 없으면 재시도하지 않고 바로 실패를 돌려준다
+            raise last_exception
+        await asyncio.sleep(wait_time)
+        observe_stage("gemini_backoff", wait_time)
+
+    def _observe_latency(self, model: str, latency_sec: float) -> None:
+        self.latency.setdefault(model, LatencyHistogram()).observe(latency_sec)
+
+    def latency_percentile(self, model: str, p: float, min_samples: int) -> Optional[float]:
+        # 표본이 min_samples 보다 적으면 None (호출자가 기본값을 쓴다)
+        histogram = self.latency.get(model)
+        if histogram is None or histogram.samples < min_samples:
+            return None
+        return histogram.percentile(p)
+
+    def hedge_delay(self, model: str, deadline: Optional[float] = None) -> float:
+        """
+        model 호출이 이 시간 안에 끝나지 않으면 헤지 요청을 보낸다.
+        표본이 충분하면 최근 지연 시간의 GEMINI_HEDGE_PERCENTILE 백분위, 아니면 기본값.
+        deadline 이 있으면 헤지 요청이 남은 예산의 절반 이상을 쓸 수 있도록 앞당긴다.
+        """
+        delay = self.latency_percentile(model, settings.GEMINI_HEDGE_PERCENTILE, settings.GEMINI_HEDGE_MIN_SAMPLES)
+        if delay is None:
+            delay = settings.GEMINI_HEDGE_DEFAULT_DELAY_SEC
+        delay = max(delay, settings.GEMINI_HEDGE_MIN_DELAY_SEC)
+        if deadline is not None:
+            delay = min(delay, max(deadline - time.monotonic(), 0.0) / 2)
+        return delay
+
+    def latency_stats(self) -> Dict[str, Dict[str, object]]:
+        return {model: histogram.snapshot() for model, histogram in self.latency.items()}
+
+    def _raise_if_open(self) -> None:
+        # 재시도 대기 전에 확인: 회로가 열렸으면 남은 backoff 를 기다리지 않는다
+        if self.breaker is not None and self.breaker.state == OPEN:
+            raise GeminiCircuitOpen(f"Gemini circuit open (retry after {self.breaker.retry_after():.0f}s)")
+
+    @asynccontextmanager
+    async def _guard(self) -> AsyncIterator[Callable[[int, float], None]]:
+        """
+        회로 차단기 확인 + 결과 기록. 열려 있으면 업스트림을 부르지 않고 즉시 GeminiCircuitOpen.
+        yield 된 함수로 HTTP 상태와 업스트림 지연 시간을 알리면 429/5xx 는 실패, 나머지는 성공으로 기록한다.
+        지연 시간은 호출자가 리미터/키 대기가 끝난 뒤부터 잰다 (대기열 적체가 느린 호출로 잡히지 않게).
+        """
+        breaker = self.breaker
+        if breaker is None:
+            yield lambda status_code, latency_sec: None
+            return
+        if not breaker.allow():
+            raise GeminiCircuitOpen(f"Gemini circuit open (retry after {breaker.retry_after():.0f}s)")
+
+        recorded = False
+
+        def record(status_code: int, latency_sec: float) -> None:
+            nonlocal recorded
+            recorded = True
+            if status_code == 429 or status_code >= 500:
+                breaker.record_failure(f"HTTP {status_code}")
+            else:
+                breaker.record_success(latency_sec)
+
+        try:
+            yield record
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            if not recorded:
+                recorded = True
+                breaker.record_failure(type(e).__name__)
+            raise
+        finally:
+            if not recorded:
+                breaker.record_ignored()
+
+    async def _request_body(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        response_schema: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        lease: Optional[KeyLease] = None,
+    ) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if response_schema is not None:
+            body["generationConfig"] = {
+                "responseMimeType": "application/json",
+                "responseSchema": response_schema,
+            }
+        if system_instruction:
+            # cachedContents 는 등록한 모델(GEMINI_MODEL)에서만 쓸 수 있다
+            use_cache = model is None or model == settings.GEMINI_MODEL
+            cached = await self._cached_content(system_instruction, lease) if use_cache else None
+            if cached:
+                body["cachedContent"] = cached
+            else:
+                body["system_instruction"] = {"parts": [{"text": system_instruction}]}
+        return body
+
+    async def generate_text(
+        self,
+        prompt: str,
+        retries: int = 5,
+        backoff_factor: float = 0.5,
+        system_instruction: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        deadline: Optional[float] = None,
+        timeout_sec: Optional[float] = None,
+    ) -> str:
+        """
+        deadline: time.monotonic() 기준 절대 마감 시각. 각 시도의 타임아웃, 리미터 대기, 재시도 backoff 가
+        모두 남은 예산 안에서만 이뤄지고, 예산이 모자라면 GeminiServiceTimeout 계열 예외로 끝난다.
+        timeout_sec: 시도당 타임아웃 (없으면 GEMINI_TIMEOUT_SEC). 모델 라우터가 가벼운 모델에 짧게 준다.
+        """
+        tokens = self._estimate_tokens(prompt, system_instruction)
+        model_name = model or settings.GEMINI_MODEL
+        labels = {"model": model_name, "method": "generateContent"}
+        started = time.monotonic()
+        last_exception = None
+
+        for attempt in range(retries):
+            if attempt:
+                GEMINI_RETRIES.inc(**labels)
+            try:
+                # 대기열에 들어가기 전에 한 번, 자리를 얻은 뒤 다시 남은 예산을 계산한다
+                attempt_timeout = self._attempt_timeout(deadline, timeout_sec)
+                queued_at = time.perf_counter()
+                async with self._guard() as record_status, self._slot(deadline) as slot, self._key(
+                    tokens, deadline
+                ) as lease:
+                    sent_at = time.perf_counter()
+                    observe_stage("limiter_wait", sent_at - queued_at)
+                    # cachedContents 가 키마다 다르므로 본문은 키를 고른 뒤에 만든다
+                    body = await self._request_body(prompt, system_instruction, response_schema, model, lease)
+                    attempt_timeout = self._attempt_timeout(deadline, timeout_sec)
+                    # httpx 타임아웃은 읽기/쓰기 단위라 전체 시도 시간은 wait_for 로 묶는다
+                    resp = await asyncio.wait_for(
+                        post_json(url=self._url(lease, model, "generateContent"), payload=body, timeout_sec=attempt_timeout),
+                        attempt_timeout,
+                    )
+                    attempt_sec = time.perf_counter() - sent_at
+                    GEMINI_ATTEMPT_SECONDS.observe(attempt_sec, **labels)
+                    GEMINI_ATTEMPTS.inc(result=str(resp.status_code), **labels)
+                    record_status(resp.status_code, attempt_sec)
+                    if resp.status_code in (429, 503):
+                        slot.mark_throttled()
+                    if lease is not None:
+                        lease.status_code = resp.status_code
+                        if resp.status_code < 400:
+                            try:
+                                lease.tokens = (resp.json().get("usageMetadata") or {}).get("totalTokenCount")
+                            except ValueError:
+                                pass
 
                 if resp.status_code in (429, 503):
                     raise GeminiServiceUnavailable(f"Gemini HTTP {resp.status_code}: {resp.text}")
@@ -49,25 +361,152 @@ class GeminiService:
                     )
 
                 try:
-                    return data["candidates"][0]["content"]["parts"][0]["text"]
+                    text = data["candidates"][0]["content"]["parts"][0]["text"]
                 except Exception:
                     raise GeminiServiceError(
                         f"Gemini invalid shape: {json.dumps(data, ensure_ascii=False)}"
                     )
+                record_usage(model_name, data.get("usageMetadata") or {})
+                self._observe_latency(model_name, time.monotonic() - started)
+                return text
+
+            except GeminiCircuitOpen:
+                # 열린 회로에는 재시도하지 않는다 (호출자가 바로 fallback 으로 응답)
+                GEMINI_ATTEMPTS.inc(result="circuit_open", **labels)
+                raise
+            except GeminiKeysExhausted:
+                # 키 풀에서 이미 기다릴 만큼 기다렸으므로 재시도하지 않는다
+                GEMINI_ATTEMPTS.inc(result="keys_exhausted", **labels)
+                raise
+            except GeminiServiceUnavailable as e:
+                last_exception = e
+                await self._backoff(attempt, backoff_factor, deadline, last_exception)
+                continue
+            except (httpx.TimeoutException, asyncio.TimeoutError):
+                GEMINI_ATTEMPTS.inc(result="timeout", **labels)
+                last_exception = GeminiServiceTimeout(
+                    f"Gemini request timed out after {attempt_timeout:.0f} seconds"
+                )
+                await self._backoff(attempt, backoff_factor, deadline, last_exception)
+                continue
+            except httpx.HTTPError as e:
+                GEMINI_ATTEMPTS.inc(result="network_error", **labels)
+                raise GeminiServiceError(f"Gemini network error: {str(e)}")
+            except RateLimiterTimeout as e:
+                # 이미 대기열에서 오래 기다렸으므로 재시도하지 않는다
+                GEMINI_ATTEMPTS.inc(result="limiter_timeout", **labels)
+                raise GeminiServiceUnavailable(str(e))
+
+        raise last_exception or GeminiServiceError(f"Failed after {retries} retries")
+
+    async def stream_text(
+        self,
+        prompt: str,
+        retries: int = 5,
+        backoff_factor: float = 0.5,
+        system_instruction: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        deadline: Optional[float] = None,
+        model: Optional[str] = None,
+        timeout_sec: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        streamGenerateContent(SSE) 로 텍스트 조각을 도착하는 대로 넘겨준다.
+        재시도는 첫 조각을 받기 전까지만 한다 (이미 내보낸 조각은 되돌릴 수 없음).
+        deadline 이 지나면 조각 사이에서 GeminiDeadlineExceeded 로 끊는다.
+        """
+        tokens = self._estimate_tokens(prompt, system_instruction)
+        model_name = model or settings.GEMINI_MODEL
+        labels = {"model": model_name, "method": "streamGenerateContent"}
+        last_exception = None
+
+        for attempt in range(retries):
+            if attempt:
+                GEMINI_RETRIES.inc(**labels)
+            started = False
+            usage: Dict[str, int] = {}
+            try:
+                attempt_timeout = self._attempt_timeout(deadline, timeout_sec)
+                queued_at = time.perf_counter()
+                async with self._guard() as record_status, self._slot(deadline) as slot, self._key(
+                    tokens, deadline
+                ) as lease:
+                    body = await self._request_body(prompt, system_instruction, response_schema, model, lease)
+                    requested_at = time.perf_counter()
+                    async with stream_post_json(
+                        url=self._url(lease, model, "streamGenerateContent"),
+                        payload=body,
+                        timeout_sec=self._attempt_timeout(deadline, timeout_sec),
+                    ) as resp:
+                        # 스트림은 헤더 도착까지를 리미터 대기 + 첫 응답 시간으로 본다
+                        sent_at = time.perf_counter()
+                        observe_stage("limiter_wait_and_headers", sent_at - queued_at)
+                        GEMINI_ATTEMPTS.inc(result=str(resp.status_code), **labels)
+                        record_status(resp.status_code, sent_at - requested_at)
+                        if lease is not None:
+                            lease.status_code = resp.status_code
+                        if resp.status_code >= 400:
+                            error_body = (await resp.aread()).decode("utf-8", errors="replace")
+                            if resp.status_code in (429, 503):
+                                slot.mark_throttled()
+                                raise GeminiServiceUnavailable(f"Gemini HTTP {resp.status_code}: {error_body}")
+                            raise GeminiServiceError(f"Gemini HTTP {resp.status_code}: {error_body}")
+
+                        try:
+                            async for line in resp.aiter_lines():
+                                if deadline is not None and time.monotonic() >= deadline:
+                                    raise GeminiDeadlineExceeded("Gemini stream exceeded the request deadline")
+                                if not line.startswith("data:"):
+                                    continue
+                                data = json.loads(line[len("data:"):])
+                                # usageMetadata 는 누적값으로 오므로 마지막 값만 기록한다
+                                usage = data.get("usageMetadata") or usage
+                                try:
+                                    parts = data["candidates"][0]["content"]["parts"]
+                                except (KeyError, IndexError, TypeError):
+                                    # 마지막 청크는 finishReason/usageMetadata 만 담고 올 수 있다
+                                    continue
+                                text = "".join(part.get("text", "") for part in parts)
+                                if text:
+                                    started = True
+                                    yield text
+                        finally:
+                            # 소비자가 중간에 aclose() 해도 시도 시간/토큰 사용량/키 토큰을 정산한다
+                            GEMINI_ATTEMPT_SECONDS.observe(time.perf_counter() - sent_at, **labels)
+                            record_usage(model_name, usage)
+                            if lease is not None:
+                                lease.tokens = usage.get("totalTokenCount")
+                return
 
+            except GeminiCircuitOpen:
+                GEMINI_ATTEMPTS.inc(result="circuit_open", **labels)
+                raise
+            except GeminiKeysExhausted:
+                GEMINI_ATTEMPTS.inc(result="keys_exhausted", **labels)
+                raise
             except GeminiServiceUnavailable as e:
+                if started:
+                    raise
                 last_exception = e
-                wait_time = (backoff_factor * (2 ** attempt)) + (random.random() * 0.3)
-                time.sleep(wait_time)
+                await self._backoff(attempt, backoff_factor, deadline, last_exception)
                 continue
-            except requests.Timeout:
+            except httpx.TimeoutException:
+                GEMINI_ATTEMPTS.inc(result="timeout", **labels)
                 last_exception = GeminiServiceTimeout(
-                    f"Gemini request timed out after {settings.GEMINI_TIMEOUT_SEC} seconds"
+                    f"Gemini request timed out after {attempt_timeout:.0f} seconds"
                 )
-                wait_time = (backoff_factor * (2 ** attempt)) + (random.random() * 0.3)
-                time.sleep(wait_time)
+                if started:
+                    raise last_exception
+                await self._backoff(attempt, backoff_factor, deadline, last_exception)
                 continue
-            except requests.RequestException as e:
+            except httpx.HTTPError as e:
+                GEMINI_ATTEMPTS.inc(result="network_error", **labels)
                 raise GeminiServiceError(f"Gemini network error: {str(e)}")
+            except RateLimiterTimeout as e:
+                # 이미 대기열에서 오래 기다렸으므로 재시도하지 않는다
+                GEMINI_ATTEMPTS.inc(result="limiter_timeout", **labels)
+                raise GeminiServiceUnavailable(str(e))
+            except json.JSONDecodeError as e:
+                raise GeminiServiceError(f"Gemini invalid stream chunk: {str(e)}")
 
         raise last_exception or GeminiServiceError(f"Failed after {retries} retries")
@@ -1,24 +1,216 @@
 # json 추출 유틸 함수
+import json
 import re
+from typing import Any, Dict, List, Optional, Tuple
 
-def extract_json_object(text: str) -> str:
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# 버퍼 끝에서 잘린 토큰(숫자/리터럴/유니코드 이스케이프)의 나머지 부분
+_TRUNCATED_TAIL = re.compile(
+    r"(?:[0-9.eE+-]*|u[0-9a-fA-F]{0,4}|t(?:r(?:ue?)?)?|f(?:a(?:l(?:se?)?)?)?|n(?:u(?:ll?)?)?)"
+)
+_CLOSER = {"{": "}", "[": "]", '"': '"'}
+
+# 루트 객체 내부 상태
+_KEY_OR_END = 0
+_KEY = 1
+_COLON = 2
+_VALUE = 3
+_COMMA_OR_END = 4
+
+
+class JsonStreamError(ValueError):
+    """LLM 출력의 JSON 이 깨졌을 때. offset 은 지금까지 받은 전체 텍스트 기준 위치."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} (offset {offset})")
+        self.offset = offset
+
+
+class IncrementalJsonParser:
     """
-    LLM이 반환한 텍스트에서 JSON 객체만 뽑아냄.
-    - ```json ... ``` 코드펜스 제거
-    - 텍스트 중 첫 '{' ~ 마지막 '}' 구간만 추출
+    LLM 텍스트를 조각 단위로 받아 최상위 JSON 객체를 점진적으로 파싱한다.
+    - 첫 '{' 이전의 머리말/코드펜스, 객체가 닫힌 뒤의 텍스트는 무시
+    - 최상위 멤버(summary, diagnosis, ...)는 값이 닫히는 즉시 (key, value) 로 반환
+    - 첫 키를 읽기 전에 깨진 '{' 는 본문 속 중괄호로 보고 다음 '{' 부터 다시 시도하고,
+      그 이후의 잘못된 토큰은 정확한 offset 과 함께 즉시 JsonStreamError
+    멤버 값 자체는 json 의 C 디코더(raw_decode)로 한 번에 읽는다.
     """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder(strict=False)
+        self._buf = ""
+        self._pending: List[str] = []
+        self._pending_len = 0
+        self._retry_len = 0
+        self._pos = 0
+        self._start = -1
+        self._end = -1
+        self._state = _KEY_OR_END
+        self._committed = False
+        self._key: Optional[str] = None
+        self._wait_for: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+
+    @property
+    def closed(self) -> bool:
+        return self._end != -1
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.closed or not chunk:
+            return []
+        self._pending.append(chunk)
+        self._pending_len += len(chunk)
+        # 덜 닫힌 컨테이너/문자열 값은 닫는 문자가 들어오거나 버퍼가 두 배로 자랄 때만 다시 디코딩한다
+        # (재디코딩 비용을 선형으로 유지하면서도 깨진 토큰은 늦지 않게 잡아낸다)
+        if (
+            self._wait_for is not None
+            and self._wait_for not in chunk
+            and len(self._buf) + self._pending_len < self._retry_len
+        ):
+            return []
+        self._buf += "".join(self._pending)
+        self._pending.clear()
+        self._pending_len = 0
+        return self._run()
+
+    def close(self) -> Dict[str, Any]:
+        if self._pending and not self.closed:
+            self._buf += "".join(self._pending)
+            self._pending.clear()
+            self._pending_len = 0
+            self._run()
+        if not self.closed:
+            if self._start == -1:
+                raise JsonStreamError(
+                    f"Could not locate JSON object in LLM output: {self._buf[:200]}", len(self._buf)
+                )
+            raise JsonStreamError("LLM output ended before the JSON object was closed", len(self._buf))
+        return self.result
+
+    # ---------- 내부 ----------
+    def _fail(self, message: str, offset: int) -> None:
+        if self._committed:
+            raise JsonStreamError(message, offset)
+        # 아직 JSON 으로 확정되지 않은 '{' (예: 본문 속 "{이름}") → 다음 '{' 부터 재시도
+        self._pos = self._start + 1
+        self._start = -1
+        self._state = _KEY_OR_END
+        self._key = None
+        self._wait_for = None
+        self.result = {}
+
+    def _run(self) -> List[Tuple[str, Any]]:
+        buf = self._buf
+        sections: List[Tuple[str, Any]] = []
+
+        while not self.closed:
+            if self._start == -1:
+                start = buf.find("{", self._pos)
+                if start == -1:
+                    self._pos = len(buf)
+                    return sections
+                self._start = start
+                self._pos = start + 1
+
+            pos = _WHITESPACE.match(buf, self._pos).end()
+            if pos >= len(buf):
+                self._pos = pos
+                return sections
+            ch = buf[pos]
+            state = self._state
+
+            if state in (_KEY_OR_END, _KEY):
+                if ch == "}" and state == _KEY_OR_END:
+                    self._end = pos + 1
+                elif ch == '"':
+                    try:
+                        self._key, self._pos = json.decoder.scanstring(buf, pos + 1, False)
+                    except json.JSONDecodeError:
+                        self._pos = pos
+                        return sections
+                    self._state = _COLON
+                    continue
+                else:
+                    self._fail("Expecting property name enclosed in double quotes", pos)
+                    continue
+
+            elif state == _COLON:
+                if ch != ":":
+                    self._fail("Expecting ':' delimiter", pos)
+                    continue
+                self._committed = True
+                self._state = _VALUE
+
+            elif state == _VALUE:
+                try:
+                    value, end = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as e:
+                    if self._is_truncated(e):
+                        self._pos = pos
+                        self._wait_for = _CLOSER.get(ch)
+                        self._retry_len = pos + 2 * (len(buf) - pos)
+                        return sections
+                    self._fail(e.msg, e.pos)
+                    continue
+                if (
+                    isinstance(value, (int, float))
+                    and not isinstance(value, bool)
+                    and _TRUNCATED_TAIL.fullmatch(buf, end) is not None
+                ):
+                    # 버퍼 끝의 숫자(예: "12." / "1e")는 다음 조각에서 이어질 수 있다
+                    self._pos = pos
+                    return sections
+                self._wait_for = None
+                self.result[self._key] = value
+                sections.append((self._key, value))
+                self._key = None
+                self._state = _COMMA_OR_END
+                self._pos = end
+                continue
+
+            elif state == _COMMA_OR_END:
+                if ch == ",":
+                    self._state = _KEY
+                elif ch == "}":
+                    self._end = pos + 1
+                else:
+                    self._fail("Expecting ',' delimiter", pos)
+                    continue
+
+            self._pos = pos + 1
+
+        return sections
+
+    def _is_truncated(self, e: json.JSONDecodeError) -> bool:
+        if e.pos >= len(self._buf) or e.msg.startswith("Unterminated string"):
+            return True
+        return _TRUNCATED_TAIL.fullmatch(self._buf, e.pos) is not None
+
+
+def _parse_complete(text: str) -> IncrementalJsonParser:
     if not text:
         raise ValueError("Empty LLM response.")
+    parser = IncrementalJsonParser()
+    parser.feed(text)
+    parser.close()
+    return parser
 
-    # 1) ```json ... ``` 또는 ``` ... ``` 제거
-    fenced = re.search(r"```(?:json)?\s*(.*?)\s*```", text, re.DOTALL | re.IGNORECASE)
-    if fenced:
-        text = fenced.group(1).strip()
 
-    # 2) 첫 { 부터 마지막 } 까지 추출
-    start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError(f"Could not locate JSON object in LLM output: {text[:200]}")
+def extract_json_object(text: str) -> str:
+    """
+    LLM이 반환한 텍스트에서 JSON 객체만 뽑아냄.
+    - ```json ... ``` 코드펜스/머리말/꼬리말 무시
+    - 첫 번째로 완결되는 최상위 JSON 객체 구간만 추출
+    """
+    parser = _parse_complete(text)
+    start, end = parser.span
+    return text[start:end]
+
 
-    return text[start:end + 1].strip()
\ No newline at end of file
+def parse_json_object(text: str) -> Dict[str, Any]:
+    """extract_json_object + json.loads 를 한 번의 파싱으로 처리한다."""
+    return _parse_complete(text).result
@@ -0,0 +1,350 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.core.metrics import GEMINI_KEY_EVENTS
+from app.services.rate_limiter import claim_in_thread
+
+logger = logging.getLogger(__name__)
+
+# RPM/TPM 집계 구간
+QUOTA_WINDOW_SEC = 60.0
+
+
+class KeyPoolExhausted(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class KeyPoolRequestTooLarge(Exception):
+    # 예상 토큰이 키 하나의 TPM 보다 커서 기다려도 어떤 키로도 보낼 수 없는 요청
+    pass
+
+
+@dataclass(frozen=True)
+class GeminiKey:
+    key: str
+    base: str
+
+    @property
+    def key_id(self) -> str:
+        # 로그/지표에는 키 원문 대신 짧은 해시만 남긴다
+        return hashlib.sha256(self.key.encode("utf-8")).hexdigest()[:8]
+
+
+@dataclass
+class KeyLease:
+    gemini_key: GeminiKey
+    lease_id: int
+    usage_id: int
+    # 호출자가 응답을 받은 뒤 채운다 (반납 시 429 격리와 실제 토큰 사용량에 반영)
+    status_code: Optional[int] = None
+    tokens: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        return self.gemini_key.key
+
+    @property
+    def base(self) -> str:
+        return self.gemini_key.base
+
+    @property
+    def key_id(self) -> str:
+        return self.gemini_key.key_id
+
+
+def parse_keys(raw: str, default_key: Optional[str], default_base: str) -> List[GeminiKey]:
+    """
+    "key1,key2@https://host/v1beta" → 키별 엔드포인트 (@ 가 없으면 default_base)
+    비어 있으면 GEMINI_API_KEY 하나로 만든다.
+    """
+    keys: List[GeminiKey] = []
+    for entry in (item.strip() for item in raw.split(",")):
+        if not entry:
+            continue
+        key, _, base = entry.partition("@")
+        keys.append(GeminiKey(key=key, base=(base or default_base).rstrip("/")))
+    if not keys and default_key:
+        keys.append(GeminiKey(key=default_key, base=default_base.rstrip("/")))
+    return keys
+
+
+class GeminiKeyPool:
+    """
+    여러 API 키/엔드포인트에 호출을 나눠 보내는 풀 (gunicorn 워커들이 공유하는 로컬 SQLite)
+    - 고르는 순서: 격리되지 않고 남은 쿼터(RPM/TPM)가 있는 키 중 처리 중 호출 수 → 최근 1분 호출 수가 적은 키
+    - 호출 전에 예상 토큰을 잡아 두고, 응답의 usageMetadata 로 실제 토큰 수를 고친다
+    - 429 를 받은 키는 quarantine_sec × 2^(연속 횟수-1) (최대 max_quarantine_sec) 동안 빼고, 성공하면 초기화
+    - 모든 키가 막혀 있으면 max_wait_sec 안에서 풀릴 때까지 기다리고, 넘으면 KeyPoolExhausted
+    - 예상 토큰이 TPM 자체보다 크면 기다리지 않고 KeyPoolRequestTooLarge
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        keys: List[GeminiKey],
+        rpm: int = 0,
+        tpm: int = 0,
+        quarantine_sec: float = 30.0,
+        max_quarantine_sec: float = 300.0,
+        lease_sec: float = 330.0,
+        max_wait_sec: float = 10.0,
+        poll_interval_sec: float = 0.25,
+    ):
+        if not keys:
+            raise ValueError("GeminiKeyPool needs at least one key")
+        self.db_path = db_path
+        self.keys = keys
+        self.rpm = rpm
+        self.tpm = tpm
+        self.quarantine_sec = quarantine_sec
+        self.max_quarantine_sec = max_quarantine_sec
+        self.lease_sec = lease_sec
+        self.max_wait_sec = max_wait_sec
+        self.poll_interval_sec = poll_interval_sec
+        self._by_id: Dict[str, GeminiKey] = {k.key_id: k for k in keys}
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._counters: Dict[str, int] = {"acquired": 0, "waits": 0, "exhausted": 0, "too_large": 0, "quarantines": 0}
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._init_db()
+
+    # ---------- SQLite ----------
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 커넥션은 스레드 간 공유하지 않는다 (to_thread 로 호출됨)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS key_leases ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " key_id TEXT NOT NULL,"
+            " pid INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ")"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS key_usage ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " key_id TEXT NOT NULL,"
+            " ts REAL NOT NULL,"
+            " tokens INTEGER NOT NULL"
+            ")"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_key_usage_ts ON key_usage (ts)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS key_state ("
+            " key_id TEXT PRIMARY KEY,"
+            " quarantined_until REAL NOT NULL,"
+            " strikes INTEGER NOT NULL"
+            ")"
+        )
+
+    def _snapshot(self, conn: sqlite3.Connection, now: float) -> Dict[str, Dict[str, float]]:
+        # 키별 처리 중 호출 수, 최근 1분 호출/토큰, 격리 해제 시각
+        state = {key_id: {"in_flight": 0, "requests": 0, "tokens": 0, "quarantined_until": 0.0, "strikes": 0}
+                 for key_id in self._by_id}
+        for key_id, count in conn.execute(
+            "SELECT key_id, COUNT(*) FROM key_leases WHERE expires_at > ? GROUP BY key_id", (now,)
+        ):
+            if key_id in state:
+                state[key_id]["in_flight"] = count
+        for key_id, requests, tokens in conn.execute(
+            "SELECT key_id, COUNT(*), COALESCE(SUM(tokens), 0) FROM key_usage WHERE ts > ? GROUP BY key_id",
+            (now - QUOTA_WINDOW_SEC,),
+        ):
+            if key_id in state:
+                state[key_id]["requests"] = requests
+                state[key_id]["tokens"] = tokens
+        for key_id, until, strikes in conn.execute("SELECT key_id, quarantined_until, strikes FROM key_state"):
+            if key_id in state:
+                state[key_id]["quarantined_until"] = until
+                state[key_id]["strikes"] = strikes
+        return state
+
+    def _available_at(self, conn: sqlite3.Connection, key_id: str, row: Dict[str, float], tokens: int, now: float) -> float:
+        # 이 키를 쓸 수 있게 되는 가장 이른 시각 (now 이하면 지금 사용 가능)
+        available = row["quarantined_until"]
+        if self.rpm > 0 and row["requests"] >= self.rpm:
+            # 구간 안에서 rpm 번째로 최근 호출이 빠지는 시각
+            (ts,) = conn.execute(
+                "SELECT ts FROM key_usage WHERE key_id = ? AND ts > ? ORDER BY ts DESC LIMIT 1 OFFSET ?",
+                (key_id, now - QUOTA_WINDOW_SEC, self.rpm - 1),
+            ).fetchone()
+            available = max(available, ts + QUOTA_WINDOW_SEC)
+        if self.tpm > 0 and row["tokens"] + tokens > self.tpm:
+            # 토큰 기준은 가장 오래된 호출이 빠지는 시각으로 근사한다
+            (ts,) = conn.execute(
+                "SELECT MIN(ts) FROM key_usage WHERE key_id = ? AND ts > ?", (key_id, now - QUOTA_WINDOW_SEC)
+            ).fetchone()
+            available = max(available, (ts or now) + QUOTA_WINDOW_SEC)
+        return available
+
+    def _try_acquire(self, tokens: int) -> Tuple[Optional[KeyLease], float]:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM key_leases WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM key_usage WHERE ts <= ?", (now - QUOTA_WINDOW_SEC,))
+            state = self._snapshot(conn, now)
+            best: Optional[Tuple[int, int, str]] = None
+            next_available = float("inf")
+            for key_id, row in state.items():
+                available = self._available_at(conn, key_id, row, tokens, now)
+                if available > now:
+                    next_available = min(next_available, available)
+                    continue
+                rank = (row["in_flight"], row["requests"], key_id)
+                if best is None or rank < best:
+                    best = rank
+            if best is None:
+                conn.execute("COMMIT")
+                return None, next_available - now
+
+            key_id = best[2]
+            lease_id = conn.execute(
+                "INSERT INTO key_leases (key_id, pid, expires_at) VALUES (?, ?, ?)",
+                (key_id, self._pid, now + self.lease_sec),
+            ).lastrowid
+            usage_id = conn.execute(
+                "INSERT INTO key_usage (key_id, ts, tokens) VALUES (?, ?, ?)", (key_id, now, tokens)
+            ).lastrowid
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return KeyLease(self._by_id[key_id], lease_id, usage_id), 0.0
+
+    def _release(self, lease: KeyLease, status_code: Optional[int], tokens: Optional[int]) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM key_leases WHERE id = ?", (lease.lease_id,))
+            if tokens is not None:
+                conn.execute("UPDATE key_usage SET tokens = ? WHERE id = ?", (tokens, lease.usage_id))
+            if status_code == 429:
+                row = conn.execute("SELECT strikes FROM key_state WHERE key_id = ?", (lease.key_id,)).fetchone()
+                strikes = (row[0] if row else 0) + 1
+                until = now + min(self.quarantine_sec * 2 ** (strikes - 1), self.max_quarantine_sec)
+                conn.execute(
+                    "INSERT INTO key_state (key_id, quarantined_until, strikes) VALUES (?, ?, ?)"
+                    " ON CONFLICT(key_id) DO UPDATE SET quarantined_until = excluded.quarantined_until,"
+                    " strikes = excluded.strikes",
+                    (lease.key_id, until, strikes),
+                )
+            elif status_code is not None and status_code < 400:
+                conn.execute("UPDATE key_state SET strikes = 0 WHERE key_id = ?", (lease.key_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _discard(self, lease: KeyLease) -> None:
+        # 보내지 않은 호출: 임대와 쿼터 사용 기록을 모두 지운다
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM key_leases WHERE id = ?", (lease.lease_id,))
+            conn.execute("DELETE FROM key_usage WHERE id = ?", (lease.usage_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def _discard_orphan(self, claimed: Tuple[Optional[KeyLease], float]) -> None:
+        # acquire 가 취소된 뒤 스레드가 잡은 키 (예: 헤지에서 진 쪽)
+        lease, _ = claimed
+        if lease is None:
+            return
+        try:
+            await asyncio.to_thread(self._discard, lease)
+        except sqlite3.Error as e:
+            logger.warning("[KeyPool] discard failed: %s", e)
+
+    # ---------- 공개 API ----------
+    async def acquire(self, tokens: int, max_wait_sec: Optional[float] = None) -> KeyLease:
+        if self.tpm > 0 and tokens > self.tpm:
+            self._counters["too_large"] += 1
+            raise KeyPoolRequestTooLarge(f"Estimated {tokens} tokens exceed the per-key TPM limit ({self.tpm})")
+        max_wait_sec = self.max_wait_sec if max_wait_sec is None else min(max_wait_sec, self.max_wait_sec)
+        give_up_at = time.monotonic() + max_wait_sec
+        waited = False
+        while True:
+            lease, retry_after = await claim_in_thread(self._try_acquire, tokens, undo=self._discard_orphan)
+            if lease is not None:
+                self._counters["acquired"] += 1
+                GEMINI_KEY_EVENTS.inc(key=lease.key_id, event="acquired")
+                return lease
+            remaining = give_up_at - time.monotonic()
+            if retry_after > remaining:
+                self._counters["exhausted"] += 1
+                raise KeyPoolExhausted(
+                    f"All {len(self.keys)} Gemini keys are quarantined or over quota", max(retry_after, 1.0)
+                )
+            if not waited:
+                waited = True
+                self._counters["waits"] += 1
+            await asyncio.sleep(min(max(retry_after, 0.0) + 0.01, self.poll_interval_sec))
+
+    async def release(self, lease: KeyLease, status_code: Optional[int], tokens: Optional[int] = None) -> None:
+        """
+        status_code: 응답 상태 (429 면 키를 격리), None 이면 네트워크 오류/타임아웃 (격리하지 않음)
+        tokens: usageMetadata.totalTokenCount (없으면 예상치를 그대로 둔다)
+        """
+        if status_code == 429:
+            self._counters["quarantines"] += 1
+            GEMINI_KEY_EVENTS.inc(key=lease.key_id, event="quarantined")
+        try:
+            await asyncio.to_thread(self._release, lease, status_code, tokens)
+        except sqlite3.Error as e:
+            # 임대는 lease_sec 뒤에 자동 만료되므로 기록 실패가 호출 결과를 바꾸지는 않는다
+            logger.warning("[KeyPool] release failed: %s", e)
+
+    @property
+    def endpoints(self) -> List[GeminiKey]:
+        # 엔드포인트마다 대표 키 하나 (커넥션 예열용)
+        seen: Dict[str, GeminiKey] = {}
+        for gemini_key in self.keys:
+            seen.setdefault(gemini_key.base, gemini_key)
+        return list(seen.values())
+
+    def _read_stats(self) -> Dict[str, Dict[str, float]]:
+        now = time.time()
+        conn = self._conn()
+        state = self._snapshot(conn, now)
+        return {
+            key_id: {
+                "base": self._by_id[key_id].base,
+                "inFlight": row["in_flight"],
+                "requestsLastMinute": row["requests"],
+                "tokensLastMinute": row["tokens"],
+                "quarantinedForSec": round(max(row["quarantined_until"] - now, 0.0), 1),
+                "strikes": row["strikes"],
+            }
+            for key_id, row in state.items()
+        }
+
+    def stats(self) -> Dict[str, object]:
+        try:
+            keys = self._read_stats()
+        except sqlite3.Error:
+            keys = {}
+        return {**self._counters, "rpm": self.rpm, "tpm": self.tpm, "keys": keys}
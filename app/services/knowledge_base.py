@@ -0,0 +1,158 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.services.token_estimator import estimate_tokens
+
+# 지식 파일에서 기반 지식이 시작/끝나는 헤더
+KNOWLEDGE_START = "## 청약 관련 기반 지식"
+KNOWLEDGE_END = "# Input Data Structure"
+
+# 섹션 제목에 포함된 키워드 → 섹션 key
+SECTION_KEYWORDS = [
+    ("newborn", "신생아"),
+    ("multiChild", "다자녀"),
+    ("newlywed", "신혼부부"),
+    ("firstHome", "생애최초"),
+    ("singleParent", "한부모"),
+    ("supplyRules", "주택공급에 관한 규칙"),
+    ("rank", "청약 순위"),
+    ("housingType", "주택 유형별"),
+    ("score", "가점제"),
+]
+
+_BLOCK_TITLE = re.compile(r"^\[(.+)\]$")
+_NUMBERED_ITEM = re.compile(r"^\d+\.\s+(.+)$")
+
+
+@dataclass(frozen=True)
+class KnowledgeSection:
+    key: str
+    title: str
+    text: str
+    tokens: int
+
+
+def _section_key(title: str) -> Optional[str]:
+    for key, keyword in SECTION_KEYWORDS:
+        if keyword in title:
+            return key
+    return None
+
+
+def _make_section(key: str, title: str, lines: List[str]) -> KnowledgeSection:
+    text = "\n".join(line for line in lines if line.strip())
+    return KnowledgeSection(key=key, title=title, text=text, tokens=estimate_tokens(text))
+
+
+def parse_knowledge(raw: str) -> Dict[str, KnowledgeSection]:
+    """
+    life_cycle_plan.txt 의 '청약 관련 기반 지식' 부분을 섹션 단위로 나눈다.
+    - [ ... ] 제목 블록마다 하나의 섹션
+    - 특별공급 요약 블록은 유형(신생아/다자녀/...)별로 다시 쪼개고, 나머지 줄은 공통 원칙(common)으로 묶는다
+    """
+    start = raw.find(KNOWLEDGE_START)
+    end = raw.find(KNOWLEDGE_END)
+    if start < 0:
+        return {}
+    body = raw[start + len(KNOWLEDGE_START): end if end > start else len(raw)]
+
+    blocks: List[tuple] = []
+    for line in body.splitlines():
+        match = _BLOCK_TITLE.match(line.strip())
+        if match:
+            blocks.append((match.group(1).strip(), []))
+        elif blocks:
+            blocks[-1][1].append(line.rstrip())
+
+    sections: Dict[str, KnowledgeSection] = {}
+    for title, lines in blocks:
+        if "특별공급" not in title:
+            key = _section_key(title)
+            if key is not None:
+                sections[key] = _make_section(key, title, lines)
+            continue
+
+        common: List[str] = []
+        item_title: Optional[str] = None
+        item_lines: List[str] = []
+
+        def flush() -> None:
+            key = _section_key(item_title or "")
+            if key is not None:
+                sections[key] = _make_section(key, item_title, item_lines)
+            else:
+                common.extend(item_lines)
+
+        for line in lines:
+            match = _NUMBERED_ITEM.match(line.strip())
+            if match:
+                if item_title is not None:
+                    flush()
+                item_title, item_lines = match.group(1).strip(), []
+            elif item_title is not None and line.strip():
+                item_lines.append(line)
+            else:
+                if item_title is not None:
+                    flush()
+                    item_title, item_lines = None, []
+                common.append(line)
+        if item_title is not None:
+            flush()
+        sections["common"] = _make_section("common", title, common)
+
+    return sections
+
+
+class KnowledgeBase:
+    """
+    청약 기반 지식을 시작 시 한 번 파싱해 두고, 설문 필드에 해당하는 섹션만 골라 프롬프트에 넣는다.
+    - 공통 원칙 / 공급 기본 원칙 / 가점제는 항상 포함
+    - childCount·fChildCount → 신생아(1명 이상) / 다자녀(2명 이상)
+    - marryStatus·fMarryStatus → 신혼부부 (한부모 + 자녀면 한부모 포함)
+    - hasOwnedHouse 가 false 또는 미기입 → 생애최초
+    - 청약통장 보유 → 청약 순위, targetSubscriptionType 지정 → 주택 유형별 공급 방식
+    """
+
+    ALWAYS = ("common", "supplyRules", "score")
+
+    def __init__(self, sections: Dict[str, KnowledgeSection]):
+        self.sections = sections
+        self.total_tokens = sum(section.tokens for section in sections.values())
+
+    @classmethod
+    def from_file(cls, path: str) -> "KnowledgeBase":
+        if not path or not os.path.exists(path):
+            return cls({})
+        with open(path, encoding="utf-8") as f:
+            return cls(parse_knowledge(f.read()))
+
+    def relevant_keys(self, user_data: Dict[str, Any]) -> List[str]:
+        children = max(int(user_data.get("childCount") or 0), int(user_data.get("fChildCount") or 0))
+        marry_status = user_data.get("marryStatus")
+
+        keys = list(self.ALWAYS)
+        if children >= 1:
+            keys.append("newborn")
+        if children >= 2:
+            keys.append("multiChild")
+        if marry_status == "married" or user_data.get("fMarryStatus") is True:
+            keys.append("newlywed")
+        if marry_status == "divorced_or_widowed" and children >= 1:
+            keys.extend(["newlywed", "singleParent"])
+        if user_data.get("hasOwnedHouse") is not True:
+            keys.append("firstHome")
+        if user_data.get("hasSubscriptionAccount") is not False:
+            keys.append("rank")
+        if user_data.get("targetSubscriptionType"):
+            keys.append("housingType")
+
+        return [key for key in dict.fromkeys(keys) if key in self.sections]
+
+    def select(self, user_data: Dict[str, Any]) -> List[KnowledgeSection]:
+        return [self.sections[key] for key in self.relevant_keys(user_data)]
+
+    @staticmethod
+    def render(sections: List[KnowledgeSection]) -> str:
+        return "\n\n".join(f"[{section.title}]\n{section.text}" for section in sections)
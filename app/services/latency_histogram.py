@@ -0,0 +1,52 @@
+from bisect import bisect_left
+from collections import deque
+from itertools import accumulate
+from typing import Deque, Dict, List, Optional
+
+# 히스토그램 버킷 상한 (초)
+BUCKETS_SEC = (0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180, 300)
+
+
+class LatencyHistogram:
+    """
+    모델별 호출 지연 시간
+    - 버킷 카운트: 지표 노출용. 구간별로 세고 snapshot 에서 누적해 le_<상한> = 상한 이하 호출 수로 보여준다
+    - 최근 window 건: 백분위 계산용 (헤지 지연 시간 등)
+    """
+
+    def __init__(self, window: int = 200):
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._buckets: List[int] = [0] * (len(BUCKETS_SEC) + 1)
+        self.count = 0
+        self.total_sec = 0.0
+
+    def observe(self, latency_sec: float) -> None:
+        self._recent.append(latency_sec)
+        self.count += 1
+        self.total_sec += latency_sec
+        self._buckets[bisect_left(BUCKETS_SEC, latency_sec)] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        index = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    @property
+    def samples(self) -> int:
+        return len(self._recent)
+
+    def snapshot(self) -> Dict[str, object]:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 3) if value is not None else None
+
+        labels = [f"le_{upper}" for upper in BUCKETS_SEC] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean": rounded(self.total_sec / self.count) if self.count else None,
+            "p50": rounded(self.percentile(50)),
+            "p95": rounded(self.percentile(95)),
+            "p99": rounded(self.percentile(99)),
+            "buckets": dict(zip(labels, accumulate(self._buckets))),
+        }
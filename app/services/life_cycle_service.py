@@ -1,80 +1,193 @@
+import asyncio
 import json
 import hashlib
+import logging
+import time
+from contextlib import aclosing
 from pydantic import ValidationError
-from typing import Any, Dict
-from app.schemas.life_cycle_response import LifeCyclePlanResponse
-from app.services.json_sanitizer import extract_json_object
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import PLAN_MODEL_ROUTES, PLAN_OUTCOMES, stage_timer
+from app.schemas.life_cycle import ScenarioGrid
+from app.schemas.life_cycle_response import (
+    LifeCyclePlanResponse,
+    LifeCycleScenarioResponse,
+    ScenarioNarrative,
+    ScenarioProjection,
+)
+from app.services.financial_engine import FinancialFacts, compute_facts, compute_facts_batch
+from app.services.knowledge_base import KnowledgeBase
+from app.services.model_router import ModelRoute, ModelRouter
+from app.services.token_estimator import estimate_tokens
+from app.services.plan_prompt import (
+    SCENARIO_SYSTEM_INSTRUCTION,
+    SYSTEM_INSTRUCTION,
+    compact_json,
+    compact_user_payload,
+    llm_input,
+)
+from app.services.scenarios import (
+    align_comparisons,
+    expand_grid,
+    fallback_narrative,
+    project_scenarios,
+    scenario_table,
+)
+from app.services.structured_output import repair_payload, repair_section, response_schema
+from app.services.json_sanitizer import IncrementalJsonParser, parse_json_object
+from app.services.plan_cache import PlanCache
+from app.services.single_flight import SingleFlight
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.survey_plans import SurveyPlanStore, SurveyPlanVersion
 from app.services.gemini_service import (
     GeminiService,
+    GeminiServiceError,
     GeminiServiceUnavailable,
     GeminiServiceTimeout,
 )
 
+logger = logging.getLogger(__name__)
+
+# 프롬프트/스키마가 바뀌면 올려서 이전 캐시를 무효화한다
+PROMPT_VERSION = "v5"
+
+# LLM 이 아니라 로컬(재무 엔진 / 보고서 렌더러)에서 채우는 필드
+LOCAL_FIELDS = ("report", "chartData", "diagnosis.canBuyWithCheongyak", "planMeta.recommendedHorizon")
+PLAN_RESPONSE_SCHEMA = response_schema(LifeCyclePlanResponse, exclude=LOCAL_FIELDS)
+SCENARIO_RESPONSE_SCHEMA = response_schema(ScenarioNarrative)
+
+
+def canonical_hash(user_data: Dict[str, Any]) -> str:
+    payload_str = json.dumps(user_data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload_str.encode("utf-8")).hexdigest()
+
+
 class LifeCycleService:
-    def __init__(self, gemini: GeminiService, repo):
+    def __init__(
+        self,
+        gemini: GeminiService,
+        repo,
+        cache: Optional[PlanCache] = None,
+        knowledge: Optional[KnowledgeBase] = None,
+        survey_plans: Optional[SurveyPlanStore] = None,
+        router: Optional[ModelRouter] = None,
+    ):
         self.gemini = gemini
         self.repo = repo
+        self.cache = cache
+        self.survey_plans = survey_plans
+        self.router = router
+        self.knowledge = knowledge or KnowledgeBase({})
+        self.single_flight = SingleFlight()
+        self.response_schema = PLAN_RESPONSE_SCHEMA if settings.GEMINI_STRUCTURED_OUTPUT else None
+        # wastedGenerations: 로컬 보정/보정 호출로도 살리지 못해 버려진 전체 생성 수
+        self.output_stats: Dict[str, int] = {
+            "valid": 0,
+            "localRepairs": 0,
+            "repairCalls": 0,
+            "repairCallSuccesses": 0,
+            "wastedGenerations": 0,
+        }
+        self.hedge_stats: Dict[str, int] = {"hedged": 0, "primaryWins": 0, "hedgeWins": 0, "bothFailed": 0}
+        # reused: 같은 surveyId 재제출에서 LLM 입력이 그대로라 저장된 섹션을 재사용한 수
+        self.replan_stats: Dict[str, int] = {"reused": 0, "firstVersions": 0, "materialChanges": 0}
+        # requests 당 scenarios 개의 변형을 LLM 한 번으로 설명한 수 (fallback 은 로컬 비교 설명)
+        self.scenario_stats: Dict[str, int] = {"requests": 0, "scenarios": 0, "llm": 0, "fallback": 0}
 
-    def _build_prompt(self, user_data: dict) -> str:
-        user_info_text = json.dumps(user_data, ensure_ascii=False, indent=2)
-
-        return f"""
-Role
-너는 '청약 자산 설계 에이전트'다. 입력 JSON만을 근거로 한국어로 분석하고, 사전 정의된 JSON 스키마로만 답한다.
-
-Task
-- 사용자의 현황을 진단하고 청약 적합도, 자산 로드맵, 실행 지침, 지역/대출/가산점 포인트를 제시한다.
-- 숫자/지역/직업 등은 입력 JSON 그대로 사용한다. 추측은 금지하며, 부족한 정보는 텍스트에서 보수적으로 언급한다.
-- 표현이 지나치게 정형화되지 않도록 한국어 문장과 어휘를 조금씩 변주하라. 단, 아래 JSON 스키마/키/타입은 반드시 지킨다.
-
-Strict JSON Rules
-1) 반드시 단 하나의 JSON 객체만 출력한다. 코드블록/머리말/주석/설명 문장 금지.
-2) 스키마의 키와 값 타입을 정확히 지킨다. 불리언은 true/false, 숫자는 정수, 문자열은 따옴표로 감싼다.
-3) 추가 키, trailing comma, null 사용 금지. 배열은 최소 1개 이상의 문자열을 넣는다.
-4) 모든 문자열은 한국어 간결 문장으로 작성한다. 투자 권유·확정적 수익 표현 금지.
-5) 출력 문자열에는 JSON 필드명(예: confidenceLevel, recommendedHorizon 등)을 그대로 노출하지 말고, 한국어 설명으로 풀어쓴다.
-
-[사용자 데이터]
-{user_info_text}
-
-[출력 JSON 스키마]
-{{
-  "summary": {{
-    "title": "string",
-    "body": "string"
-  }},
-  "diagnosis": {{
-    "canBuyWithCheongyak": boolean,
-    "confidenceLevel": "HIGH | MEDIUM | LOW",
-    "reasons": ["string"]
-  }},
-  "timeHorizonStrategy": {{
-    "now": "string",
-    "threeYears": "string",
-    "fiveYears": "string"
-  }},
-  "chartData": {{
-    "savingProjectionByYear": [
-      {{ "year": number, "amount": number }}
-    ]
-  }},
-  "planMeta": {{
-    "recommendedHorizon": "SHORT_3 | MID_5 | LONG_10",
-    "reason": "string"
-  }}
-}}
-""".strip()
-    
-    def _build_fallback_plan(self, user_data: Dict[str, Any], reason: str) -> LifeCyclePlanResponse:
-        monthly_saving = int(user_data.get("monthlySavingAmount") or 0)
-        base_assets = int(user_data.get("currentFinancialAssets") or 0) + int(user_data.get("additionalAssets") or 0)
-        district = user_data.get("currentDistrict") or "거주 지역"
+    def _cache_key(self, user_data: Dict[str, Any], model: Optional[str] = None) -> str:
+        # 로컬 렌더링 전용 필드/surveyId 는 키에서 빠지므로, 그 값만 다른 설문은 같은 LLM 결과를 쓴다
+        return f"{PROMPT_VERSION}:{model or settings.GEMINI_MODEL}:{canonical_hash(llm_input(user_data))}"
+
+    def _route(self, user_data: Dict[str, Any], facts: FinancialFacts) -> Optional[ModelRoute]:
+        # 라우터가 없으면 None → GEMINI_MODEL / GEMINI_TIMEOUT_SEC
+        return self.router.route(user_data, facts) if self.router is not None else None
+
+    async def _latest_version(self, user_data: Dict[str, Any]) -> Optional[SurveyPlanVersion]:
+        survey_id = user_data.get("surveyId")
+        if self.survey_plans is None or survey_id is None:
+            return None
+        return await self.survey_plans.latest(survey_id)
+
+    async def _stored_plan(
+        self, cache_key: str, latest: Optional[SurveyPlanVersion]
+    ) -> Optional[Tuple[LifeCyclePlanResponse, str]]:
+        # 1) 같은 surveyId 의 최신 버전과 LLM 입력이 같으면 (로컬 전용 필드만 바뀐 재제출) 그 섹션을 재사용
+        if latest is not None and latest.fingerprint == cache_key:
+            self.replan_stats["reused"] += 1
+            return latest.plan, "version"
+        # 2) 같은 LLM 입력의 캐시
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached, "cache"
+        return None
+
+    async def _record_version(
+        self,
+        user_data: Dict[str, Any],
+        cache_key: str,
+        plan: LifeCyclePlanResponse,
+        latest: Optional[SurveyPlanVersion],
+    ) -> None:
+        # LLM 입력이 달라진 플랜만 새 버전으로 남긴다 (fallback 플랜은 남기지 않는다)
+        survey_id = user_data.get("surveyId")
+        if self.survey_plans is None or survey_id is None:
+            return
+        if latest is not None and latest.fingerprint == cache_key:
+            return
+        saved = await self.survey_plans.save(survey_id, cache_key, llm_input(user_data), plan)
+        if saved is None:
+            return
+        if latest is None:
+            self.replan_stats["firstVersions"] += 1
+            return
+        self.replan_stats["materialChanges"] += 1
+        logger.info(
+            "[PlanVersion] surveyId=%s version=%s changedFields=%s",
+            survey_id, saved.version, saved.changed_fields,
+        )
+
+    def _build_prompt(self, user_data: dict, facts: FinancialFacts) -> str:
+        # 정적 지시문/스키마는 SYSTEM_INSTRUCTION 으로 따로 보내고, 여기서는 요청별 데이터만 만든다
+        facts_text = compact_json(facts.model_dump(exclude={"savingProjectionByYear", "remainingDebtByYear"}))
+        projection_text = ", ".join(
+            f"{p.year}년차 {p.amount:,}원" for p in facts.savingProjectionByYear if p.year in (0, 3, 5, 10)
+        )
+        knowledge_text = self.knowledge.render(self.knowledge.select(user_data)) or "(제공된 기반 지식 없음)"
+
+        return (
+            f"[청약 기반 지식]\n{knowledge_text}\n\n"
+            f"[계산된 재무 지표]\n{facts_text}\n연도별 가용 자산 추정: {projection_text}\n\n"
+            f"[사용자 데이터]\n{compact_json(compact_user_payload(user_data))}"
+        )
+
+    def _log_prompt(self, user_data: Dict[str, Any], prompt: str) -> None:
+        # 토큰 추정이 요청마다 돌지 않도록 DEBUG 일 때만 계산한다
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        sections = self.knowledge.select(user_data)
+        knowledge_tokens = sum(section.tokens for section in sections)
+        # 축약 전 형태(들여쓰기 + null 포함 + 원래 키)와 비교한 사용자 데이터 절감량
+        verbose_payload_tokens = estimate_tokens(json.dumps(user_data, ensure_ascii=False, indent=2))
+        compact_payload_tokens = estimate_tokens(compact_json(compact_user_payload(user_data)))
+        system_tokens = estimate_tokens(SYSTEM_INSTRUCTION)
+        system_cached = self.gemini.context_cache_active
+        logger.debug("[PlanPrompt] %s", {
+            "surveyId": user_data.get("surveyId"),
+            "knowledgeSections": [section.key for section in sections],
+            "knowledgeTokens": knowledge_tokens,
+            "knowledgeTokensSkipped": self.knowledge.total_tokens - knowledge_tokens,
+            "promptTokens": estimate_tokens(prompt),
+            "systemTokens": system_tokens,
+            "systemCached": system_cached,
+            "payloadTokensSaved": verbose_payload_tokens - compact_payload_tokens,
+            "tokensSaved": verbose_payload_tokens - compact_payload_tokens + (system_tokens if system_cached else 0),
+        })
 
-        projection = []
-        running_total = base_assets
-        for year in range(1, 4):
-            running_total += monthly_saving * 12
-            projection.append({"year": year, "amount": running_total})
+    def _build_fallback_plan(
+        self, user_data: Dict[str, Any], reason: str, facts: FinancialFacts
+    ) -> LifeCyclePlanResponse:
+        district = user_data.get("currentDistrict") or "거주 지역"
 
         payload = {
             "summary": {
@@ -82,10 +195,11 @@ Strict JSON Rules
                 "body": f"현재 AI 응답이 지연되어 기본 가이드를 제공합니다. 원인: {reason}",
             },
             "diagnosis": {
-                "canBuyWithCheongyak": False,
+                "canBuyWithCheongyak": facts.canBuyWithCheongyak,
                 "confidenceLevel": "LOW",
                 "reasons": [
                     f"AI 분석 지연/오류: {reason}",
+                    f"현재 추정 청약 가점은 84점 중 {facts.subscriptionScore.total}점입니다.",
                     f"{district} 기준 자금 계획과 청약 자격을 우선 점검하세요.",
                 ],
             },
@@ -94,8 +208,13 @@ Strict JSON Rules
                 "threeYears": "3년 내 월 저축액을 유지·증액하며 청약 가점을 높이는 행동을 이어가세요.",
                 "fiveYears": "5년 시점에 목표 지역의 분양 캘린더와 대출 한도를 점검해 최종 청약을 준비하세요.",
             },
-            "chartData": {"savingProjectionByYear": projection},
-            "planMeta": {"recommendedHorizon": "MID_5", "reason": "LLM 분석 실패 시 기본 5년 중기 플랜을 제시합니다."},
+            "chartData": {"savingProjectionByYear": facts.savingProjectionByYear},
+            "planMeta": {
+                "recommendedHorizon": facts.recommendedHorizon,
+                "reason": "LLM 분석 없이 청약 가점·특별공급 자격·부채 상환 부담을 기준으로 계산한 권장 기간입니다.",
+            },
+            # 실제 보고서는 _ensure_report 에서 생성
+            "report": "보고서 생성 예정",
         }
 
         return LifeCyclePlanResponse(**payload)
@@ -109,8 +228,7 @@ Strict JSON Rules
                 cleaned = cleaned[:-1].rstrip()
             return cleaned
 
-        payload_str = json.dumps(user_data, ensure_ascii=False, sort_keys=True)
-        seed = int(hashlib.sha256(payload_str.encode("utf-8")).hexdigest()[:8], 16)
+        seed = int(canonical_hash(user_data)[:8], 16)
         pick_idx = 0
 
         def pick(options):
@@ -183,39 +301,502 @@ Strict JSON Rules
 
         return "\n".join(sections)
 
+    def _apply_facts(self, parsed: Dict[str, Any], facts: FinancialFacts) -> Dict[str, Any]:
+        # 숫자/판정 필드는 LLM 출력이 아니라 로컬 재무 엔진 값으로 채운다
+        if isinstance(parsed.get("diagnosis"), dict):
+            parsed["diagnosis"]["canBuyWithCheongyak"] = facts.canBuyWithCheongyak
+        if isinstance(parsed.get("planMeta"), dict):
+            parsed["planMeta"]["recommendedHorizon"] = facts.recommendedHorizon
+        parsed["chartData"] = {"savingProjectionByYear": facts.model_dump()["savingProjectionByYear"]}
+        return parsed
+
+    def _finalize(
+        self, plan: LifeCyclePlanResponse, user_data: Dict[str, Any], facts: FinancialFacts
+    ) -> LifeCyclePlanResponse:
+        # 캐시된 플랜도 기준일이 바뀌면 가점/추정치가 달라지므로 응답 직전에 다시 덮어쓴다
+        with stage_timer("finalize"):
+            plan = LifeCyclePlanResponse(**self._apply_facts(plan.model_dump(), facts))
+            return self._ensure_report(plan, user_data)
+
     def _ensure_report(self, plan: LifeCyclePlanResponse, user_data: Dict[str, Any]) -> LifeCyclePlanResponse:
         # 항상 최신 사용자 입력을 반영해 보고서를 새로 작성한다.
         report = self._build_report(plan, user_data)
         return plan.model_copy(update={"report": report})
 
-    def generate_plan(self, user_data: dict) -> LifeCyclePlanResponse:
-        prompt = self._build_prompt(user_data)
-        try:
-            raw_text = self.gemini.generate_text(prompt)
-        except (GeminiServiceUnavailable, GeminiServiceTimeout) as e:
-            fallback = self._build_fallback_plan(user_data, str(e))
+    def _serve_fallback(self, user_data: Dict[str, Any], reason: str, facts: FinancialFacts) -> LifeCyclePlanResponse:
+        PLAN_OUTCOMES.inc(outcome="fallback")
+        with stage_timer("fallback"):
+            fallback = self._build_fallback_plan(user_data, reason, facts)
             fallback = self._ensure_report(fallback, user_data)
-            self.repo.save_record(task="plan", user_data=user_data, question=None, result=fallback.model_dump_json())
-            return fallback
-
-        # 이부분을 없애기
-        cleaned_json = extract_json_object(raw_text)
+        self.repo.save_record(task="plan", user_data=user_data, question=None, result=fallback)
+        return fallback
 
-        try:
-            parsed = json.loads(cleaned_json)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"LLM returned invalid JSON after cleaning: {str(e)} | cleaned={cleaned_json[:200]}")
+    def _validate_plan(self, parsed: Dict[str, Any], facts: FinancialFacts) -> LifeCyclePlanResponse:
+        parsed = self._apply_facts(parsed, facts)
 
         # 보장: report 필드가 없거나 비어있으면 임시 문자열로 채워 검증을 통과시킨 뒤 아래에서 실제 보고서를 생성
         if not isinstance(parsed.get("report"), str) or not parsed.get("report", "").strip():
             parsed["report"] = "보고서 생성 예정"
 
         try:
-            validated = LifeCyclePlanResponse(**parsed)
+            return LifeCyclePlanResponse(**parsed)
         except ValidationError as e:
             raise ValueError(f"LLM JSON schema mismatch: {e}")
 
-        validated = self._ensure_report(validated, user_data)
+    def _parse_plan(self, raw_text: str, facts: FinancialFacts) -> Tuple[LifeCyclePlanResponse, bool]:
+        # 머리말/코드펜스를 건너뛰고 JSON 객체를 한 번에 파싱 (깨진 경우 offset 포함 ValueError)
+        parsed = parse_json_object(raw_text)
+        try:
+            return self._validate_plan(parsed, facts), False
+        except ValueError:
+            # enum 대소문자, 누락 배열 등은 재호출 없이 고친다 (그래도 틀리면 ValueError)
+            return self._validate_plan(repair_payload(LifeCyclePlanResponse, parsed), facts), True
+
+    def _build_repair_prompt(self, raw_text: str, error: Exception) -> str:
+        return (
+            "아래 JSON 을 응답 스키마에 맞게 고쳐 JSON 객체 하나만 출력하라. "
+            "문장 내용은 바꾸지 말고, 빠진 항목은 원문 맥락에 맞는 짧은 한국어 문장으로 채운다.\n\n"
+            f"[검증 오류]\n{str(error)[:1000]}\n\n[원본]\n{raw_text}"
+        )
+
+    async def _parse_or_repair(
+        self, raw_text: str, facts: FinancialFacts, deadline: Optional[float] = None
+    ) -> LifeCyclePlanResponse:
+        try:
+            with stage_timer("parse"):
+                validated, repaired = self._parse_plan(raw_text, facts)
+            self.output_stats["localRepairs" if repaired else "valid"] += 1
+            return validated
+        except ValueError as e:
+            error = e
+
+        # 전체 재생성 대신 저비용 모델로 한 번만 보정한다
+        self.output_stats["repairCalls"] += 1
+        try:
+            with stage_timer("repair_call"):
+                fixed_text = await self.gemini.generate_text(
+                    self._build_repair_prompt(raw_text, error),
+                    retries=1,
+                    response_schema=PLAN_RESPONSE_SCHEMA,
+                    model=settings.GEMINI_REPAIR_MODEL,
+                    deadline=deadline,
+                )
+                validated, _ = self._parse_plan(fixed_text, facts)
+        except (ValueError, GeminiServiceError):
+            self.output_stats["wastedGenerations"] += 1
+            raise error
+        self.output_stats["repairCallSuccesses"] += 1
+        return validated
+
+    async def _generate_validated(
+        self,
+        prompt: str,
+        facts: FinancialFacts,
+        deadline: Optional[float],
+        model: Optional[str] = None,
+        timeout_sec: Optional[float] = None,
+    ) -> LifeCyclePlanResponse:
+        with stage_timer("llm_call"):
+            raw_text = await self.gemini.generate_text(
+                prompt,
+                system_instruction=SYSTEM_INSTRUCTION,
+                response_schema=self.response_schema,
+                model=model,
+                deadline=deadline,
+                timeout_sec=timeout_sec,
+            )
+        return await self._parse_or_repair(raw_text, facts, deadline)
+
+    async def _generate_hedged(
+        self,
+        prompt: str,
+        facts: FinancialFacts,
+        deadline: Optional[float],
+        model: Optional[str] = None,
+        timeout_sec: Optional[float] = None,
+    ) -> LifeCyclePlanResponse:
+        """
+        기본 모델 호출이 hedge_delay 안에 끝나지 않으면 GEMINI_HEDGE_MODEL 로 같은 요청을 한 번 더 보낸다.
+        먼저 검증까지 통과한 쪽을 쓰고 나머지는 취소한다. 둘 다 실패하면 기본 모델의 오류를 올린다.
+        """
+        model = model or settings.GEMINI_MODEL
+        primary = asyncio.create_task(self._generate_validated(prompt, facts, deadline, model, timeout_sec))
+        hedge: Optional[asyncio.Task] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.gemini.hedge_delay(model, deadline))
+            if done:
+                return primary.result()
+
+            self.hedge_stats["hedged"] += 1
+            hedge = asyncio.create_task(
+                self._generate_validated(prompt, facts, deadline, model=settings.GEMINI_HEDGE_MODEL)
+            )
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_stats["primaryWins" if task is primary else "hedgeWins"] += 1
+                        return task.result()
+
+            self.hedge_stats["bothFailed"] += 1
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
 
-        self.repo.save_record(task="plan", user_data=user_data, question=None, result=validated.model_dump_json())
+    async def _request_plan(
+        self,
+        user_data: Dict[str, Any],
+        cache_key: str,
+        facts: FinancialFacts,
+        deadline: Optional[float] = None,
+        route: Optional[ModelRoute] = None,
+    ) -> LifeCyclePlanResponse:
+        # single-flight leader 만 실행: LLM 호출 → 파싱/검증 → 캐시 저장 (report 는 호출자별로 렌더링)
+        with stage_timer("build_prompt"):
+            prompt = self._build_prompt(user_data, facts)
+        self._log_prompt(user_data, prompt)
+        model = route.model if route is not None else None
+        timeout_sec = route.timeout_sec if route is not None else None
+        self._record_route(route)
+        started = time.monotonic()
+        try:
+            # 헤지 모델로 라우팅된 요청은 같은 모델로 다시 보낼 이유가 없으므로 헤지하지 않는다
+            if settings.GEMINI_HEDGE_ENABLED and (model or settings.GEMINI_MODEL) != settings.GEMINI_HEDGE_MODEL:
+                validated = await self._generate_hedged(prompt, facts, deadline, model, timeout_sec)
+            else:
+                validated = await self._generate_validated(prompt, facts, deadline, model, timeout_sec)
+        except Exception:
+            if route is not None:
+                self.router.record_outcome(route, False, time.monotonic() - started)
+            raise
+        if route is not None:
+            self.router.record_outcome(route, True, time.monotonic() - started)
+
+        if self.cache is not None:
+            await self.cache.set(cache_key, validated)
+        return validated
+
+    def _record_route(self, route: Optional[ModelRoute]) -> None:
+        if route is None:
+            return
+        self.router.record_route(route)
+        PLAN_MODEL_ROUTES.inc(model=route.model, tier=route.tier)
+
+    async def _single_flight_plan(
+        self,
+        user_data: Dict[str, Any],
+        cache_key: str,
+        facts: FinancialFacts,
+        deadline: Optional[float],
+        timeout_sec: Optional[float],
+        route: Optional[ModelRoute],
+    ) -> LifeCyclePlanResponse:
+        # 같은 설문이 동시에 들어오면 업스트림 호출은 한 번만 한다
+        return await self.single_flight.do(
+            cache_key,
+            lambda: self._request_plan(user_data, cache_key, facts, deadline, route),
+            timeout=timeout_sec,
+        )
+
+    async def generate_plan(
+        self,
+        user_data: dict,
+        timeout_sec: Optional[float] = None,
+        facts: Optional[FinancialFacts] = None,
+        deadline: Optional[float] = None,
+        admission: Optional[AdmissionController] = None,
+    ) -> LifeCyclePlanResponse:
+        """
+        deadline: time.monotonic() 기준 마감 시각. 업스트림 호출/재시도/대기는 모두 이 안에서 끝나고,
+        시간이 모자라면 재시도 대신 fallback 플랜을 돌려준다.
+        admission: 주어지면 LLM 호출 전에 입장 제어를 거친다. 거절되면 policy 에 따라 fallback 플랜을 주거나
+        AdmissionRejected 를 올린다 (이미 같은 설문을 처리 중이면 결과만 기다리므로 자리를 차지하지 않는다).
+        """
+        if facts is None:
+            with stage_timer("compute_facts"):
+                facts = compute_facts(user_data)
+        with stage_timer("plan_lookup"):
+            route = self._route(user_data, facts)
+            cache_key = self._cache_key(user_data, route.model if route is not None else None)
+            latest = await self._latest_version(user_data)
+            stored = await self._stored_plan(cache_key, latest)
+        if stored is not None:
+            # LLM 호출 없이 재무 지표와 보고서만 최신 입력으로 다시 렌더링
+            PLAN_OUTCOMES.inc(outcome=stored[1])
+            await self._record_version(user_data, cache_key, stored[0], latest)
+            return self._finalize(stored[0], user_data, facts)
+
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0.0)
+            timeout_sec = remaining if timeout_sec is None else min(timeout_sec, remaining)
+
+        try:
+            if admission is None or self.single_flight.inflight(cache_key):
+                validated = await self._single_flight_plan(user_data, cache_key, facts, deadline, timeout_sec, route)
+            else:
+                async with admission.admit(deadline, route.model if route is not None else None):
+                    validated = await self._single_flight_plan(user_data, cache_key, facts, deadline, timeout_sec, route)
+        except AdmissionRejected as e:
+            if not admission.fallback:
+                raise
+            return self._serve_fallback(user_data, f"요청이 많아 대기 시간 초과 예상 ({e})", facts)
+        except asyncio.TimeoutError:
+            return self._serve_fallback(user_data, f"응답 대기 시간 {timeout_sec:.0f}초 초과", facts)
+        except (GeminiServiceUnavailable, GeminiServiceTimeout) as e:
+            return self._serve_fallback(user_data, str(e), facts)
+
+        PLAN_OUTCOMES.inc(outcome="llm")
+        await self._record_version(user_data, cache_key, validated, latest)
+        validated = self._finalize(validated, user_data, facts)
+
+        self.repo.save_record(task="plan", user_data=user_data, question=None, result=validated)
         return validated
+
+    def _plan_events(self, plan: LifeCyclePlanResponse) -> list:
+        dumped = plan.model_dump()
+        events = [(name, dumped[name]) for name in LifeCyclePlanResponse.model_fields if name != "report"]
+        events.append(("report", {"report": plan.report}))
+        return events
+
+    async def stream_plan(self, user_data: dict, deadline: Optional[float] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        플랜을 섹션 단위로 (event, data) 로 흘려보낸다.
+        - LLM 이 최상위 섹션(summary, diagnosis, ...)을 닫고 검증을 통과하는 즉시 전송
+        - 마지막에 로컬에서 렌더링한 report 를 보내고 done 으로 끝난다
+        """
+        with stage_timer("compute_facts"):
+            facts = compute_facts(user_data)
+        with stage_timer("plan_lookup"):
+            route = self._route(user_data, facts)
+            cache_key = self._cache_key(user_data, route.model if route is not None else None)
+            latest = await self._latest_version(user_data)
+            stored = await self._stored_plan(cache_key, latest)
+        if stored is not None:
+            plan, source = stored
+            PLAN_OUTCOMES.inc(outcome=source)
+            await self._record_version(user_data, cache_key, plan, latest)
+            for event in self._plan_events(self._finalize(plan, user_data, facts)):
+                yield event
+            yield "done", {"source": source}
+            return
+
+        # chartData 는 로컬 계산값이라 LLM 응답을 기다리지 않고 먼저 보낸다
+        computed = self._apply_facts({}, facts)
+        chart = LifeCyclePlanResponse.model_fields["chartData"].annotation.model_validate(computed["chartData"])
+        sections: Dict[str, Any] = {"chartData": chart}
+        yield "chartData", chart.model_dump()
+
+        with stage_timer("build_prompt"):
+            prompt = self._build_prompt(user_data, facts)
+        self._log_prompt(user_data, prompt)
+        scanner = IncrementalJsonParser()
+        repaired = False
+        self._record_route(route)
+        started = time.monotonic()
+        chunks = self.gemini.stream_text(
+            prompt,
+            system_instruction=SYSTEM_INSTRUCTION,
+            response_schema=self.response_schema,
+            deadline=deadline,
+            model=route.model if route is not None else None,
+            timeout_sec=route.timeout_sec if route is not None else None,
+        )
+        try:
+            # 오류로 중간에 빠져나와도 업스트림 스트림/리미터 슬롯/키 임대를 바로 반납한다
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if scanner.closed:
+                        # 객체가 닫힌 뒤의 꼬리(finishReason/usageMetadata)는 토큰 정산을 위해 끝까지 읽기만 한다
+                        continue
+                    for name, value in scanner.feed(chunk):
+                        field = LifeCyclePlanResponse.model_fields.get(name)
+                        if field is None or name in ("report", "chartData"):
+                            continue
+                        section = self._apply_facts({name: value}, facts)[name]
+                        try:
+                            validated = field.annotation.model_validate(section)
+                        except ValidationError:
+                            try:
+                                validated = field.annotation.model_validate(
+                                    repair_section(LifeCyclePlanResponse, name, section)
+                                )
+                            except ValidationError as e:
+                                raise ValueError(f"LLM JSON schema mismatch in '{name}': {e}")
+                            repaired = True
+                        sections[name] = validated
+                        yield name, validated.model_dump()
+        except ValueError:
+            # 섹션 스키마 불일치 또는 스트림 중 JSON 깨짐 (JsonStreamError)
+            self.output_stats["wastedGenerations"] += 1
+            if route is not None:
+                self.router.record_outcome(route, False, time.monotonic() - started)
+            raise
+        except (GeminiServiceUnavailable, GeminiServiceTimeout) as e:
+            if route is not None:
+                self.router.record_outcome(route, False, time.monotonic() - started)
+            if len(sections) > 1:
+                # 이미 LLM 섹션을 보낸 뒤라면 fallback 으로 덮어쓰지 않는다
+                raise
+            fallback = self._serve_fallback(user_data, str(e), facts)
+            for event in self._plan_events(fallback):
+                if event[0] != "chartData":
+                    yield event
+            yield "done", {"source": "fallback"}
+            return
+
+        try:
+            validated = LifeCyclePlanResponse(**sections, report="보고서 생성 예정")
+        except ValidationError as e:
+            self.output_stats["wastedGenerations"] += 1
+            if route is not None:
+                self.router.record_outcome(route, False, time.monotonic() - started)
+            raise ValueError(f"LLM JSON schema mismatch: {e}")
+        if route is not None:
+            self.router.record_outcome(route, True, time.monotonic() - started)
+        self.output_stats["localRepairs" if repaired else "valid"] += 1
+        PLAN_OUTCOMES.inc(outcome="llm")
+
+        if self.cache is not None:
+            await self.cache.set(cache_key, validated)
+        await self._record_version(user_data, cache_key, validated, latest)
+
+        with stage_timer("finalize"):
+            validated = self._ensure_report(validated, user_data)
+        yield "report", {"report": validated.report}
+
+        self.repo.save_record(task="plan", user_data=user_data, question=None, result=validated)
+        yield "done", {"source": "llm"}
+
+    def _build_scenario_prompt(self, user_data: Dict[str, Any], table: str) -> str:
+        knowledge_text = self.knowledge.render(self.knowledge.select(user_data)) or "(제공된 기반 지식 없음)"
+        return (
+            f"[청약 기반 지식]\n{knowledge_text}\n\n"
+            f"[시나리오 비교표]\n{table}\n\n"
+            f"[사용자 데이터]\n{compact_json(compact_user_payload(user_data))}"
+        )
+
+    async def _request_narrative(self, prompt: str, deadline: Optional[float]) -> ScenarioNarrative:
+        with stage_timer("llm_call"):
+            raw_text = await self.gemini.generate_text(
+                prompt,
+                system_instruction=SCENARIO_SYSTEM_INSTRUCTION,
+                response_schema=SCENARIO_RESPONSE_SCHEMA if settings.GEMINI_STRUCTURED_OUTPUT else None,
+                deadline=deadline,
+            )
+        with stage_timer("parse"):
+            parsed = parse_json_object(raw_text)
+            try:
+                return ScenarioNarrative(**repair_payload(ScenarioNarrative, parsed))
+            except ValidationError as e:
+                raise ValueError(f"LLM JSON schema mismatch: {e}")
+
+    async def compare_scenarios(
+        self,
+        user_data: dict,
+        grid: ScenarioGrid,
+        deadline: Optional[float] = None,
+        admission: Optional[AdmissionController] = None,
+    ) -> LifeCycleScenarioResponse:
+        """
+        기준 설문에 grid 의 값 조합을 덮어쓴 시나리오들을 한 번에 비교한다.
+        - 저축 추정/가점/자격은 모든 시나리오를 compute_facts_batch 한 번으로 계산
+        - 비교 설명은 시나리오 수와 상관없이 LLM 한 번 (같은 비교가 동시에 들어오면 single-flight 로 합친다)
+        - LLM 이 실패하거나 입장 제어에 걸리면 계산값만으로 만든 비교 설명을 준다 (policy=reject 면 AdmissionRejected)
+        """
+        with stage_timer("compute_facts"):
+            projections = project_scenarios(user_data, expand_grid(grid))
+        self.scenario_stats["requests"] += 1
+        self.scenario_stats["scenarios"] += len(projections)
+
+        with stage_timer("build_prompt"):
+            table = scenario_table(projections)
+            prompt = self._build_scenario_prompt(user_data, table)
+        flight_key = f"{PROMPT_VERSION}:scenarios:{canonical_hash({'user': llm_input(user_data), 'table': table})}"
+        timeout_sec = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+        def request() -> Awaitable[ScenarioNarrative]:
+            return self.single_flight.do(
+                flight_key, lambda: self._request_narrative(prompt, deadline), timeout=timeout_sec
+            )
+
+        try:
+            if admission is None or self.single_flight.inflight(flight_key):
+                narrative = await request()
+            else:
+                async with admission.admit(deadline):
+                    narrative = await request()
+            narrative = align_comparisons(narrative, projections)
+            self.scenario_stats["llm"] += 1
+            PLAN_OUTCOMES.inc(outcome="llm")
+        except AdmissionRejected as e:
+            if not admission.fallback:
+                raise
+            narrative = self._scenario_fallback(projections, f"요청이 많아 대기 시간 초과 예상 ({e})")
+        except asyncio.TimeoutError:
+            narrative = self._scenario_fallback(projections, f"응답 대기 시간 {timeout_sec:.0f}초 초과")
+        except (GeminiServiceUnavailable, GeminiServiceTimeout) as e:
+            narrative = self._scenario_fallback(projections, str(e))
+        except ValueError as e:
+            # 숫자는 이미 계산돼 있으므로 설명이 깨졌다고 요청 전체를 실패시키지 않는다
+            self.output_stats["wastedGenerations"] += 1
+            logger.warning("[Scenarios] invalid narrative: %s", e)
+            narrative = self._scenario_fallback(projections, "AI 응답 형식 오류")
+
+        result = LifeCycleScenarioResponse(scenarios=projections, narrative=narrative)
+        self.repo.save_record(task="scenarios", user_data=user_data, question=None, result=result)
+        return result
+
+    def _scenario_fallback(self, projections: List[ScenarioProjection], reason: str) -> ScenarioNarrative:
+        self.scenario_stats["fallback"] += 1
+        PLAN_OUTCOMES.inc(outcome="fallback")
+        with stage_timer("fallback"):
+            return fallback_narrative(projections, reason)
+
+    async def generate_plans(
+        self, user_datas: List[dict], concurrency: int, item_budget_sec: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, Optional[LifeCyclePlanResponse], Optional[Exception]]]:
+        """
+        여러 설문을 동시성 제한 하에 처리하고, 끝나는 순서대로 (index, plan, error) 를 돌려준다.
+        - 같은 설문은 한 번만 생성해 모든 index 에 나눠준다
+        - item_budget_sec 가 있으면 각 설문은 처리를 시작한 시점부터 그만큼의 시간 예산을 갖는다
+        - 한 건의 실패는 해당 index 의 error 로만 전달되고 배치를 중단시키지 않는다
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, user_data in enumerate(user_datas):
+            groups.setdefault(canonical_hash(user_data), []).append(index)
+        # 재무 지표는 배치 전체를 한 번의 벡터 연산으로 계산해 둔다
+        leaders = [indices[0] for indices in groups.values()]
+        facts_by_index = dict(zip(leaders, compute_facts_batch([user_datas[i] for i in leaders])))
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for indices in groups.values():
+            pending.put_nowait(indices)
+        done: asyncio.Queue = asyncio.Queue()
+
+        async def worker() -> None:
+            while True:
+                try:
+                    indices = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    deadline = time.monotonic() + item_budget_sec if item_budget_sec else None
+                    plan = await self.generate_plan(
+                        user_datas[indices[0]], facts=facts_by_index[indices[0]], deadline=deadline
+                    )
+                    done.put_nowait((indices, plan, None))
+                except Exception as e:
+                    done.put_nowait((indices, None, e))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(groups)))]
+        try:
+            for _ in range(len(groups)):
+                indices, plan, error = await done.get()
+                for index in indices:
+                    yield index, plan, error
+        finally:
+            for task in workers:
+                task.cancel()
@@ -0,0 +1,142 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.services.financial_engine import FinancialFacts
+from app.services.latency_histogram import LatencyHistogram
+
+LIGHT = "light"
+DEFAULT = "default"
+
+# 특성별 가중치 (MODEL_ROUTER_WEIGHTS 로 일부만 덮어쓸 수 있다)
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "debt": 2,               # 대출 보유 (상환 계획과 저축 배분을 함께 판단해야 함)
+    "highDebtRatio": 1,      # DSR 40% 초과
+    "married": 1,
+    "children": 1,
+    "familyPlan": 1,         # f* 필드로 들어온 향후 변화 1건당
+    "supportingParents": 1,
+    "ownsHouse": 1,          # 유주택자 (청약 자격/처분 조건 판단)
+    "subscriptionAccount": 1,
+    "extraSupplyPath": 1,    # 특별공급 경로가 여러 개일 때 첫 경로를 뺀 1건당
+    "missingField": 1,       # 핵심 필드 누락 1건당 (추정이 필요한 만큼 어려워짐)
+}
+
+FAMILY_PLAN_KEYS = ("fMarryStatus", "fChildCount", "fIsDoubleIncome", "fIsSupportingParents", "fSubscriptionStartDate")
+CORE_KEYS = ("age", "marryStatus", "annualIncome", "monthlySavingAmount", "hasOwnedHouse", "currentFinancialAssets")
+SUPPLY_PATHS = ("newborn", "multiChild", "newlywed", "firstHome")
+
+
+@dataclass
+class ModelRoute:
+    model: str
+    timeout_sec: float
+    tier: str
+    score: float
+    features: Dict[str, int] = field(default_factory=dict)
+
+
+def survey_features(user_data: Dict[str, Any], facts: FinancialFacts) -> Dict[str, int]:
+    # 가중치를 곱하기 전의 특성 개수 (0 인 특성은 뺀다)
+    eligibility = facts.eligibility.model_dump()
+    future = facts.futureEligibility.model_dump()
+    paths = sum(1 for name in SUPPLY_PATHS if eligibility.get(name) or future.get(name))
+    counts = {
+        "debt": int(user_data.get("hasDebt") is True),
+        "highDebtRatio": int(facts.debtServiceRatio > 0.4),
+        "married": int(user_data.get("marryStatus") in ("married", "divorced_or_widowed")),
+        "children": int((user_data.get("childCount") or 0) > 0),
+        "familyPlan": sum(1 for key in FAMILY_PLAN_KEYS if user_data.get(key) not in (None, False, 0, "")),
+        "supportingParents": int(user_data.get("isSupportingParents") is True),
+        "ownsHouse": int(user_data.get("hasOwnedHouse") is True),
+        "subscriptionAccount": int(user_data.get("hasSubscriptionAccount") is True),
+        "extraSupplyPath": max(paths - 1, 0),
+        "missingField": sum(1 for key in CORE_KEYS if user_data.get(key) is None),
+    }
+    return {name: count for name, count in counts.items() if count}
+
+
+def parse_weights(raw: str) -> Dict[str, float]:
+    # 빈 문자열이면 기본값, JSON 객체면 해당 특성만 덮어쓴다 (모르는 특성 이름은 오류)
+    weights = dict(DEFAULT_WEIGHTS)
+    if not raw:
+        return weights
+    overrides = json.loads(raw)
+    unknown = set(overrides) - set(weights)
+    if unknown:
+        raise ValueError(f"Unknown MODEL_ROUTER_WEIGHTS features: {sorted(unknown)}")
+    weights.update({name: float(value) for name, value in overrides.items()})
+    return weights
+
+
+class ModelRouter:
+    """
+    설문 복잡도 점수로 플랜 생성 모델/타임아웃을 고른다
+    - score = Σ 가중치 × 특성 개수 (survey_features)
+    - score <= light_max_score 이면 light_model (단순한 프로필), 아니면 default_model
+    - 모델/단계별 선택 수, 점수 분포, 결과(성공/실패)와 지연을 모아 임계값 조정에 쓴다
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        default_timeout_sec: float,
+        light_model: str,
+        light_timeout_sec: float,
+        light_max_score: float,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.default_model = default_model
+        self.default_timeout_sec = default_timeout_sec
+        self.light_model = light_model
+        self.light_timeout_sec = light_timeout_sec
+        self.light_max_score = light_max_score
+        self.weights = weights or dict(DEFAULT_WEIGHTS)
+        self._routed: Dict[str, int] = {}
+        self._scores: Dict[str, int] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[str, LatencyHistogram] = {}
+
+    def score(self, features: Dict[str, int]) -> float:
+        return sum(self.weights.get(name, 0.0) * count for name, count in features.items())
+
+    def route(self, user_data: Dict[str, Any], facts: FinancialFacts) -> ModelRoute:
+        features = survey_features(user_data, facts)
+        score = self.score(features)
+        if score <= self.light_max_score:
+            return ModelRoute(self.light_model, self.light_timeout_sec, LIGHT, score, features)
+        return ModelRoute(self.default_model, self.default_timeout_sec, DEFAULT, score, features)
+
+    def record_route(self, route: ModelRoute) -> None:
+        # 캐시/버전 적중은 모델을 부르지 않으므로 실제 LLM 호출로 이어진 경우에만 센다
+        key = f"{route.tier}:{route.model}"
+        self._routed[key] = self._routed.get(key, 0) + 1
+        bucket = str(int(route.score))
+        self._scores[bucket] = self._scores.get(bucket, 0) + 1
+
+    def record_outcome(self, route: ModelRoute, ok: bool, latency_sec: float) -> None:
+        key = f"{route.tier}:{route.model}"
+        outcomes = self._outcomes.setdefault(key, {"ok": 0, "failed": 0})
+        outcomes["ok" if ok else "failed"] += 1
+        if ok:
+            self._latency.setdefault(key, LatencyHistogram()).observe(latency_sec)
+
+    def stats(self) -> Dict[str, Any]:
+        routes: List[Dict[str, Any]] = []
+        for key, count in sorted(self._routed.items()):
+            tier, _, model = key.partition(":")
+            latency = self._latency.get(key)
+            snapshot = latency.snapshot() if latency is not None else {}
+            routes.append({
+                "tier": tier,
+                "model": model,
+                "routed": count,
+                **self._outcomes.get(key, {"ok": 0, "failed": 0}),
+                "p50": snapshot.get("p50"),
+                "p95": snapshot.get("p95"),
+            })
+        return {
+            "lightMaxScore": self.light_max_score,
+            "routes": routes,
+            "scoreHistogram": dict(sorted(self._scores.items(), key=lambda item: int(item[0]))),
+        }
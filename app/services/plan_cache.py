@@ -0,0 +1,187 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas.life_cycle_response import LifeCyclePlanResponse
+
+
+class PlanCache:
+    """
+    2단 플랜 캐시
+    - 1단: 워커 프로세스 내부 LRU (TTL 포함)
+    - 2단: 같은 컨테이너의 gunicorn 워커들이 공유하는 로컬 SQLite 파일
+    저장 값은 report 를 제외한 LLM 결과이며, report 는 조회 후 항상 다시 렌더링한다.
+    디스크 정리(만료/초과분 삭제)는 쓰기마다가 아니라 워커당 prune_every 번 쓸 때마다 한다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_sec: float,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+        prune_every: int = 100,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self.prune_every = max(prune_every, 1)
+        self._writes_since_prune = 0
+
+        self._memory: "OrderedDict[str, Tuple[float, LifeCyclePlanResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "disk_errors": 0,
+            "invalid_entries": 0,
+        }
+
+        if self.db_path:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._init_db()
+
+    # ---------- SQLite ----------
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 커넥션은 스레드 간 공유하지 않는다 (to_thread 로 호출됨)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS plan_cache ("
+            " key TEXT PRIMARY KEY,"
+            " plan_json TEXT NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ")"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS idx_plan_cache_expires ON plan_cache (expires_at)")
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, LifeCyclePlanResponse]]:
+        try:
+            row = self._conn().execute(
+                "SELECT plan_json, expires_at FROM plan_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            self._incr("disk_errors")
+            return None
+        if row is None:
+            return None
+
+        plan_json, expires_at = row
+        if expires_at <= time.time():
+            self._incr("expirations")
+            return None
+        try:
+            return expires_at, LifeCyclePlanResponse.model_validate_json(plan_json)
+        except ValidationError:
+            # 이전 스키마로 저장된 행은 미스로 보고 지운다
+            self._incr("invalid_entries")
+            try:
+                self._conn().execute("DELETE FROM plan_cache WHERE key = ?", (key,))
+            except sqlite3.Error:
+                self._incr("disk_errors")
+            return None
+
+    def _disk_set(self, key: str, plan: LifeCyclePlanResponse, expires_at: float) -> None:
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO plan_cache (key, plan_json, expires_at) VALUES (?, ?, ?)",
+                (key, plan.model_dump_json(), expires_at),
+            )
+            with self._lock:
+                self._writes_since_prune += 1
+                due = self._writes_since_prune >= self.prune_every
+                if due:
+                    self._writes_since_prune = 0
+            if due:
+                self._disk_prune(conn)
+        except sqlite3.Error:
+            self._incr("disk_errors")
+
+    def _disk_prune(self, conn: sqlite3.Connection) -> None:
+        removed = conn.execute("DELETE FROM plan_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM plan_cache").fetchone()[0] - self.max_disk_entries
+        if overflow > 0:
+            removed += conn.execute(
+                "DELETE FROM plan_cache WHERE key IN ("
+                " SELECT key FROM plan_cache ORDER BY expires_at ASC LIMIT ?"
+                ")",
+                (overflow,),
+            ).rowcount
+        if removed > 0:
+            self._incr("evictions", removed)
+
+    # ---------- 메모리 LRU ----------
+    def _incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _memory_get(self, key: str) -> Optional[LifeCyclePlanResponse]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, plan = entry
+            if expires_at <= time.time():
+                del self._memory[key]
+                self._counters["expirations"] += 1
+                return None
+            self._memory.move_to_end(key)
+            self._counters["memory_hits"] += 1
+            return plan
+
+    def _memory_set(self, key: str, plan: LifeCyclePlanResponse, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, plan)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    # ---------- 공개 API ----------
+    async def get(self, key: str) -> Optional[LifeCyclePlanResponse]:
+        plan = self._memory_get(key)
+        if plan is not None:
+            return plan
+
+        if self.db_path:
+            found = await asyncio.to_thread(self._disk_get, key)
+            if found is not None:
+                expires_at, plan = found
+                self._memory_set(key, plan, expires_at)
+                self._incr("disk_hits")
+                return plan
+
+        self._incr("misses")
+        return None
+
+    async def set(self, key: str, plan: LifeCyclePlanResponse) -> None:
+        expires_at = time.time() + self.ttl_sec
+        self._memory_set(key, plan, expires_at)
+        if self.db_path:
+            await asyncio.to_thread(self._disk_set, key, plan, expires_at)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+        return stats
@@ -0,0 +1,317 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.schemas.life_cycle_response import LifeCyclePlanResponse
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def _new_owner_id() -> str:
+    # 컨테이너를 다시 띄우면 워커 PID 가 그대로 재사용되므로 PID 대신 프로세스마다 새 id 를 쓴다
+    return f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+
+
+class PlanJobQueue:
+    """
+    비동기 플랜 작업 큐
+    - submit 은 작업을 SQLite 에 기록하고 워커 내 bounded 대기열에 넣은 뒤 바로 id 를 돌려준다
+    - gunicorn 워커마다 workers 개의 asyncio 작업자가 대기열을 소비한다 (Gemini 호출은 I/O 대기라 프로세스 풀이 필요 없다)
+    - 상태/결과는 같은 컨테이너의 워커들이 공유하는 SQLite 에 남으므로 조회는 어느 워커로 가도 된다
+    - 각 워커는 heartbeat_sec 마다 자기 owner id 의 heartbeat 를 남기고, 3 × heartbeat_sec 넘게 소식이 없는
+      owner 의 queued/running 작업을 가져와 다시 실행한다 (start 시 + heartbeat 마다, 대기열 빈 자리만큼)
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        run: Callable[[Dict[str, Any]], Awaitable[LifeCyclePlanResponse]],
+        describe_error: Callable[[Exception], Dict[str, Any]],
+        workers: int = 4,
+        max_queued: int = 500,
+        ttl_sec: float = 86400,
+        poll_interval_sec: float = 0.5,
+        heartbeat_sec: float = 10.0,
+    ):
+        self.db_path = db_path
+        self.run = run
+        self.describe_error = describe_error
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl_sec = ttl_sec
+        self.poll_interval_sec = poll_interval_sec
+        self.heartbeat_sec = heartbeat_sec
+
+        self._pid = os.getpid()
+        self._owner = _new_owner_id()
+        self._local = threading.local()
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_queued)
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # 이 워커가 실행 중인 작업의 완료 이벤트 (long-poll 대기자를 바로 깨운다)
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "recovered": 0,
+        }
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._init_db()
+
+    # ---------- SQLite ----------
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 커넥션은 스레드 간 공유하지 않는다 (to_thread 로 호출됨)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS plan_jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " owner_pid INTEGER NOT NULL,"
+            " owner TEXT NOT NULL DEFAULT '',"
+            " request_json TEXT NOT NULL,"
+            " result_json TEXT,"
+            " error_json TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL"
+            ")"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(plan_jobs)")}
+        if "owner" not in columns:
+            # owner 가 빈 이전 작업은 heartbeat 가 없으므로 회수 대상이 된다
+            conn.execute("ALTER TABLE plan_jobs ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_plan_jobs_status ON plan_jobs (status, finished_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS plan_job_owners ("
+            " owner TEXT PRIMARY KEY,"
+            " pid INTEGER NOT NULL,"
+            " heartbeat_at REAL NOT NULL"
+            ")"
+        )
+
+    def _heartbeat(self) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO plan_job_owners (owner, pid, heartbeat_at) VALUES (?, ?, ?)",
+            (self._owner, self._pid, now),
+        )
+        conn.execute("DELETE FROM plan_job_owners WHERE heartbeat_at <= ?", (now - self.ttl_sec,))
+
+    def _insert(self, job_id: str, user_data: Dict[str, Any], now: float) -> None:
+        self._conn().execute(
+            "INSERT INTO plan_jobs (id, status, owner_pid, owner, request_json, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, self._pid, self._owner, json.dumps(user_data, ensure_ascii=False), now),
+        )
+
+    def _mark_running(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._conn()
+        conn.execute(
+            "UPDATE plan_jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, time.time(), job_id)
+        )
+        row = conn.execute("SELECT request_json FROM plan_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _mark_finished(
+        self, job_id: str, status: str, result_json: Optional[str], error: Optional[Dict[str, Any]]
+    ) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "UPDATE plan_jobs SET status = ?, result_json = ?, error_json = ?, finished_at = ? WHERE id = ?",
+            (status, result_json, json.dumps(error, ensure_ascii=False) if error else None, now, job_id),
+        )
+        conn.execute(
+            "DELETE FROM plan_jobs WHERE status IN (?, ?) AND finished_at <= ?", (*FINISHED, now - self.ttl_sec)
+        )
+
+    def _claim_orphans(self, limit: int) -> List[str]:
+        # heartbeat 가 끊긴 owner 의 미완료 작업을 최대 limit 개 가져온다. owner 조건으로 워커 간 중복 회수를 막는다
+        if limit <= 0:
+            return []
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT j.id, j.owner FROM plan_jobs j LEFT JOIN plan_job_owners o ON o.owner = j.owner"
+            " WHERE j.status IN (?, ?) AND j.owner != ? AND (o.heartbeat_at IS NULL OR o.heartbeat_at <= ?)"
+            " ORDER BY j.created_at LIMIT ?",
+            (QUEUED, RUNNING, self._owner, time.time() - 3 * self.heartbeat_sec, limit),
+        ).fetchall()
+        claimed: List[str] = []
+        for job_id, owner in rows:
+            cursor = conn.execute(
+                "UPDATE plan_jobs SET status = ?, owner_pid = ?, owner = ?, started_at = NULL"
+                " WHERE id = ? AND owner = ? AND status IN (?, ?)",
+                (QUEUED, self._pid, self._owner, job_id, owner, QUEUED, RUNNING),
+            )
+            if cursor.rowcount:
+                claimed.append(job_id)
+        return claimed
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT status, result_json, error_json, created_at, started_at, finished_at FROM plan_jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        status, result_json, error_json, created_at, started_at, finished_at = row
+        return {
+            "jobId": job_id,
+            "status": status,
+            "createdAt": created_at,
+            "startedAt": started_at,
+            "finishedAt": finished_at,
+            "plan": json.loads(result_json) if result_json else None,
+            "error": json.loads(error_json) if error_json else None,
+        }
+
+    def _count_by_status(self) -> Dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM plan_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    # ---------- 작업자 ----------
+    async def _execute(self, job_id: str) -> None:
+        try:
+            user_data = await asyncio.to_thread(self._mark_running, job_id)
+            if user_data is None:
+                return
+            try:
+                plan = await self.run(user_data)
+            except asyncio.CancelledError:
+                # 종료 중: running 으로 남겨 두면 heartbeat 가 끊긴 뒤 다른 워커가 회수한다
+                raise
+            except Exception as e:
+                self._counters["failed"] += 1
+                await asyncio.to_thread(self._mark_finished, job_id, FAILED, None, self.describe_error(e))
+            else:
+                self._counters["succeeded"] += 1
+                await asyncio.to_thread(self._mark_finished, job_id, SUCCEEDED, plan.model_dump_json(), None)
+        finally:
+            # 기록에 실패해도 이벤트는 정리한다 (long-poll 대기자는 깨어나 SQLite 상태를 다시 읽는다)
+            event = self._done_events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._execute(job_id)
+            except Exception:
+                # SQLite 오류 등으로 작업자가 죽지 않도록 로그만 남긴다
+                logger.exception("[PlanJob] worker error jobId=%s", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _recover(self) -> None:
+        claimed = await asyncio.to_thread(self._claim_orphans, self.max_queued - self._queue.qsize())
+        for job_id in claimed:
+            self._done_events[job_id] = asyncio.Event()
+            self._queue.put_nowait(job_id)
+            self._counters["recovered"] += 1
+        if claimed:
+            logger.info("[PlanJob] recovered %d orphaned jobs", len(claimed))
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_sec)
+            try:
+                await asyncio.to_thread(self._heartbeat)
+                await self._recover()
+            except sqlite3.Error:
+                logger.exception("[PlanJob] heartbeat failed")
+
+    # ---------- 공개 API ----------
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        # gunicorn 이 fork 한 뒤 실행되므로 owner id 는 여기서 새로 정한다
+        self._pid = os.getpid()
+        self._owner = _new_owner_id()
+        # 대기열은 서빙 이벤트 루프에 묶이므로 여기서 만든다
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        await asyncio.to_thread(self._heartbeat)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        await self._recover()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self) -> None:
+        tasks = self._tasks + ([self._heartbeat_task] if self._heartbeat_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat_task = None
+
+    async def submit(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        if self._queue.full():
+            self._counters["rejected"] += 1
+            raise JobQueueFull(f"Plan job queue is full ({self.max_queued} queued)")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        await asyncio.to_thread(self._insert, job_id, user_data, now)
+        self._done_events[job_id] = asyncio.Event()
+        self._queue.put_nowait(job_id)
+        self._counters["submitted"] += 1
+        return {"jobId": job_id, "status": QUEUED, "createdAt": now}
+
+    async def get(self, job_id: str, wait_sec: float = 0.0) -> Optional[Dict[str, Any]]:
+        """wait_sec > 0 이면 작업이 끝나거나 wait_sec 이 지날 때까지 기다린다 (long-poll)"""
+        deadline = time.monotonic() + max(wait_sec, 0.0)
+        while True:
+            job = await asyncio.to_thread(self._read, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+
+            # 이 워커의 작업이면 완료 이벤트로 바로 깨고, 다른 워커의 작업은 폴링으로 확인한다
+            event = self._done_events.get(job_id)
+            try:
+                if event is not None:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                else:
+                    await asyncio.sleep(min(self.poll_interval_sec, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            by_status = self._count_by_status()
+        except sqlite3.Error:
+            by_status = {}
+        return {
+            "workers": len(self._tasks),
+            "local_queue_depth": self._queue.qsize(),
+            "max_queued": self.max_queued,
+            "by_status": by_status,
+            **self._counters,
+        }
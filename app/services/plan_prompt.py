@@ -0,0 +1,144 @@
+import json
+from typing import Any, Dict
+
+# 사용자 페이로드 축약 키 (범례는 SYSTEM_INSTRUCTION 에 한 번만 싣는다)
+SHORT_KEYS = {
+    "age": "age",
+    "marryStatus": "ms",
+    "fMarryStatus": "fMs",
+    "childCount": "ch",
+    "fChildCount": "fCh",
+    "isDoubleIncome": "dbl",
+    "fIsDoubleIncome": "fDbl",
+    "willContinueDoubleIncome": "dblKeep",
+    "currentDistrict": "dist",
+    "isHouseholder": "hh",
+    "hasOwnedHouse": "owned",
+    "unhousedStartYear": "unhousedY",
+    "isSupportingParents": "par",
+    "fIsSupportingParents": "fPar",
+    "jobTitle": "job",
+    "jobDistrict": "jobDist",
+    "annualIncome": "inc",
+    "annualSideIncome": "sideInc",
+    "monthlySavingAmount": "save",
+    "currentFinancialAssets": "assets",
+    "additionalAssets": "addAssets",
+    "targetSavingRate": "saveRate",
+    "hasDebt": "debt",
+    "debtType": "debtType",
+    "debtPrincipal": "debtAmt",
+    "debtInterestRateBand": "debtRate",
+    "debtPrincipalPaid": "debtPaid",
+    "monthlyDebtPayment": "debtPay",
+    "hasSubscriptionAccount": "acct",
+    "subscriptionStartDate": "acctStart",
+    "fSubscriptionStartDate": "fAcctStart",
+    "monthlySubscriptionAmount": "acctPay",
+    "totalSubscriptionBalance": "acctBal",
+    "targetSubscriptionType": "subType",
+    "preferredRegion": "region",
+}
+
+# LLM 분석에 쓰이지 않는 필드
+OMIT_KEYS = {"surveyId"}
+# 보고서 렌더러(_build_report)만 쓰는 필드: 프롬프트에 넣지 않으므로 바뀌어도 LLM 을 다시 부르지 않는다
+LOCAL_ONLY_KEYS = {"preferredHousingSize", "priorityCriteria"}
+
+_KEY_LEGEND = ", ".join(f"{short}={name}" for name, short in SHORT_KEYS.items() if short != name)
+
+# 요청마다 바뀌지 않는 지시문 (Gemini system_instruction / cachedContents 로 한 번만 등록)
+SYSTEM_INSTRUCTION = f"""
+Role
+너는 '청약 자산 설계 에이전트'다. 입력 JSON만을 근거로 한국어로 분석하고, 사전 정의된 JSON 스키마로만 답한다.
+
+Task
+- 사용자의 현황을 진단하고 청약 적합도, 자산 로드맵, 실행 지침, 지역/대출/가산점 포인트를 제시한다.
+- 숫자/지역/직업 등은 입력 JSON 그대로 사용한다. 추측은 금지하며, 부족한 정보는 텍스트에서 보수적으로 언급한다.
+- 청약 제도 설명은 [청약 기반 지식]에 있는 내용만 근거로 사용한다.
+- 자산 추정치, 청약 가점, 특별공급 자격, 청약 가능 여부, 권장 기간은 [계산된 재무 지표]에 이미 계산되어 있다. 직접 다시 계산하지 말고 이 값을 근거로 설명만 작성한다.
+- 표현이 지나치게 정형화되지 않도록 한국어 문장과 어휘를 조금씩 변주하라. 단, 아래 JSON 스키마/키/타입은 반드시 지킨다.
+
+Input
+- [사용자 데이터]는 값이 없는 항목을 뺀 축약 JSON 이다. 키 범례: {_KEY_LEGEND}
+- 'f' 접두 키는 미래 계획(결혼 예정, 계획 자녀 수 등)을 뜻한다.
+
+Strict JSON Rules
+1) 반드시 단 하나의 JSON 객체만 출력한다. 코드블록/머리말/주석/설명 문장 금지.
+2) 스키마의 키와 값 타입을 정확히 지킨다. 불리언은 true/false, 숫자는 정수, 문자열은 따옴표로 감싼다.
+3) 추가 키, trailing comma, null 사용 금지. 배열은 최소 1개 이상의 문자열을 넣는다.
+4) 모든 문자열은 한국어 간결 문장으로 작성한다. 투자 권유·확정적 수익 표현 금지.
+5) 출력 문자열에는 JSON 필드명(예: confidenceLevel, recommendedHorizon 등)이나 입력 축약 키를 그대로 노출하지 말고, 한국어 설명으로 풀어쓴다.
+
+[출력 JSON 스키마]
+{{
+  "summary": {{
+    "title": "string",
+    "body": "string"
+  }},
+  "diagnosis": {{
+    "confidenceLevel": "HIGH | MEDIUM | LOW",
+    "reasons": ["string"]
+  }},
+  "timeHorizonStrategy": {{
+    "now": "string",
+    "threeYears": "string",
+    "fiveYears": "string"
+  }},
+  "planMeta": {{
+    "reason": "string"
+  }}
+}}
+""".strip()
+
+
+# what-if 시나리오 비교용 지시문. 숫자는 모두 로컬에서 계산해 표로 넘기고 LLM 은 비교 설명만 쓴다
+SCENARIO_SYSTEM_INSTRUCTION = f"""
+Role
+너는 '청약 자산 설계 에이전트'다. 한 사용자의 여러 가정(시나리오)을 비교해 한국어로 설명하고, 사전 정의된 JSON 스키마로만 답한다.
+
+Task
+- [시나리오 비교표]의 각 행은 기준 설문에서 일부 값만 바꾼 가정이다. 첫 행(s0)이 현재 설문 그대로의 기준이다.
+- 표의 숫자(월 저축액, 신청 시점 자산, 청약 가점, 특별공급 자격, 청약 가능 여부, 권장 기간)는 이미 계산된 값이다. 다시 계산하지 말고 그대로 인용한다.
+- 기준 대비 무엇이 얼마나 달라지는지, 어떤 가정이 가장 현실적이고 유리한지 설명한다. 청약 제도 설명은 [청약 기반 지식]에 있는 내용만 근거로 한다.
+- comparisons 에는 표의 모든 시나리오를 scenarioId 그대로 한 번씩 넣는다.
+
+Input
+- [사용자 데이터]는 기준 설문의 축약 JSON 이다. 키 범례: {_KEY_LEGEND}
+
+Strict JSON Rules
+1) 반드시 단 하나의 JSON 객체만 출력한다. 코드블록/머리말/주석/설명 문장 금지.
+2) 스키마의 키와 값 타입을 정확히 지킨다. 추가 키, trailing comma, null 사용 금지.
+3) 모든 문자열은 한국어 간결 문장으로 작성한다. 투자 권유·확정적 수익 표현 금지.
+4) 출력 문자열에 JSON 필드명이나 입력 축약 키를 그대로 노출하지 않는다. 시나리오는 표의 이름(label)으로 부른다.
+
+[출력 JSON 스키마]
+{{
+  "summary": {{
+    "title": "string",
+    "body": "string"
+  }},
+  "comparisons": [
+    {{"scenarioId": "string", "comment": "string"}}
+  ],
+  "recommendation": "string"
+}}
+""".strip()
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def llm_input(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    # LLM 에 실제로 들어가는 설문 필드 (None / 빈 목록 제거). 캐시 키와 재생성 판단의 기준
+    return {
+        key: value
+        for key, value in user_data.items()
+        if key not in OMIT_KEYS and key not in LOCAL_ONLY_KEYS and value is not None and value != []
+    }
+
+
+def compact_user_payload(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    # 축약 키 (모르는 키는 그대로 둔다)
+    return {SHORT_KEYS.get(key, key): value for key, value in llm_input(user_data).items()}
@@ -0,0 +1,294 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+# 429 비율 집계 구간
+EVENT_WINDOW_SEC = 60.0
+# 이 시간 동안 갱신이 없는 워커의 대기열 길이는 무시한다 (죽은 워커)
+QUEUE_STALE_SEC = 30.0
+
+
+class RateLimiterTimeout(Exception):
+    pass
+
+
+# 호출자가 취소된 뒤 되돌리는 중인 작업 (GC 로 사라지지 않게 참조를 잡아 둔다)
+_orphan_undos: Set[asyncio.Task] = set()
+
+
+async def claim_in_thread(fn: Callable[..., T], *args: Any, undo: Callable[[T], Awaitable[None]]) -> T:
+    """
+    fn(*args) 를 스레드에서 실행해 공유 자원(임대 등)을 얻는다.
+    기다리던 호출자가 취소돼도 스레드는 멈추지 않고 자원을 기록할 수 있으므로,
+    그때는 스레드가 끝난 뒤 그 결과를 undo(result) 로 되돌린다 (안 그러면 만료 시각까지 자리를 차지한다).
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        future.add_done_callback(lambda done: _undo_orphan(done, undo))
+        raise
+
+
+def _undo_orphan(future: "asyncio.Future[T]", undo: Callable[[T], Awaitable[None]]) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    task = asyncio.get_running_loop().create_task(undo(future.result()))
+    _orphan_undos.add(task)
+    task.add_done_callback(_orphan_undos.discard)
+
+
+class Slot:
+    def __init__(self, lease_id: int):
+        self.lease_id = lease_id
+        self.throttled = False
+
+    def mark_throttled(self) -> None:
+        self.throttled = True
+
+
+class AdaptiveRateLimiter:
+    """
+    gunicorn 워커들이 공유하는 Gemini 호출 동시성/속도 제어기 (로컬 SQLite 파일)
+    - 동시 호출 수 window 를 AIMD 로 조절: 429/503 이면 window × decrease_factor, 성공하면 +1/window
+    - rate_per_sec > 0 이면 토큰 버킷으로 초당 호출 수도 제한
+    - 자리가 없으면 재시도하지 않고 워커 내 FIFO 대기열에서 순서대로 기다린다
+    - 호출마다 임대(lease)를 기록하고, 만료된 임대는 죽은 워커의 것으로 보고 회수한다
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        initial_window: float = 8,
+        min_window: float = 1,
+        max_window: float = 64,
+        decrease_factor: float = 0.5,
+        decrease_cooldown_sec: float = 1.0,
+        rate_per_sec: float = 0.0,
+        burst: float = 10.0,
+        lease_sec: float = 330.0,
+        max_wait_sec: float = 30.0,
+    ):
+        self.db_path = db_path
+        self.initial_window = initial_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown_sec = decrease_cooldown_sec
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.lease_sec = lease_sec
+        self.max_wait_sec = max_wait_sec
+
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._queue_lock = asyncio.Lock()
+        self._released = asyncio.Event()
+        self._queue_depth = 0
+        self._counters: Dict[str, int] = {"acquired": 0, "throttled": 0, "timeouts": 0}
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._init_db()
+
+    # ---------- SQLite ----------
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 커넥션은 스레드 간 공유하지 않는다 (to_thread 로 호출됨)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS limiter_state ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1),"
+            " window REAL NOT NULL,"
+            " tokens REAL NOT NULL,"
+            " refilled_at REAL NOT NULL,"
+            " decreased_at REAL NOT NULL"
+            ")"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS limiter_leases ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " pid INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ")"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS limiter_events (ts REAL NOT NULL, throttled INTEGER NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_limiter_events_ts ON limiter_events (ts)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS limiter_queues ("
+            " pid INTEGER PRIMARY KEY,"
+            " depth INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL"
+            ")"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO limiter_state (id, window, tokens, refilled_at, decreased_at)"
+            " VALUES (1, ?, ?, ?, 0)",
+            (self.initial_window, self.burst, time.time()),
+        )
+
+    def _try_acquire(self, queue_depth: int) -> Optional[int]:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM limiter_leases WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO limiter_queues (pid, depth, updated_at) VALUES (?, ?, ?)",
+                (self._pid, queue_depth, now),
+            )
+            window, tokens, refilled_at = conn.execute(
+                "SELECT window, tokens, refilled_at FROM limiter_state WHERE id = 1"
+            ).fetchone()
+            in_flight = conn.execute("SELECT COUNT(*) FROM limiter_leases").fetchone()[0]
+
+            if self.rate_per_sec > 0:
+                tokens = min(self.burst, tokens + (now - refilled_at) * self.rate_per_sec)
+            has_token = self.rate_per_sec <= 0 or tokens >= 1
+
+            lease_id = None
+            if in_flight < max(int(window), 1) and has_token:
+                lease_id = conn.execute(
+                    "INSERT INTO limiter_leases (pid, expires_at) VALUES (?, ?)",
+                    (self._pid, now + self.lease_sec),
+                ).lastrowid
+                if self.rate_per_sec > 0:
+                    tokens -= 1
+                conn.execute(
+                    "UPDATE limiter_queues SET depth = ? WHERE pid = ?", (max(queue_depth - 1, 0), self._pid)
+                )
+            conn.execute("UPDATE limiter_state SET tokens = ?, refilled_at = ? WHERE id = 1", (tokens, now))
+            conn.execute("COMMIT")
+            return lease_id
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release(self, lease_id: int, outcome: Optional[str]) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM limiter_leases WHERE id = ?", (lease_id,))
+            window, decreased_at = conn.execute(
+                "SELECT window, decreased_at FROM limiter_state WHERE id = 1"
+            ).fetchone()
+            if outcome == "throttled":
+                # 동시에 돌아온 429 여러 개로 window 가 한꺼번에 무너지지 않도록 cooldown 동안은 한 번만 줄인다
+                if now - decreased_at >= self.decrease_cooldown_sec:
+                    window, decreased_at = max(self.min_window, window * self.decrease_factor), now
+            elif outcome == "ok":
+                window = min(self.max_window, window + 1.0 / max(window, 1.0))
+            conn.execute(
+                "UPDATE limiter_state SET window = ?, decreased_at = ? WHERE id = 1", (window, decreased_at)
+            )
+            if outcome is not None:
+                conn.execute(
+                    "INSERT INTO limiter_events (ts, throttled) VALUES (?, ?)", (now, int(outcome == "throttled"))
+                )
+                conn.execute("DELETE FROM limiter_events WHERE ts <= ?", (now - EVENT_WINDOW_SEC,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _read_stats(self) -> Dict[str, float]:
+        now = time.time()
+        conn = self._conn()
+        window, tokens = conn.execute("SELECT window, tokens FROM limiter_state WHERE id = 1").fetchone()
+        in_flight = conn.execute(
+            "SELECT COUNT(*) FROM limiter_leases WHERE expires_at > ?", (now,)
+        ).fetchone()[0]
+        queue_depth = conn.execute(
+            "SELECT COALESCE(SUM(depth), 0) FROM limiter_queues WHERE updated_at > ?", (now - QUEUE_STALE_SEC,)
+        ).fetchone()[0]
+        total, throttled = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(throttled), 0) FROM limiter_events WHERE ts > ?",
+            (now - EVENT_WINDOW_SEC,),
+        ).fetchone()
+        return {
+            "window": round(window, 2),
+            "in_flight": in_flight,
+            "queue_depth": queue_depth,
+            "tokens": round(tokens, 2) if self.rate_per_sec > 0 else None,
+            "requests_last_minute": total,
+            "throttle_rate": round(throttled / total, 4) if total else 0.0,
+        }
+
+    # ---------- 공개 API ----------
+    async def acquire(self, max_wait_sec: Optional[float] = None) -> int:
+        max_wait_sec = self.max_wait_sec if max_wait_sec is None else min(max_wait_sec, self.max_wait_sec)
+        deadline = time.monotonic() + max_wait_sec
+        self._queue_depth += 1
+        try:
+            # asyncio.Lock 은 FIFO 라 먼저 온 요청이 먼저 자리를 얻는다. 공유 상태는 대기열 맨 앞만 조회한다
+            async with self._queue_lock:
+                interval = 0.02
+                while True:
+                    lease_id = await claim_in_thread(
+                        self._try_acquire, self._queue_depth, undo=self._release_orphan
+                    )
+                    if lease_id is not None:
+                        self._counters["acquired"] += 1
+                        return lease_id
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise RateLimiterTimeout(f"Gemini rate limiter queue wait exceeded {max_wait_sec:.1f} seconds")
+                    # 같은 워커에서 자리가 나면 바로 깨고, 다른 워커의 반납은 폴링으로 확인한다
+                    self._released.clear()
+                    try:
+                        await asyncio.wait_for(self._released.wait(), timeout=min(interval, remaining))
+                    except asyncio.TimeoutError:
+                        pass
+                    interval = min(interval * 2, 0.25)
+        finally:
+            self._queue_depth -= 1
+
+    async def _release_orphan(self, lease_id: Optional[int]) -> None:
+        # 취소된 호출자가 얻은 임대 (호출하지 않았으므로 window 는 그대로 둔다)
+        if lease_id is not None:
+            await self.release(lease_id, None)
+
+    async def release(self, lease_id: int, outcome: Optional[str]) -> None:
+        # outcome: "ok"(window 증가) / "throttled"(window 감소) / None(타임아웃 등, window 유지)
+        if outcome == "throttled":
+            self._counters["throttled"] += 1
+        await asyncio.to_thread(self._release, lease_id, outcome)
+        self._released.set()
+
+    @asynccontextmanager
+    async def slot(self, max_wait_sec: Optional[float] = None) -> AsyncIterator[Slot]:
+        slot = Slot(await self.acquire(max_wait_sec))
+        outcome = None
+        try:
+            yield slot
+            outcome = "throttled" if slot.throttled else "ok"
+        except Exception:
+            outcome = "throttled" if slot.throttled else None
+            raise
+        finally:
+            await self.release(slot.lease_id, outcome)
+
+    def stats(self) -> Dict[str, float]:
+        try:
+            stats = self._read_stats()
+        except sqlite3.Error:
+            stats = {}
+        stats.update(self._counters)
+        stats["local_queue_depth"] = self._queue_depth
+        return stats
@@ -0,0 +1,161 @@
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+PROFILE_SUFFIX = ".prof"
+META_SUFFIX = ".json"
+_NAME_RE = re.compile(r"^[0-9A-Za-z_-]+$")
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfiler:
+    """
+    요청 단위 CPU 프로파일 (cProfile, 워커 프로세스 단위)
+    - 타이머가 process_time 이라 업스트림 소켓/리미터 대기처럼 이벤트 루프가 쉬는 시간은 잡히지 않는다
+    - cProfile 은 스레드당 하나만 켤 수 있으므로 워커마다 동시에 한 요청만 프로파일한다 (나머지는 건너뜀)
+    - 같은 루프에서 겹쳐 실행된 다른 코루틴의 CPU 시간도 섞일 수 있어 메타데이터에 동시 요청 수를 남긴다
+    - 결과는 directory 에 최근 max_files 개만 남기는 링 버퍼로 저장한다 (pstats 형식 + 메타데이터 JSON)
+    """
+
+    def __init__(self, directory: str, max_files: int = 50, sample_rate: float = 0.0, token: str = ""):
+        self.directory = directory
+        self.max_files = max_files
+        self.sample_rate = sample_rate
+        self.token = token
+        self._active = False
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"profiled": 0, "skippedBusy": 0, "writeErrors": 0}
+
+    def _incr(self, name: str) -> None:
+        # _save 는 to_thread 로 실행되므로 카운터는 잠금 안에서 갱신한다
+        with self._lock:
+            self._counters[name] += 1
+
+    # ---------- 판단 ----------
+    def authorized(self, token: Optional[str]) -> bool:
+        # 토큰이 설정되지 않았으면 헤더로 켜거나 관리 API 를 쓸 수 없다
+        return bool(self.token) and token == self.token
+
+    def should_profile(self, token: Optional[str]) -> bool:
+        if token is not None and self.authorized(token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    # ---------- 측정 ----------
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        # 프로파일 여부와 상관없이 겹친 요청 수를 세기 위한 카운터
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+
+    @asynccontextmanager
+    async def profile(self, label: str, meta: Dict[str, Any]) -> AsyncIterator[Optional[str]]:
+        """
+        블록 동안 CPU 프로파일을 켜고 끝나면 저장한다. 다른 요청을 프로파일 중이면 None 을 넘기고 그냥 실행한다.
+        """
+        if self._active:
+            self._incr("skippedBusy")
+            yield None
+            return
+
+        self._active = True
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        profiler = cProfile.Profile(time.process_time)
+        concurrent = self._in_flight
+        started_wall = time.perf_counter()
+        started_cpu = time.process_time()
+        profiler.enable()
+        try:
+            yield name
+        finally:
+            profiler.disable()
+            self._active = False
+            meta = {
+                **meta,
+                "name": name,
+                "label": label,
+                "pid": os.getpid(),
+                "createdAt": time.time(),
+                "wallMs": round((time.perf_counter() - started_wall) * 1000, 3),
+                "cpuMs": round((time.process_time() - started_cpu) * 1000, 3),
+                # 시작/끝 시점에 이 워커에서 처리 중이던 요청 수 (1 이면 다른 요청이 섞이지 않았을 가능성이 높다)
+                "concurrentRequests": max(concurrent, self._in_flight),
+            }
+            await asyncio.to_thread(self._save, name, profiler, meta)
+
+    def _save(self, name: str, profiler: cProfile.Profile, meta: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.directory, name + PROFILE_SUFFIX))
+            with open(os.path.join(self.directory, name + META_SUFFIX), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            self._incr("profiled")
+            self._trim()
+        except OSError as e:
+            self._incr("writeErrors")
+            logger.warning("[Profiler] write failed: %s", e)
+
+    def _trim(self) -> None:
+        # 워커들이 같은 디렉터리를 쓰므로 파일 목록 기준으로 오래된 것부터 지운다
+        names = self._names()
+        for name in names[: max(len(names) - self.max_files, 0)]:
+            for suffix in (PROFILE_SUFFIX, META_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _names(self) -> List[str]:
+        # 이름이 시각으로 시작하므로 정렬하면 오래된 순서가 된다
+        try:
+            files = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(f[: -len(PROFILE_SUFFIX)] for f in files if f.endswith(PROFILE_SUFFIX))
+
+    # ---------- 조회 ----------
+    def path(self, name: str) -> Optional[str]:
+        if not _NAME_RE.match(name):
+            return None
+        path = os.path.join(self.directory, name + PROFILE_SUFFIX)
+        return path if os.path.exists(path) else None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        items = []
+        for name in reversed(self._names()):
+            try:
+                with open(os.path.join(self.directory, name + META_SUFFIX), encoding="utf-8") as f:
+                    items.append(json.load(f))
+            except (OSError, ValueError):
+                items.append({"name": name})
+        return items
+
+    def summary(self, name: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        path = self.path(name)
+        if path is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {**counters, "sampleRate": self.sample_rate, "stored": len(self._names())}
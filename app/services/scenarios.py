@@ -0,0 +1,187 @@
+from datetime import date
+from itertools import product
+from typing import Any, Dict, List, Optional
+
+from app.schemas.life_cycle import ScenarioGrid
+from app.schemas.life_cycle_response import (
+    ChartData,
+    ScenarioComment,
+    ScenarioNarrative,
+    ScenarioOverrides,
+    ScenarioProjection,
+    Summary,
+)
+from app.services.financial_engine import compute_facts_batch
+from app.services.plan_prompt import compact_json
+
+# 조합 순서 (라벨/프롬프트 표의 열 순서도 같다)
+GRID_AXES = ("monthlySavingAmount", "isDoubleIncome", "targetSavingRate", "waitYears")
+
+SUPPLY_LABELS = {
+    "newborn": "신생아 특별공급",
+    "multiChild": "다자녀 특별공급",
+    "newlywed": "신혼부부 특별공급",
+    "firstHome": "생애최초 특별공급",
+    "generalFirstRank": "일반공급 1순위",
+}
+
+HORIZON_LABELS = {"SHORT_3": "3년 내", "MID_5": "5년 내", "LONG_10": "10년 장기"}
+
+
+def scenario_count(grid: ScenarioGrid) -> int:
+    # 기준 시나리오 1개 + 지정한 축들의 조합 수 (중복 제거 전 상한)
+    axes = [getattr(grid, axis) for axis in GRID_AXES if getattr(grid, axis)]
+    if not axes:
+        return 1
+    count = 1
+    for values in axes:
+        count *= len(values)
+    return count + 1
+
+
+def expand_grid(grid: ScenarioGrid) -> List[ScenarioOverrides]:
+    """
+    지정한 축들의 모든 조합을 시나리오로 펼친다. 첫 항목은 항상 기준(덮어쓰기 없음)이고 같은 조합은 한 번만 넣는다.
+    """
+    axes = [(axis, getattr(grid, axis)) for axis in GRID_AXES if getattr(grid, axis)]
+    variants = [ScenarioOverrides()]
+    seen = {tuple(variants[0].model_dump().items())}
+    for values in product(*(values for _, values in axes)):
+        overrides = ScenarioOverrides(**{axis: value for (axis, _), value in zip(axes, values)})
+        key = tuple(overrides.model_dump().items())
+        if key not in seen:
+            seen.add(key)
+            variants.append(overrides)
+    return variants
+
+
+def apply_overrides(user_data: Dict[str, Any], overrides: ScenarioOverrides) -> Dict[str, Any]:
+    variant = dict(user_data)
+    for axis in ("monthlySavingAmount", "isDoubleIncome", "targetSavingRate"):
+        value = getattr(overrides, axis)
+        if value is not None:
+            variant[axis] = value
+    # 재무 엔진은 월 저축액이 있으면 저축률을 보지 않으므로, 저축률만 바꾼 시나리오는 월 저축액을 다시 추정하게 한다
+    if overrides.targetSavingRate is not None and overrides.monthlySavingAmount is None:
+        variant["monthlySavingAmount"] = None
+    return variant
+
+
+def _won(amount: int) -> str:
+    # 만원 단위 표기 (1억 이상은 억 단위)
+    if abs(amount) >= 100_000_000:
+        return f"{amount / 100_000_000:.1f}억원"
+    return f"{amount // 10_000:,}만원"
+
+
+def scenario_label(overrides: ScenarioOverrides) -> str:
+    parts = []
+    if overrides.monthlySavingAmount is not None:
+        parts.append(f"월 저축 {_won(overrides.monthlySavingAmount)}")
+    if overrides.isDoubleIncome is not None:
+        parts.append("맞벌이" if overrides.isDoubleIncome else "외벌이")
+    if overrides.targetSavingRate is not None:
+        parts.append(f"저축률 {overrides.targetSavingRate}%")
+    if overrides.waitYears:
+        parts.append(f"{overrides.waitYears}년 후 신청")
+    return " · ".join(parts) or "현재 설문 기준"
+
+
+def project_scenarios(
+    user_data: Dict[str, Any], variants: List[ScenarioOverrides], as_of: Optional[date] = None
+) -> List[ScenarioProjection]:
+    # 모든 시나리오의 저축 추정/가점/자격을 compute_facts_batch 한 번으로 계산한다
+    wait_years = [overrides.waitYears or 0 for overrides in variants]
+    facts_list = compute_facts_batch(
+        [apply_overrides(user_data, overrides) for overrides in variants], as_of=as_of, wait_years=wait_years
+    )
+    projections = []
+    for index, (overrides, wait, facts) in enumerate(zip(variants, wait_years, facts_list)):
+        eligibility = facts.eligibility.model_dump()
+        projections.append(
+            ScenarioProjection(
+                scenarioId=f"s{index}",
+                label=scenario_label(overrides),
+                overrides=overrides,
+                monthlySaving=facts.monthlySaving,
+                waitYears=wait,
+                assetsAtApplication=facts.savingProjectionByYear[wait].amount,
+                subscriptionScore=facts.subscriptionScore.total,
+                eligibleSupplies=[SUPPLY_LABELS[name] for name, ok in eligibility.items() if ok],
+                canBuyWithCheongyak=facts.canBuyWithCheongyak,
+                recommendedHorizon=facts.recommendedHorizon,
+                chartData=ChartData(savingProjectionByYear=facts.savingProjectionByYear),
+            )
+        )
+    return projections
+
+
+def scenario_table(projections: List[ScenarioProjection]) -> str:
+    # 프롬프트용 비교표 (시나리오당 한 줄, 연도별 추정치는 빼고 신청 시점 값만)
+    rows = [
+        {
+            "id": p.scenarioId,
+            "label": p.label,
+            "save": p.monthlySaving,
+            "wait": p.waitYears,
+            "assetsAtApply": p.assetsAtApplication,
+            "score": p.subscriptionScore,
+            "eligible": p.eligibleSupplies,
+            "canBuy": p.canBuyWithCheongyak,
+            "horizon": p.recommendedHorizon,
+        }
+        for p in projections
+    ]
+    return "\n".join(compact_json(row) for row in rows)
+
+
+def _rank_key(projection: ScenarioProjection):
+    # 청약 가능 → 특별공급 자격 수 → 가점 → 신청 시점 자산 → 덜 기다리는 쪽
+    return (
+        projection.canBuyWithCheongyak,
+        len(projection.eligibleSupplies),
+        projection.subscriptionScore,
+        projection.assetsAtApplication,
+        -projection.waitYears,
+    )
+
+
+def fallback_narrative(projections: List[ScenarioProjection], reason: str) -> ScenarioNarrative:
+    # LLM 없이 계산값만으로 만든 비교 설명
+    base = projections[0]
+    best = max(projections, key=_rank_key)
+    comparisons = []
+    for p in projections:
+        eligible = ", ".join(p.eligibleSupplies) or "해당 특별공급 없음"
+        text = (
+            f"{p.label}: 신청 시점 자산 {_won(p.assetsAtApplication)}, 청약 가점 {p.subscriptionScore}점, {eligible}. "
+            f"권장 진입 시점은 {HORIZON_LABELS[p.recommendedHorizon]}입니다."
+        )
+        if p is not base:
+            diff = p.assetsAtApplication - base.assetsAtApplication
+            text += f" 기준 대비 자산 {'+' if diff >= 0 else '-'}{_won(abs(diff))}, 가점 {p.subscriptionScore - base.subscriptionScore:+d}점."
+        comparisons.append(ScenarioComment(scenarioId=p.scenarioId, comment=text))
+    return ScenarioNarrative(
+        summary=Summary(
+            title="시나리오 비교 (계산값 기준)",
+            body=f"현재 AI 설명이 지연되어 계산된 지표만으로 비교합니다. 원인: {reason}",
+        ),
+        comparisons=comparisons,
+        recommendation=(
+            f"계산된 지표로는 '{best.label}' 시나리오가 가장 유리합니다. "
+            "생활비 여유와 소득 변동 가능성을 함께 고려해 선택하세요."
+        ),
+    )
+
+
+def align_comparisons(narrative: ScenarioNarrative, projections: List[ScenarioProjection]) -> ScenarioNarrative:
+    # 모르는 scenarioId / 중복은 버리고 표 순서대로 정렬한다 (빠진 시나리오는 그대로 둔다)
+    by_id = {}
+    for comment in narrative.comparisons:
+        by_id.setdefault(comment.scenarioId.strip(), comment)
+    ordered = [
+        by_id[p.scenarioId].model_copy(update={"scenarioId": p.scenarioId})
+        for p in projections
+        if p.scenarioId in by_id
+    ]
+    return narrative.model_copy(update={"comparisons": ordered})
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """
+    같은 key 로 동시에 들어온 호출을 하나로 합친다.
+    - 첫 호출(leader)만 실제 작업을 실행하고, 나머지는 같은 결과를 기다린다.
+    - 각 호출자는 자신의 timeout 까지만 기다리며, 먼저 포기해도 작업은 다른 대기자를 위해 계속된다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._counters: Dict[str, int] = {
+            "leaders": 0,
+            "collapsed": 0,
+            "waiter_timeouts": 0,
+        }
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 대기자가 먼저 떠났더라도 "exception was never retrieved" 경고를 남기지 않는다
+        if not task.cancelled():
+            task.exception()
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self._counters["leaders"] += 1
+        else:
+            self._counters["collapsed"] += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self._counters["waiter_timeouts"] += 1
+            raise
+
+    def inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self._counters)
+        stats["inflight"] = len(self._inflight)
+        return stats
@@ -0,0 +1,100 @@
+from typing import Any, Dict, Iterable, List, Literal, Optional, Type, get_args, get_origin
+
+from pydantic import BaseModel
+
+_SCALAR_TYPES = {str: "STRING", int: "INTEGER", float: "NUMBER", bool: "BOOLEAN"}
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _nested_excludes(exclude: Iterable[str], name: str) -> List[str]:
+    prefix = f"{name}."
+    return [path[len(prefix):] for path in exclude if path.startswith(prefix)]
+
+
+def _annotation_schema(annotation: Any, exclude: List[str]) -> Dict[str, Any]:
+    if _is_model(annotation):
+        return response_schema(annotation, exclude)
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return {"type": "STRING", "enum": [str(option) for option in get_args(annotation)]}
+    if origin in (list, List):
+        return {"type": "ARRAY", "items": _annotation_schema(get_args(annotation)[0], exclude)}
+    if annotation in _SCALAR_TYPES:
+        return {"type": _SCALAR_TYPES[annotation]}
+    raise TypeError(f"Unsupported annotation for Gemini responseSchema: {annotation!r}")
+
+
+def response_schema(model: Type[BaseModel], exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    pydantic 모델 → Gemini generationConfig.responseSchema (OpenAPI 부분집합)
+    - exclude: "report", "diagnosis.canBuyWithCheongyak" 처럼 점으로 구분한 경로 (로컬에서 채우는 필드)
+    - propertyOrdering 을 모델 선언 순서로 고정해 스트리밍 시 섹션이 같은 순서로 도착하게 한다
+    """
+    exclude = list(exclude)
+    properties: Dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        if name in exclude:
+            continue
+        properties[name] = _annotation_schema(field.annotation, _nested_excludes(exclude, name))
+    return {
+        "type": "OBJECT",
+        "properties": properties,
+        "required": list(properties),
+        "propertyOrdering": list(properties),
+    }
+
+
+def _repair_value(annotation: Any, value: Any) -> Any:
+    if _is_model(annotation):
+        return repair_payload(annotation, value) if isinstance(value, dict) else value
+
+    origin = get_origin(annotation)
+    if origin is Literal:
+        # 대소문자/공백만 다른 enum 값은 맞춰 준다
+        options = {str(option).strip().upper(): option for option in get_args(annotation)}
+        if isinstance(value, str):
+            return options.get(value.strip().upper().replace(" ", "_").replace("-", "_"), value)
+        return value
+    if origin in (list, List):
+        item_annotation = get_args(annotation)[0]
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        return [_repair_value(item_annotation, item) for item in value if item is not None]
+    if annotation is str and isinstance(value, (int, float, bool)):
+        return str(value)
+    if annotation is int and isinstance(value, str):
+        digits = value.replace(",", "").strip()
+        return int(digits) if digits.lstrip("-").isdigit() else value
+    if annotation is int and isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def repair_payload(model: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    검증에 실패한 LLM 출력을 LLM 재호출 없이 고칠 수 있는 범위에서 고친다.
+    - enum 값 대소문자/구분자 정규화
+    - 누락되거나 null 인 배열은 [], 단일 값은 [값] 으로
+    - 숫자 ↔ 문자열 단순 변환
+    필수 문자열이 통째로 빠진 경우 등은 그대로 두어 검증 단계에서 다시 실패한다.
+    """
+    repaired = dict(data)
+    for name, field in model.model_fields.items():
+        if name not in repaired:
+            if get_origin(field.annotation) in (list, List):
+                repaired[name] = []
+            continue
+        repaired[name] = _repair_value(field.annotation, repaired[name])
+    return repaired
+
+
+def repair_section(model: Type[BaseModel], name: str, value: Any) -> Optional[Any]:
+    field = model.model_fields.get(name)
+    if field is None:
+        return None
+    return _repair_value(field.annotation, value)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.schemas.life_cycle_response import LifeCyclePlanResponse
+
+
+@dataclass
+class SurveyPlanVersion:
+    survey_id: int
+    version: int
+    fingerprint: str
+    llm_input: Dict[str, Any]
+    plan: LifeCyclePlanResponse
+    changed_fields: List[str]
+    created_at: float
+
+
+def changed_fields(before: Dict[str, Any], after: Dict[str, Any]) -> List[str]:
+    return sorted(key for key in set(before) | set(after) if before.get(key) != after.get(key))
+
+
+class SurveyPlanStore:
+    """
+    surveyId 별 LLM 플랜 버전 (같은 컨테이너의 워커들이 공유하는 로컬 SQLite)
+    - fingerprint 는 LLM 입력(프롬프트 버전/모델 + 프롬프트에 들어가는 설문 필드)의 캐시 키
+    - LLM 입력이 바뀐 플랜이 들어올 때만 버전이 올라가고, 직전 버전과 달라진 필드를 함께 남긴다
+    - surveyId 마다 최근 max_versions 개만 보관한다
+    """
+
+    def __init__(self, db_path: str, max_versions: int = 5):
+        self.db_path = db_path
+        self.max_versions = max_versions
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"reads": 0, "writes": 0, "errors": 0}
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._init_db()
+
+    # ---------- SQLite ----------
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 커넥션은 스레드 간 공유하지 않는다 (to_thread 로 호출됨)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS survey_plans ("
+            " survey_id INTEGER NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " llm_input_json TEXT NOT NULL,"
+            " plan_json TEXT NOT NULL,"
+            " changed_fields_json TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (survey_id, version)"
+            ")"
+        )
+
+    def _incr(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _read_latest(self, survey_id: int) -> Optional[SurveyPlanVersion]:
+        row = self._conn().execute(
+            "SELECT version, fingerprint, llm_input_json, plan_json, changed_fields_json, created_at"
+            " FROM survey_plans WHERE survey_id = ? ORDER BY version DESC LIMIT 1",
+            (survey_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        version, fingerprint, llm_input_json, plan_json, changed_fields_json, created_at = row
+        return SurveyPlanVersion(
+            survey_id=survey_id,
+            version=version,
+            fingerprint=fingerprint,
+            llm_input=json.loads(llm_input_json),
+            plan=LifeCyclePlanResponse.model_validate_json(plan_json),
+            changed_fields=json.loads(changed_fields_json),
+            created_at=created_at,
+        )
+
+    def _write(
+        self, survey_id: int, fingerprint: str, llm_input: Dict[str, Any], plan: LifeCyclePlanResponse
+    ) -> SurveyPlanVersion:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            previous = self._read_latest(survey_id)
+            version = previous.version + 1 if previous else 1
+            changed = changed_fields(previous.llm_input, llm_input) if previous else []
+            conn.execute(
+                "INSERT INTO survey_plans"
+                " (survey_id, version, fingerprint, llm_input_json, plan_json, changed_fields_json, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    survey_id,
+                    version,
+                    fingerprint,
+                    json.dumps(llm_input, ensure_ascii=False, sort_keys=True),
+                    plan.model_dump_json(),
+                    json.dumps(changed),
+                    now,
+                ),
+            )
+            conn.execute(
+                "DELETE FROM survey_plans WHERE survey_id = ? AND version <= ?",
+                (survey_id, version - self.max_versions),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return SurveyPlanVersion(survey_id, version, fingerprint, llm_input, plan, changed, now)
+
+    # ---------- 공개 API ----------
+    async def latest(self, survey_id: int) -> Optional[SurveyPlanVersion]:
+        self._incr("reads")
+        try:
+            return await asyncio.to_thread(self._read_latest, survey_id)
+        except (sqlite3.Error, ValueError):
+            self._incr("errors")
+            return None
+
+    async def save(
+        self, survey_id: int, fingerprint: str, llm_input: Dict[str, Any], plan: LifeCyclePlanResponse
+    ) -> Optional[SurveyPlanVersion]:
+        try:
+            saved = await asyncio.to_thread(self._write, survey_id, fingerprint, llm_input, plan)
+        except sqlite3.Error:
+            self._incr("errors")
+            return None
+        self._incr("writes")
+        return saved
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
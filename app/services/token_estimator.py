@@ -0,0 +1,15 @@
+import re
+
+# Gemini 토크나이저를 호출하지 않고 입력 토큰 수를 근사한다 (로그/지표용, 과금 기준 아님)
+# - ASCII(영문/숫자/기호): 평균 4글자당 1토큰
+# - 한글 등 비 ASCII: 평균 1.5글자당 1토큰
+_ASCII_RUN = re.compile(r"[\x21-\x7e]+")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    ascii_tokens = sum((len(run) + 3) // 4 for run in _ASCII_RUN.findall(text))
+    non_ascii_tokens = len(_NON_ASCII.findall(text)) / 1.5
+    return int(ascii_tokens + non_ascii_tokens + 0.5)
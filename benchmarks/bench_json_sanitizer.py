@@ -0,0 +1,109 @@
+"""
+json_sanitizer 벤치마크: 기존 정규식+슬라이스 방식 vs 점진적 파서
+
+실행 (레포 루트에서):
+    python -m benchmarks.bench_json_sanitizer [--repeat 200]
+"""
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.json_sanitizer import IncrementalJsonParser, parse_json_object  # noqa: E402
+
+
+def legacy_extract_json_object(text: str) -> str:
+    # 교체 전 구현 (비교용으로 그대로 보존)
+    if not text:
+        raise ValueError("Empty LLM response.")
+    fenced = re.search(r"```(?:json)?\s*(.*?)\s*```", text, re.DOTALL | re.IGNORECASE)
+    if fenced:
+        text = fenced.group(1).strip()
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end == -1 or end <= start:
+        raise ValueError(f"Could not locate JSON object in LLM output: {text[:200]}")
+    return text[start:end + 1].strip()
+
+
+def legacy_parse(text: str) -> dict:
+    return json.loads(legacy_extract_json_object(text))
+
+
+def _plan(reason_count: int) -> dict:
+    return {
+        "summary": {"title": "5년 안에 내 집 마련 가능성 진단", "body": "현재 연 소득과 저축 속도를 기준으로 한 분석입니다. " * 4},
+        "diagnosis": {
+            "canBuyWithCheongyak": True,
+            "confidenceLevel": "MEDIUM",
+            "reasons": [f"{i}번째 근거: 무주택 기간과 청약 납입 기간이 충분히 길어 가점이 쌓일 가능성이 있습니다." for i in range(reason_count)],
+        },
+        "timeHorizonStrategy": {
+            "now": "지출 구조를 점검하고 월 저축을 유지합니다.",
+            "threeYears": "선호 지역 청약 공고를 집중적으로 모니터링합니다.",
+            "fiveYears": "당첨 여부와 분양가를 기준으로 의사결정합니다.",
+        },
+        "chartData": {"savingProjectionByYear": [{"year": y, "amount": 30000000 + y * 9600000} for y in range(11)]},
+        "planMeta": {"recommendedHorizon": "MID_5", "reason": "현재 소득과 저축률을 고려했을 때 5년 목표가 현실적입니다."},
+    }
+
+
+def build_cases() -> dict:
+    typical = json.dumps(_plan(3), ensure_ascii=False, indent=2)
+    large = json.dumps(_plan(2000), ensure_ascii=False, indent=2)
+    return {
+        "typical": typical,
+        "typical_fenced": "분석 결과입니다.\n```json\n" + typical + "\n```\n참고하세요.",
+        "large_120kb": "```json\n" + large + "\n```",
+        # 본문 뒤 꼬리말의 '}' → 기존 방식은 rfind 때문에 실패
+        "stray_brace_after": typical + "\n위 내용은 {참고용} 입니다 }",
+        # 머리말의 '{' → 기존 방식은 find 때문에 실패
+        "stray_brace_before": "요청하신 {플랜} 입니다:\n" + typical,
+        # 큰 출력의 앞부분에서 깨진 경우 → 새 파서는 첫 잘못된 토큰에서 즉시 실패
+        "malformed_early_large": large.replace('"confidenceLevel": "MEDIUM"', '"confidenceLevel": MEDIUM', 1),
+        "truncated_large": large[: len(large) // 2],
+    }
+
+
+def _outcome(fn, text: str) -> str:
+    try:
+        fn(text)
+        return "ok"
+    except ValueError as e:
+        return f"error: {str(e)[:60]}"
+
+
+def _streaming(text: str, chunk_size: int = 64) -> None:
+    parser = IncrementalJsonParser()
+    for i in range(0, len(text), chunk_size):
+        parser.feed(text[i:i + chunk_size])
+    parser.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    print(f"{'case':<24}{'size':>9}  {'legacy µs':>11}  {'new µs':>10}  {'stream µs':>10}  legacy / new outcome")
+    for name, text in build_cases().items():
+        timings = []
+        for fn in (legacy_parse, parse_json_object, _streaming):
+            def run(fn=fn):
+                try:
+                    fn(text)
+                except ValueError:
+                    pass
+            timings.append(min(timeit.repeat(run, number=args.repeat, repeat=3)) / args.repeat * 1e6)
+        print(
+            f"{name:<24}{len(text):>9}  {timings[0]:>11.1f}  {timings[1]:>10.1f}  {timings[2]:>10.1f}  "
+            f"{_outcome(legacy_parse, text)} / {_outcome(parse_json_object, text)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+요청 경로 CPU 벤치마크 (업스트림 호출 제외) + 기준값 대비 회귀 검사
+
+LLM 응답이 캐시되었거나 대역으로 대체되었을 때 워커가 요청 하나에 쓰는 CPU 시간을 단계별로 잰다.
+기준값은 머신마다 다르므로 순수 파이썬 보정 루프 대비 비율로 저장/비교한다.
+
+실행 (레포 루트에서):
+    python -m benchmarks.bench_request_path                    # 기준값과 비교, 회귀 시 종료 코드 1
+    python -m benchmarks.bench_request_path --save-baseline    # 현재 결과를 기준값으로 저장
+    python -m benchmarks.bench_request_path --threshold 0.5 --stage finalize --stage parse_plan
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import timeit
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.repositories.life_cycle_repo import LifeCycleRepo  # noqa: E402
+from app.services.financial_engine import compute_facts  # noqa: E402
+from app.services.json_sanitizer import parse_json_object  # noqa: E402
+from app.services.knowledge_base import KnowledgeBase  # noqa: E402
+from app.services.life_cycle_service import LifeCycleService  # noqa: E402
+from app.services.plan_cache import PlanCache  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "request_path.json"
+AS_OF = date(2026, 1, 1)
+
+SURVEYS: Dict[str, Dict[str, Any]] = {
+    "minimal": {
+        "surveyId": 1,
+        "age": 29,
+        "marryStatus": "single",
+        "annualIncome": 42_000_000,
+        "monthlySavingAmount": 800_000,
+        "hasOwnedHouse": False,
+    },
+    "family_with_debt": {
+        "surveyId": 2,
+        "age": 37,
+        "marryStatus": "married",
+        "childCount": 2,
+        "fChildCount": 3,
+        "isDoubleIncome": True,
+        "willContinueDoubleIncome": True,
+        "currentDistrict": "경기 성남시 분당구",
+        "isHouseholder": True,
+        "hasOwnedHouse": False,
+        "unhousedStartYear": 2014,
+        "isSupportingParents": True,
+        "jobTitle": "소프트웨어 엔지니어",
+        "jobDistrict": "서울 강남구",
+        "annualIncome": 96_000_000,
+        "annualSideIncome": 6_000_000,
+        "monthlySavingAmount": 2_400_000,
+        "currentFinancialAssets": 120_000_000,
+        "additionalAssets": 30_000_000,
+        "targetSavingRate": 35,
+        "hasDebt": True,
+        "debtType": "student",
+        "debtPrincipal": 25_000_000,
+        "debtInterestRateBand": "BETWEEN_2_4",
+        "debtPrincipalPaid": 10_000_000,
+        "monthlyDebtPayment": 450_000,
+        "hasSubscriptionAccount": True,
+        "subscriptionStartDate": "2013-05-01",
+        "monthlySubscriptionAmount": 250_000,
+        "totalSubscriptionBalance": 21_000_000,
+        "targetSubscriptionType": "both",
+        "preferredRegion": "경기 남부",
+        "priorityCriteria": ["school", "commute", "park"],
+        "preferredHousingSize": "84㎡",
+    },
+}
+
+_PLAN = {
+    "summary": {
+        "title": "5년 안에 공공분양 특별공급을 노려볼 수 있습니다",
+        "body": "맞벌이 소득과 꾸준한 저축 덕분에 자금 계획은 안정적이며, 다자녀 특별공급 자격을 활용하면 당첨 가능성이 높아집니다.",
+    },
+    "diagnosis": {
+        "confidenceLevel": "MEDIUM",
+        "reasons": [
+            "무주택 기간이 10년 이상으로 가점 항목에서 유리합니다.",
+            "청약통장 납입 기간과 납입 인정 금액이 공공분양 기준을 충족합니다.",
+            "학자금 대출 상환이 진행 중이라 월 가용 자금이 다소 줄어듭니다.",
+        ],
+    },
+    "timeHorizonStrategy": {
+        "now": "지금은 월 저축을 유지하면서 대출 조기 상환 여부를 검토하세요.",
+        "threeYears": "3년 내에는 선호 지역 공공분양 일정을 추적하고 특별공급 서류를 준비하세요.",
+        "fiveYears": "5년 시점에는 분양가와 대출 한도를 비교해 청약 단지를 확정하세요.",
+    },
+    "planMeta": {"reason": "소득 대비 저축률과 특별공급 자격을 함께 고려한 판단입니다."},
+}
+
+LLM_OUTPUTS: Dict[str, str] = {
+    # responseSchema 로 받은 정상 응답
+    "structured": json.dumps(_PLAN, ensure_ascii=False),
+    # 머리말 + 코드블록
+    "fenced": "분석 결과입니다.\n```json\n" + json.dumps(_PLAN, ensure_ascii=False, indent=2) + "\n```",
+    # 로컬 보정이 필요한 응답 (enum 소문자, 단일 문자열 reasons)
+    "needs_repair": json.dumps(
+        {
+            **_PLAN,
+            "diagnosis": {"confidenceLevel": "medium", "reasons": _PLAN["diagnosis"]["reasons"][0]},
+        },
+        ensure_ascii=False,
+    ),
+}
+
+
+class StubGemini:
+    context_cache_active = False
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def hedge_delay(self, model: str, deadline: Optional[float] = None) -> float:
+        return 60.0
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        return self.text
+
+
+class NullRepo:
+    def save_record(self, **kwargs) -> None:
+        pass
+
+
+def calibration() -> int:
+    # 머신 속도 보정용 순수 파이썬 루프
+    total = 0
+    for i in range(10_000):
+        total += i * i % 7
+    return total
+
+
+def _time_sync(fn: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def _time_async(make_coro: Callable[[], Any], number: int) -> float:
+    async def many() -> float:
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(number):
+                await make_coro()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    return asyncio.run(many()) / number * 1e6
+
+
+def build_stages(survey_name: str) -> Dict[str, Callable[[int], float]]:
+    user_data = SURVEYS[survey_name]
+    knowledge = KnowledgeBase.from_file(settings.KNOWLEDGE_PATH)
+    service = LifeCycleService(StubGemini(LLM_OUTPUTS["structured"]), NullRepo(), knowledge=knowledge)
+    facts = compute_facts(user_data, as_of=AS_OF)
+    plan, _ = service._parse_plan(LLM_OUTPUTS["structured"], facts)
+    final = service._finalize(plan, user_data, facts)
+
+    cached_service = LifeCycleService(
+        StubGemini(LLM_OUTPUTS["structured"]),
+        NullRepo(),
+        cache=PlanCache(max_entries=16, ttl_sec=3600),
+        knowledge=knowledge,
+    )
+    # _log_prompt 는 DEBUG 로그용이라 측정에서 뺀다
+    service._log_prompt = lambda *args: None
+    cached_service._log_prompt = lambda *args: None
+    asyncio.run(cached_service.generate_plan(dict(user_data)))
+
+    return {
+        "cache_key": lambda n: _time_sync(lambda: service._cache_key(user_data), n),
+        "compute_facts": lambda n: _time_sync(lambda: compute_facts(user_data, as_of=AS_OF), n),
+        "build_prompt": lambda n: _time_sync(lambda: service._build_prompt(user_data, facts), n),
+        "parse_json_structured": lambda n: _time_sync(lambda: parse_json_object(LLM_OUTPUTS["structured"]), n),
+        "parse_json_fenced": lambda n: _time_sync(lambda: parse_json_object(LLM_OUTPUTS["fenced"]), n),
+        "parse_plan": lambda n: _time_sync(lambda: service._parse_plan(LLM_OUTPUTS["structured"], facts), n),
+        "parse_plan_local_repair": lambda n: _time_sync(
+            lambda: service._parse_plan(LLM_OUTPUTS["needs_repair"], facts), n
+        ),
+        "build_report": lambda n: _time_sync(lambda: service._build_report(plan, user_data), n),
+        "finalize": lambda n: _time_sync(lambda: service._finalize(plan, user_data, facts), n),
+        "response_json": lambda n: _time_sync(final.model_dump_json, n),
+        "record_row": lambda n: _time_sync(
+            lambda: LifeCycleRepo._to_row((0.0, "plan", 2, None, user_data, final)), n
+        ),
+        "request_cache_hit": lambda n: _time_async(lambda: cached_service.generate_plan(dict(user_data)), n),
+        "request_stubbed_llm": lambda n: _time_async(lambda: service.generate_plan(dict(user_data)), n),
+    }
+
+
+def run(survey_name: str, number: int, only: List[str]) -> Dict[str, float]:
+    stages = build_stages(survey_name)
+    calibration_before = _time_sync(calibration, max(number // 10, 10))
+    results: Dict[str, float] = {}
+    for name, measure in stages.items():
+        if only and name not in only:
+            continue
+        results[name] = measure(number)
+    # 측정 중 클럭 변화를 줄이기 위해 앞뒤로 재고 빠른 쪽을 쓴다
+    results["calibration"] = min(calibration_before, _time_sync(calibration, max(number // 10, 10)))
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--survey", choices=list(SURVEYS), default="family_with_debt")
+    ap.add_argument("--number", type=int, default=300, help="단계별 반복 횟수")
+    ap.add_argument("--stage", action="append", default=[], help="이 단계만 측정 (반복 지정 가능)")
+    ap.add_argument("--threshold", type=float, default=0.3, help="기준값 대비 허용 증가율 (0.3 = +30%%)")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true")
+    args = ap.parse_args()
+
+    # 헤지 경로는 업스트림 지연에만 의미가 있으므로 CPU 측정에서는 끈다
+    settings.GEMINI_HEDGE_ENABLED = False
+    results = run(args.survey, args.number, args.stage)
+    calibration_us = results["calibration"]
+
+    baselines: Dict[str, Any] = {}
+    if args.baseline.exists():
+        baselines = json.loads(args.baseline.read_text(encoding="utf-8"))
+    baseline = baselines.get(args.survey, {})
+
+    regressions = []
+    print(f"survey={args.survey}  calibration={calibration_us:.1f} µs")
+    print(f"{'stage':<26}{'µs':>10}{'× calib':>10}{'baseline':>10}{'change':>9}")
+    for name, micros in results.items():
+        if name == "calibration":
+            continue
+        ratio = micros / calibration_us
+        reference = baseline.get(name)
+        change = ""
+        if reference:
+            delta = ratio / reference - 1
+            change = f"{delta:+.0%}"
+            if delta > args.threshold:
+                regressions.append((name, delta))
+                change += " !"
+        print(f"{name:<26}{micros:>10.1f}{ratio:>10.3f}{(reference or 0):>10.3f}{change:>9}")
+
+    if args.save_baseline:
+        baselines[args.survey] = {
+            name: round(micros / calibration_us, 4) for name, micros in results.items() if name != "calibration"
+        }
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baselines, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline saved → {args.baseline}")
+        return
+
+    if regressions:
+        print("REGRESSION: " + ", ".join(f"{name} {delta:+.0%}" for name, delta in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+로컬 Gemini 대역 서버 (generateContent / streamGenerateContent / cachedContents)
+
+실제 쿼터 없이 부하 테스트를 하기 위한 가짜 업스트림. 지연 분포와 장애(429/503, 깨진 JSON, 코드블록 출력)를
+확률로 주입한다.
+
+실행 (레포 루트에서):
+    python -m benchmarks.fake_gemini --port 8081 --latency lognormal --latency-median 3 --rate-429 0.05
+
+앱을 이 서버로 붙이기:
+    GEMINI_API_BASE=http://127.0.0.1:8081/v1beta GEMINI_API_KEY=fake uvicorn app.main:app
+
+실행 중 설정 변경 / 집계:
+    curl -X PUT localhost:8081/_fake/config -H 'Content-Type: application/json' -d '{"rate_503": 0.3}'
+    curl localhost:8081/_fake/stats
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class FakeConfig:
+    # 지연 분포: fixed | uniform | lognormal
+    latency: str = "lognormal"
+    latency_median: float = 3.0
+    latency_sigma: float = 0.5
+    latency_min: float = 0.0
+    latency_max: float = 120.0
+    # 모델별 지연 배율 (예: flash 가 pro 보다 빠른 상황)
+    model_scale: Dict[str, float] = field(default_factory=lambda: {"gemini-2.5-flash": 0.3})
+    # 장애 주입 확률 (요청마다 독립)
+    rate_429: float = 0.0
+    rate_503: float = 0.0
+    rate_malformed: float = 0.0
+    rate_fenced: float = 0.0
+    # 스트리밍 조각 크기 (문자)
+    stream_chunk_chars: int = 48
+    seed: int = 0
+
+
+config = FakeConfig()
+stats: Counter = Counter()
+_rng = random.Random(0)
+
+app = FastAPI(title="Fake Gemini")
+
+
+def _sample_latency(model: str) -> float:
+    if config.latency == "fixed":
+        value = config.latency_median
+    elif config.latency == "uniform":
+        value = _rng.uniform(config.latency_min, config.latency_max)
+    else:
+        value = _rng.lognormvariate(0.0, config.latency_sigma) * config.latency_median
+    value *= config.model_scale.get(model, 1.0)
+    return min(max(value, config.latency_min), config.latency_max)
+
+
+def _plan_text() -> str:
+    # LOCAL_FIELDS 를 뺀 LLM 출력 스키마
+    horizon = _rng.choice(["3년", "5년", "10년"])
+    return json.dumps(
+        {
+            "summary": {
+                "title": f"{horizon} 안에 청약으로 내 집 마련을 노려볼 수 있습니다",
+                "body": "현재 소득과 저축 속도, 청약 가점을 기준으로 단계별 전략을 정리했습니다.",
+            },
+            "diagnosis": {
+                "confidenceLevel": _rng.choice(["HIGH", "MEDIUM", "LOW"]),
+                "reasons": [
+                    "무주택 기간과 청약통장 가입 기간이 가점에 유리합니다.",
+                    "월 저축액이 목표 자금 대비 안정적인 수준입니다.",
+                ],
+            },
+            "timeHorizonStrategy": {
+                "now": "지금은 청약통장 납입을 유지하고 지출 구조를 점검하세요.",
+                "threeYears": "3년 내에는 선호 지역 공고를 모니터링하며 자금을 모으세요.",
+                "fiveYears": "5년 시점에는 분양가와 대출 한도를 비교해 최종 결정을 내리세요.",
+            },
+            "planMeta": {"reason": "소득 대비 저축률과 가점 추이를 고려한 판단입니다."},
+        },
+        ensure_ascii=False,
+    )
+
+
+def _scenario_ids(body: bytes) -> List[str]:
+    # 시나리오 비교 요청이면 프롬프트의 비교표에서 id 를 뽑는다 (플랜 요청이면 빈 목록)
+    try:
+        contents = json.loads(body).get("contents") or []
+        prompt = "".join(part.get("text", "") for content in contents for part in content.get("parts", []))
+    except (ValueError, AttributeError):
+        return []
+    if "[시나리오 비교표]" not in prompt:
+        return []
+    table = prompt.split("[시나리오 비교표]", 1)[1].split("\n\n", 1)[0]
+    ids = []
+    for line in table.strip().splitlines():
+        try:
+            ids.append(json.loads(line)["id"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return ids
+
+
+def _scenario_text(ids: List[str]) -> str:
+    return json.dumps(
+        {
+            "summary": {
+                "title": "저축액을 늘리는 가정이 가장 빠른 진입 경로입니다",
+                "body": "기준 대비 신청 시점 자산과 청약 가점이 어떻게 달라지는지 비교했습니다.",
+            },
+            "comparisons": [
+                {"scenarioId": scenario_id, "comment": "기준과 비교해 자산 형성 속도와 자격 변화를 정리했습니다."}
+                for scenario_id in ids
+            ],
+            "recommendation": "생활비 여유를 유지할 수 있는 범위에서 저축액을 늘리는 가정을 권합니다.",
+        },
+        ensure_ascii=False,
+    )
+
+
+def _response_text(kind: str, scenario_ids: Optional[List[str]] = None) -> str:
+    text = _scenario_text(scenario_ids) if scenario_ids else _plan_text()
+    if kind == "malformed":
+        # 따옴표가 빠진 enum + 잘린 꼬리
+        return text.replace('"confidenceLevel": "', '"confidenceLevel": ', 1)[: int(len(text) * 0.8)]
+    if kind == "fenced":
+        return f"요청하신 분석 결과입니다.\n```json\n{text}\n```\n참고용으로 활용하세요."
+    return text
+
+
+def _choose_outcome() -> str:
+    roll = _rng.random()
+    for name, rate in (
+        ("429", config.rate_429),
+        ("503", config.rate_503),
+        ("malformed", config.rate_malformed),
+        ("fenced", config.rate_fenced),
+    ):
+        if roll < rate:
+            return name
+        roll -= rate
+    return "ok"
+
+
+def _error_response(status: int) -> JSONResponse:
+    message = "Resource has been exhausted" if status == 429 else "The model is overloaded"
+    return JSONResponse(status_code=status, content={"error": {"code": status, "message": message}})
+
+
+def _usage(body: bytes, text: str) -> Dict[str, int]:
+    # 실제 토크나이저 대신 대략 4바이트당 1토큰으로 센다
+    prompt_tokens = len(body) // 4
+    candidate_tokens = len(text.encode("utf-8")) // 4
+    return {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": candidate_tokens,
+        "totalTokenCount": prompt_tokens + candidate_tokens,
+    }
+
+
+def _candidate(text: str, finish: bool = True) -> Dict[str, Any]:
+    candidate: Dict[str, Any] = {"content": {"role": "model", "parts": [{"text": text}]}}
+    if finish:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate]}
+
+
+@app.post("/v1beta/models/{target}")
+async def generate(target: str, request: Request):
+    model, _, method = target.partition(":")
+    body = await request.body()
+    outcome = _choose_outcome()
+    latency = _sample_latency(model)
+    stats[f"{method}:{model}:{outcome}"] += 1
+
+    if method == "streamGenerateContent":
+        if outcome in ("429", "503"):
+            await asyncio.sleep(min(latency, 0.2))
+            return _error_response(int(outcome))
+        text = _response_text(outcome, _scenario_ids(body))
+        return StreamingResponse(_stream(text, latency, _usage(body, text)), media_type="text/event-stream")
+
+    await asyncio.sleep(latency)
+    if outcome in ("429", "503"):
+        return _error_response(int(outcome))
+    text = _response_text(outcome, _scenario_ids(body))
+    return {**_candidate(text), "usageMetadata": _usage(body, text)}
+
+
+async def _stream(text: str, latency: float, usage: Dict[str, int]):
+    size = max(config.stream_chunk_chars, 1)
+    chunks: List[str] = [text[i:i + size] for i in range(0, len(text), size)]
+    # 첫 조각까지 지연의 20%, 나머지는 조각마다 고르게
+    await asyncio.sleep(latency * 0.2)
+    gap = latency * 0.8 / max(len(chunks), 1)
+    for index, chunk in enumerate(chunks):
+        if index:
+            await asyncio.sleep(gap)
+        yield f"data: {json.dumps(_candidate(chunk, finish=False), ensure_ascii=False)}\n\n"
+    yield f"data: {json.dumps({'candidates': [{'finishReason': 'STOP'}], 'usageMetadata': usage})}\n\n"
+
+
+@app.post("/v1beta/cachedContents")
+async def cached_contents():
+    # 실제 API 의 최소 토큰 미달 거절과 같은 응답 → 서비스는 system_instruction 인라인 전송으로 내려간다
+    stats["cachedContents:rejected"] += 1
+    return JSONResponse(
+        status_code=400,
+        content={"error": {"code": 400, "message": "Cached content is too small."}},
+    )
+
+
+@app.get("/_fake/config")
+def get_config():
+    return asdict(config)
+
+
+@app.put("/_fake/config")
+def update_config(patch: Dict[str, Any]):
+    names = {f.name for f in fields(FakeConfig)}
+    for key, value in patch.items():
+        if key in names:
+            setattr(config, key, value)
+    if "seed" in patch:
+        _rng.seed(config.seed)
+    return asdict(config)
+
+
+@app.get("/_fake/stats")
+def get_stats():
+    return dict(stats)
+
+
+@app.post("/_fake/reset")
+def reset_stats():
+    stats.clear()
+    return {"status": "OK"}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8081)
+    ap.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default=config.latency)
+    ap.add_argument("--latency-median", type=float, default=config.latency_median)
+    ap.add_argument("--latency-sigma", type=float, default=config.latency_sigma)
+    ap.add_argument("--latency-min", type=float, default=config.latency_min)
+    ap.add_argument("--latency-max", type=float, default=config.latency_max)
+    ap.add_argument(
+        "--model-scale", action="append", default=[], metavar="MODEL=FACTOR",
+        help="모델별 지연 배율 (반복 지정 가능)",
+    )
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--rate-503", type=float, default=0.0)
+    ap.add_argument("--rate-malformed", type=float, default=0.0)
+    ap.add_argument("--rate-fenced", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    config.latency = args.latency
+    config.latency_median = args.latency_median
+    config.latency_sigma = args.latency_sigma
+    config.latency_min = args.latency_min
+    config.latency_max = args.latency_max
+    for item in args.model_scale:
+        model, _, factor = item.partition("=")
+        config.model_scale[model] = float(factor)
+    config.rate_429 = args.rate_429
+    config.rate_503 = args.rate_503
+    config.rate_malformed = args.rate_malformed
+    config.rate_fenced = args.rate_fenced
+    config.seed = args.seed
+    _rng.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+/ai/cheongyak-plan 부하 테스트 (open-loop: 응답을 기다리지 않고 목표 RPS 로 계속 보낸다)
+
+처리량, 지연 p50/p95/p99, 오류 종류, fallback 비율을 보고한다. 동시성 모델/캐시/재시도 정책을 바꾼 뒤
+같은 조건으로 돌려 비교하는 용도이며, 업스트림은 benchmarks.fake_gemini 로 대체한다.
+
+실행 (레포 루트에서, 터미널 3개):
+    python -m benchmarks.fake_gemini --port 8081 --latency-median 3 --rate-503 0.05
+    GEMINI_API_BASE=http://127.0.0.1:8081/v1beta GEMINI_API_KEY=fake \\
+        gunicorn -k uvicorn.workers.UvicornWorker app.main:app --workers 2 --bind 127.0.0.1:8000
+    python -m benchmarks.load_test --rps 20 --duration 60 --unique-ratio 0.5 --fake-url http://127.0.0.1:8081
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+FALLBACK_TITLE_PREFIX = "임시 청약 플랜"
+
+
+def make_survey(rng: random.Random, survey_id: int) -> Dict[str, Any]:
+    married = rng.random() < 0.5
+    return {
+        "surveyId": survey_id,
+        "age": rng.randint(25, 45),
+        "marryStatus": "married" if married else "single",
+        "childCount": rng.randint(0, 2) if married else 0,
+        "isDoubleIncome": married and rng.random() < 0.6,
+        "currentDistrict": rng.choice(["서울 마포구", "서울 송파구", "경기 성남시", "인천 연수구"]),
+        "hasOwnedHouse": False,
+        "isHouseholder": rng.random() < 0.7,
+        "annualIncome": rng.randrange(30_000_000, 120_000_000, 1_000_000),
+        "monthlySavingAmount": rng.randrange(500_000, 3_000_000, 100_000),
+        "currentFinancialAssets": rng.randrange(0, 200_000_000, 5_000_000),
+        "hasSubscriptionAccount": True,
+        "subscriptionStartDate": f"{rng.randint(2012, 2023)}-0{rng.randint(1, 9)}-01",
+        "monthlySubscriptionAmount": rng.choice([20_000, 100_000, 250_000]),
+        "targetSubscriptionType": rng.choice(["public", "private", "both"]),
+        "preferredRegion": rng.choice(["서울", "경기 남부", "인천"]),
+        "preferredHousingSize": rng.choice(["59㎡", "84㎡"]),
+    }
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+class LoadResult:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.ok_latencies: List[float] = []
+        self.outcomes: Counter = Counter()
+        self.fallbacks = 0
+        self.sent = 0
+        self.skipped = 0
+
+    def record(self, outcome: str, latency: float, fallback: bool = False) -> None:
+        self.outcomes[outcome] += 1
+        self.latencies.append(latency)
+        if outcome == "200":
+            self.ok_latencies.append(latency)
+            self.fallbacks += int(fallback)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        completed = sum(self.outcomes.values())
+        ok = self.outcomes.get("200", 0)
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "sent": self.sent,
+            "skippedClientSaturated": self.skipped,
+            "completed": completed,
+            "elapsedSec": round(elapsed, 2),
+            "throughputRps": round(completed / elapsed, 2) if elapsed else 0.0,
+            "okRps": round(ok / elapsed, 2) if elapsed else 0.0,
+            "latencyMs": {
+                "p50": ms(percentile(self.latencies, 50)),
+                "p95": ms(percentile(self.latencies, 95)),
+                "p99": ms(percentile(self.latencies, 99)),
+                "max": ms(max(self.latencies) if self.latencies else None),
+            },
+            "okLatencyMs": {
+                "p50": ms(percentile(self.ok_latencies, 50)),
+                "p95": ms(percentile(self.ok_latencies, 95)),
+                "p99": ms(percentile(self.ok_latencies, 99)),
+            },
+            "outcomes": dict(self.outcomes),
+            "errorRate": round((completed - ok) / completed, 4) if completed else 0.0,
+            "fallbackRate": round(self.fallbacks / ok, 4) if ok else 0.0,
+        }
+
+
+async def _one(client: httpx.AsyncClient, url: str, survey: Dict[str, Any], result: LoadResult, timeout: float):
+    started = time.perf_counter()
+    try:
+        resp = await client.post(url, json=survey, timeout=timeout)
+    except httpx.TimeoutException:
+        result.record("client_timeout", time.perf_counter() - started)
+        return
+    except httpx.HTTPError as e:
+        result.record(type(e).__name__, time.perf_counter() - started)
+        return
+    latency = time.perf_counter() - started
+    fallback = False
+    if resp.status_code == 200:
+        try:
+            fallback = resp.json()["summary"]["title"].startswith(FALLBACK_TITLE_PREFIX)
+        except (ValueError, KeyError, TypeError):
+            result.record("200_invalid_body", latency)
+            return
+    result.record(str(resp.status_code), latency, fallback)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    pool_size = max(1, int(round(args.rps * args.duration * args.unique_ratio)))
+    surveys = [make_survey(rng, survey_id) for survey_id in range(1, pool_size + 1)]
+    total = int(args.rps * args.duration)
+    url = f"{args.url.rstrip('/')}/ai/cheongyak-plan"
+    headers = {"X-Request-Timeout": str(args.request_timeout)} if args.request_timeout else None
+
+    result = LoadResult()
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(limits=limits, headers=headers) as client:
+        if args.fake_url:
+            await client.post(f"{args.fake_url.rstrip('/')}/_fake/reset")
+
+        in_flight = set()
+        started = time.perf_counter()
+        next_at = started
+        for _ in range(total):
+            # 목표 RPS 의 도착 시각 (poisson 이면 지수 분포 간격)
+            next_at += rng.expovariate(args.rps) if args.arrival == "poisson" else 1.0 / args.rps
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= args.max_in_flight:
+                # 클라이언트가 포화되면 측정이 왜곡되므로 보내지 않고 따로 센다
+                result.skipped += 1
+                continue
+            survey = surveys[rng.randrange(pool_size)]
+            task = asyncio.create_task(_one(client, url, survey, result, args.client_timeout))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            result.sent += 1
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        elapsed = time.perf_counter() - started
+
+        report = result.summary(elapsed)
+        report["config"] = {
+            "rps": args.rps,
+            "duration": args.duration,
+            "arrival": args.arrival,
+            "uniqueSurveys": pool_size,
+            "requestTimeout": args.request_timeout,
+        }
+        try:
+            report["serverStats"] = (await client.get(f"{args.url.rstrip('/')}/ai/stats")).json()
+        except (httpx.HTTPError, ValueError):
+            report["serverStats"] = None
+        if args.fake_url:
+            try:
+                report["upstream"] = (await client.get(f"{args.fake_url.rstrip('/')}/_fake/stats")).json()
+            except (httpx.HTTPError, ValueError):
+                report["upstream"] = None
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    config = report["config"]
+    print(
+        f"target {config['rps']} rps × {config['duration']}s ({config['arrival']}), "
+        f"{config['uniqueSurveys']} unique surveys"
+    )
+    print(
+        f"sent {report['sent']}  completed {report['completed']}  skipped {report['skippedClientSaturated']}  "
+        f"in {report['elapsedSec']}s"
+    )
+    print(f"throughput {report['throughputRps']} rps (ok {report['okRps']} rps)")
+    latency = report["latencyMs"]
+    print(f"latency ms  p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"outcomes    {report['outcomes']}")
+    print(f"error rate  {report['errorRate']:.2%}   fallback rate (of 200) {report['fallbackRate']:.2%}")
+    if report.get("upstream") is not None:
+        upstream_calls = sum(v for k, v in report["upstream"].items() if not k.startswith("cachedContents"))
+        print(f"upstream    {upstream_calls} calls {report['upstream']}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--rps", type=float, default=10.0)
+    ap.add_argument("--duration", type=float, default=30.0)
+    ap.add_argument("--arrival", choices=["uniform", "poisson"], default="poisson")
+    ap.add_argument("--unique-ratio", type=float, default=1.0, help="서로 다른 설문 비율 (낮을수록 캐시 적중 증가)")
+    ap.add_argument("--request-timeout", type=float, default=None, help="X-Request-Timeout 헤더 (초)")
+    ap.add_argument("--client-timeout", type=float, default=120.0)
+    ap.add_argument("--max-in-flight", type=int, default=2000)
+    ap.add_argument("--fake-url", default=None, help="benchmarks.fake_gemini 주소 (업스트림 호출 집계)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = ap.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
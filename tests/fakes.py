@@ -0,0 +1,76 @@
+# 여러 테스트에서 쓰는 가짜 의존성과 표본 데이터
+import asyncio
+import json
+
+from app.schemas.life_cycle_response import LifeCyclePlanResponse
+
+PLAN_SECTIONS = {
+    "summary": {"title": "5년 안에 청약으로 내 집 마련", "body": "저축을 유지하며 가점을 쌓으세요."},
+    "diagnosis": {"canBuyWithCheongyak": True, "confidenceLevel": "HIGH", "reasons": ["무주택 기간이 깁니다."]},
+    "timeHorizonStrategy": {"now": "지출 점검", "threeYears": "저축 증액", "fiveYears": "청약 신청"},
+    "planMeta": {"recommendedHorizon": "MID_5", "reason": "가점이 충분합니다."},
+}
+
+# LLM 이 돌려주는 형태 (로컬 필드 없이 섹션만)
+PLAN_JSON = json.dumps(PLAN_SECTIONS, ensure_ascii=False)
+
+SURVEY = {
+    "surveyId": 1,
+    "age": 35,
+    "marryStatus": "single",
+    "childCount": 0,
+    "annualIncome": 48_000_000,
+    "monthlySavingAmount": 1_000_000,
+    "hasOwnedHouse": False,
+    "subscriptionStartDate": "2018-03-01",
+    "currentFinancialAssets": 10_000_000,
+}
+
+
+def sample_plan(title: str = "5년 안에 청약으로 내 집 마련") -> LifeCyclePlanResponse:
+    return LifeCyclePlanResponse(
+        **{**PLAN_SECTIONS, "summary": {**PLAN_SECTIONS["summary"], "title": title}},
+        chartData={"savingProjectionByYear": [{"year": 0, "amount": 10_000_000}]},
+        report="보고서",
+    )
+
+
+class FakeGemini:
+    """
+    GeminiService 대역
+    replies: model -> 응답 목록 (문자열 또는 예외). 차례로 쓰고 마지막 값은 계속 반복한다.
+    model 키가 없으면 None 키의 값을 쓴다 (delays 도 같다). delays 는 model 별 응답 지연(초).
+    """
+
+    context_cache_active = False
+
+    def __init__(self, replies=None, delays=None, hedge_delay_sec: float = 30.0):
+        self.replies = {key: list(value) for key, value in (replies or {None: [PLAN_JSON]}).items()}
+        self.delays = delays or {}
+        self.hedge_delay_sec = hedge_delay_sec
+        self.calls = []
+        self.cancelled = []
+
+    def hedge_delay(self, model, deadline=None) -> float:
+        return self.hedge_delay_sec
+
+    async def generate_text(self, prompt, system_instruction=None, model=None, **kwargs):
+        self.calls.append(model)
+        try:
+            await asyncio.sleep(self.delays.get(model, self.delays.get(None, 0.0)))
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        replies = self.replies[model] if model in self.replies else self.replies[None]
+        reply = replies.pop(0) if len(replies) > 1 else replies[0]
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply
+
+
+class RecordingRepo:
+    def __init__(self):
+        self.records = []
+
+    def save_record(self, **record) -> None:
+        self.records.append(record)
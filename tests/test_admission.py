@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.admission import SHED_REJECT, AdmissionController, AdmissionRejected
+
+
+def _controller(max_in_flight=1, max_queue=4, service_sec=1.0) -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=max_in_flight,
+        max_queue=max_queue,
+        service_estimate=lambda model: service_sec,
+        policy=SHED_REJECT,
+    )
+
+
+async def _hold(admission: AdmissionController, release: asyncio.Event) -> None:
+    async with admission.admit():
+        await release.wait()
+
+
+def test_rejects_when_queue_is_full():
+    admission = _controller(max_in_flight=1, max_queue=0)
+
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(_hold(admission, release))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as info:
+            async with admission.admit():
+                pass
+        release.set()
+        await holder
+        return info.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.reason == "queue_full"
+    assert rejected.retry_after >= 1.0
+    assert admission.stats()["shedQueueFull"] == 1
+    assert admission.in_flight == 0
+
+
+def test_idle_worker_admits_regardless_of_estimate():
+    # 추정치가 deadline 보다 길어도 빈 자리가 있으면 들여보낸다 (거절하면 추정치가 갱신될 기회가 없다)
+    admission = _controller(service_sec=60.0)
+
+    async def scenario():
+        async with admission.admit(deadline=time.monotonic() + 1.0):
+            assert admission.in_flight == 1
+
+    asyncio.run(scenario())
+    assert admission.stats()["admitted"] == 1
+    assert admission.stats()["shedDeadline"] == 0
+
+
+def test_queued_deadline_uses_routed_model_estimate():
+    estimates = {"flash": 0.2, "pro": 5.0}
+    admission = AdmissionController(
+        max_in_flight=1,
+        max_queue=4,
+        service_estimate=lambda model: estimates.get(model, 1.0),
+        policy=SHED_REJECT,
+    )
+
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(_hold(admission, release))
+        await asyncio.sleep(0)
+        deadline = time.monotonic() + 2.0
+        with pytest.raises(AdmissionRejected) as info:
+            async with admission.admit(deadline=deadline, model="pro"):
+                pass
+        # flash 기준으로는 앞선 요청 0.2s + 자기 처리 0.2s 라 기다린다
+        admitted = []
+
+        async def flash_request():
+            async with admission.admit(deadline=deadline, model="flash"):
+                admitted.append("flash")
+
+        waiting = asyncio.ensure_future(flash_request())
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 1
+        release.set()
+        await asyncio.gather(holder, waiting)
+        assert admitted == ["flash"]
+        return info.value
+
+    assert asyncio.run(scenario()).reason == "deadline"
+    assert admission.in_flight == 0
+
+
+def test_rejects_queued_request_past_deadline():
+    admission = _controller(max_in_flight=1, service_sec=1.0)
+
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(_hold(admission, release))
+        await asyncio.sleep(0)
+        # 앞선 요청 1.0s + 자기 처리 1.0s > 1.5s
+        with pytest.raises(AdmissionRejected) as info:
+            async with admission.admit(deadline=time.monotonic() + 1.5):
+                pass
+        release.set()
+        await holder
+        return info.value
+
+    assert asyncio.run(scenario()).reason == "deadline"
+    assert admission.stats()["shedDeadline"] == 1
+
+
+def test_deadline_passing_while_queued():
+    admission = _controller(max_in_flight=1, service_sec=0.01)
+
+    async def scenario():
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(_hold(admission, release))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as info:
+            async with admission.admit(deadline=time.monotonic() + 0.05):
+                pass
+        assert admission.queue_depth == 0
+        release.set()
+        await holder
+        return info.value
+
+    assert asyncio.run(scenario()).reason == "wait_timeout"
+    assert admission.in_flight == 0
+
+
+def test_queued_requests_run_in_arrival_order():
+    admission = _controller(max_in_flight=1, max_queue=4, service_sec=0.01)
+    order = []
+
+    async def request(index: int):
+        async with admission.admit():
+            order.append(index)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(request(i) for i in range(4)))
+
+    asyncio.run(scenario())
+    assert order == [0, 1, 2, 3]
+    stats = admission.stats()
+    assert (stats["admitted"], stats["queued"], stats["inFlight"]) == (4, 3, 0)
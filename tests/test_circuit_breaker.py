@@ -0,0 +1,74 @@
+import time
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(window=10, min_calls=4, failure_ratio=0.5, **kwargs)
+    for _ in range(2):
+        breaker.record_success(0.1)
+    for _ in range(2):
+        breaker.record_failure("HTTP 503")
+    return breaker
+
+
+def test_stays_closed_below_min_calls():
+    breaker = CircuitBreaker(window=10, min_calls=4)
+    for _ in range(3):
+        breaker.record_failure("HTTP 503")
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_opens_on_failure_ratio_and_rejects():
+    breaker = _open_breaker(open_sec=60)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+    assert 0 < breaker.retry_after() <= 60
+
+
+def test_opens_on_slow_call_ratio():
+    breaker = CircuitBreaker(window=10, min_calls=4, slow_call_sec=1.0, slow_call_ratio=0.75, open_sec=60)
+    breaker.record_success(0.1)
+    for _ in range(3):
+        breaker.record_success(2.0)
+    assert breaker.state == OPEN
+    assert breaker.stats()["slow_calls"] == 3
+
+
+def test_half_open_allows_limited_probes_and_closes_on_success():
+    breaker = _open_breaker(open_sec=0.05, half_open_probes=1)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = _open_breaker(open_sec=0.05)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure("HTTP 429")
+    assert breaker.state == OPEN
+    assert breaker.stats()["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->open": 1}
+
+
+def test_slow_probe_reopens():
+    breaker = _open_breaker(open_sec=0.05, slow_call_sec=1.0)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success(5.0)
+    assert breaker.state == OPEN
+
+
+def test_ignored_probe_frees_the_probe_slot():
+    breaker = _open_breaker(open_sec=0.05)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_ignored()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
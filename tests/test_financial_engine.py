@@ -0,0 +1,135 @@
+from datetime import date
+
+import numpy as np
+
+from app.services.financial_engine import _project, compute_facts, compute_facts_batch
+
+AS_OF = date(2025, 6, 1)
+
+SINGLE = {
+    "age": 35,
+    "marryStatus": "single",
+    "childCount": 0,
+    "annualIncome": 48_000_000,
+    "monthlySavingAmount": 1_000_000,
+    "hasOwnedHouse": False,
+    "subscriptionStartDate": "2018-03-01",
+    "currentFinancialAssets": 10_000_000,
+}
+FAMILY = {
+    **SINGLE,
+    "marryStatus": "married",
+    "childCount": 2,
+    "isSupportingParents": True,
+    "unhousedStartYear": 2005,
+    "subscriptionStartDate": "2005-01-01",
+}
+# 월 상환액이 월 소득의 50% 지만 원금은 1년 안에 갚는 부채
+SHORT_HEAVY_DEBT = {
+    **SINGLE,
+    "hasDebt": True,
+    "debtType": "credit",
+    "debtPrincipal": 2_000_000,
+    "monthlyDebtPayment": 2_000_000,
+}
+
+
+def test_single_applicant_score():
+    facts = compute_facts(SINGLE, as_of=AS_OF)
+    score = facts.subscriptionScore
+    # 무주택: 만 30세(2020년)부터 5년 → 2 + 2×5, 부양가족 0명 → 5, 통장 7년 3개월 → 2 + 7
+    assert (score.unhousedPeriod, score.dependents, score.accountPeriod) == (12, 5, 9)
+    assert score.total == 26
+    assert facts.eligibility.generalFirstRank
+    assert not facts.eligibility.newlywed
+    assert facts.canBuyWithCheongyak
+    assert facts.recommendedHorizon == "MID_5"
+
+
+def test_score_components_are_capped():
+    score = compute_facts(FAMILY, as_of=AS_OF).subscriptionScore
+    # 무주택 15년 이상 → 32, 부양가족 4명(배우자+자녀 2+부모) → 25, 통장 15년 이상 → 17
+    assert (score.unhousedPeriod, score.dependents, score.accountPeriod) == (32, 25, 17)
+    assert score.total == 74
+
+
+def test_high_score_family_targets_short_horizon():
+    facts = compute_facts(FAMILY, as_of=AS_OF)
+    assert facts.eligibility.multiChild
+    assert facts.recommendedHorizon == "SHORT_3"
+
+
+def test_missing_account_date_scores_zero_account_points():
+    score = compute_facts({"age": 35}, as_of=AS_OF).subscriptionScore
+    assert score.accountPeriod == 0
+    assert score.total == 17
+
+
+def test_saving_projection_without_debt():
+    facts = compute_facts(SINGLE, as_of=AS_OF)
+    amounts = [p.amount for p in facts.savingProjectionByYear]
+    assert len(amounts) == 11
+    assert amounts[0] == 10_000_000
+    assert amounts[1] == 10_000_000 + 12 * 1_000_000
+    assert facts.debtFreeYear == 0
+
+
+def test_wait_years_advance_score_but_not_projection():
+    now, later = compute_facts_batch([SINGLE, SINGLE], as_of=AS_OF, wait_years=[0, 3])
+    assert later.subscriptionScore.unhousedPeriod == 12 + 2 * 3
+    # 통장 7년 3개월 + 3년 → 10년 3개월
+    assert later.subscriptionScore.accountPeriod == 12
+    assert later.savingProjectionByYear == now.savingProjectionByYear
+
+
+def test_heavy_debt_pushes_horizon_out_until_paid_off():
+    now, after_payoff = compute_facts_batch([SHORT_HEAVY_DEBT] * 2, as_of=AS_OF, wait_years=[0, 1])
+    assert now.debtServiceRatio == 0.5
+    assert not now.canBuyWithCheongyak
+    assert now.recommendedHorizon == "LONG_10"
+    # 1년 기다리면 상환이 끝나므로 판정 시점의 부채 부담에서 빠진다
+    assert after_payoff.debtFreeYear == 1
+    assert after_payoff.canBuyWithCheongyak
+    assert after_payoff.recommendedHorizon == "MID_5"
+
+
+def test_batch_matches_single_computation():
+    users = [SINGLE, FAMILY, SHORT_HEAVY_DEBT, {"age": 29}]
+    assert compute_facts_batch(users, as_of=AS_OF) == [compute_facts(u, as_of=AS_OF) for u in users]
+    assert compute_facts_batch([], as_of=AS_OF) == []
+
+
+def _project_monthly(base_assets, monthly_saving, debt, monthly_rate, payment, years):
+    # 닫힌 식과 비교할 월별 반복 기준 구현
+    assets, debt = base_assets.copy(), debt.copy()
+    assets_by_year, debt_by_year = [assets.copy()], [debt.copy()]
+    for month in range(1, years * 12 + 1):
+        freed = np.where(debt <= 0, payment, 0.0)
+        principal = np.clip(payment - debt * monthly_rate, 0.0, debt)
+        debt = debt - principal
+        assets = assets + monthly_saving + freed
+        if month % 12 == 0:
+            assets_by_year.append(assets.copy())
+            debt_by_year.append(debt.copy())
+    return np.stack(assets_by_year, axis=1), np.stack(debt_by_year, axis=1)
+
+
+def test_closed_form_projection_matches_monthly_simulation():
+    rng = np.random.default_rng(7)
+    n = 500
+    base_assets = rng.integers(0, 500_000_000, n).astype(float)
+    monthly_saving = rng.integers(-1_000_000, 5_000_000, n).astype(float)
+    debt = np.where(rng.random(n) < 0.2, 0.0, rng.integers(0, 300_000_000, n).astype(float))
+    monthly_rate = rng.choice([0.0, 0.035 / 12, 0.07 / 12, 0.12 / 12], n)
+    payment = np.where(rng.random(n) < 0.1, 0.0, rng.integers(0, 5_000_000, n).astype(float))
+    # 무이자로 정확히 12개월에 끝나는 경우 (상환 다음 달부터 저축으로 전환)
+    debt[0], payment[0], monthly_rate[0] = 1_200_000.0, 100_000.0, 0.0
+
+    expected_assets, expected_debt = _project_monthly(
+        base_assets, monthly_saving, debt, monthly_rate, payment, 10
+    )
+    assets, remaining = _project(base_assets, monthly_saving, debt, monthly_rate, payment, 10)
+    assert assets.shape == expected_assets.shape == (n, 11)
+    np.testing.assert_allclose(assets, expected_assets, rtol=1e-9)
+    np.testing.assert_allclose(remaining, expected_debt, rtol=1e-6, atol=1e-3)
+    assert remaining[0, 1] == 0.0
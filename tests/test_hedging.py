@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.financial_engine import compute_facts
+from app.services.gemini_service import GeminiServiceError
+from app.services.life_cycle_service import LifeCycleService
+from tests.fakes import PLAN_JSON, SURVEY, FakeGemini, RecordingRepo
+
+FACTS = compute_facts(SURVEY)
+PRIMARY = settings.GEMINI_MODEL
+HEDGE = settings.GEMINI_HEDGE_MODEL
+
+
+def _hedged(replies, delays, hedge_delay_sec=0.01):
+    service = LifeCycleService(FakeGemini(replies, delays, hedge_delay_sec), RecordingRepo())
+
+    async def scenario():
+        try:
+            return await service._generate_hedged("prompt", FACTS, None)
+        finally:
+            # 취소된 호출이 CancelledError 를 처리할 틈을 준다
+            await asyncio.sleep(0)
+
+    return service, scenario
+
+
+def test_fast_primary_is_not_hedged():
+    service, scenario = _hedged({None: [PLAN_JSON]}, {PRIMARY: 0.0}, hedge_delay_sec=1.0)
+    asyncio.run(scenario())
+    assert service.gemini.calls == [PRIMARY]
+    assert service.hedge_stats["hedged"] == 0
+
+
+def test_hedge_wins_and_slow_primary_is_cancelled():
+    service, scenario = _hedged({None: [PLAN_JSON]}, {PRIMARY: 5.0, HEDGE: 0.0})
+    plan = asyncio.run(scenario())
+    assert plan.summary.title
+    assert service.gemini.calls == [PRIMARY, HEDGE]
+    assert service.gemini.cancelled == [PRIMARY]
+    stats = service.hedge_stats
+    assert (stats["hedged"], stats["hedgeWins"], stats["primaryWins"]) == (1, 1, 0)
+
+
+def test_failed_hedge_falls_back_to_primary():
+    replies = {PRIMARY: [PLAN_JSON], HEDGE: [GeminiServiceError("hedge 500")]}
+    service, scenario = _hedged(replies, {PRIMARY: 0.05, HEDGE: 0.0})
+    asyncio.run(scenario())
+    assert service.gemini.cancelled == []
+    stats = service.hedge_stats
+    assert (stats["hedged"], stats["hedgeWins"], stats["primaryWins"]) == (1, 0, 1)
+
+
+def test_both_failing_raises_the_primary_error():
+    replies = {PRIMARY: [GeminiServiceError("primary 500")], HEDGE: [GeminiServiceError("hedge 500")]}
+    service, scenario = _hedged(replies, {PRIMARY: 0.05, HEDGE: 0.0})
+    with pytest.raises(GeminiServiceError, match="primary 500"):
+        asyncio.run(scenario())
+    assert service.hedge_stats["bothFailed"] == 1
+
+
+def test_generate_plan_hedges_only_when_enabled(monkeypatch):
+    def run():
+        service = LifeCycleService(FakeGemini(delays={None: 0.05}, hedge_delay_sec=0.01), RecordingRepo())
+        asyncio.run(service.generate_plan(dict(SURVEY)))
+        return service
+
+    monkeypatch.setattr(settings, "GEMINI_HEDGE_ENABLED", False)
+    assert run().hedge_stats["hedged"] == 0
+
+    monkeypatch.setattr(settings, "GEMINI_HEDGE_ENABLED", True)
+    assert run().hedge_stats["hedged"] == 1
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from app.services.json_sanitizer import (
+    IncrementalJsonParser,
+    JsonStreamError,
+    extract_json_object,
+    parse_json_object,
+)
+
+PLAN = {
+    "summary": {"title": "5년 안에 청약", "body": "괄호 {} 와 \"따옴표\" 도 본문에 들어간다"},
+    "score": 12.5,
+    "ratio": -3e-2,
+    "flags": [True, False, None],
+    "name": "가나",
+    "empty": {},
+}
+DOC = json.dumps(PLAN, ensure_ascii=False)
+ESCAPED_DOC = json.dumps(PLAN)  # \uXXXX 이스케이프가 조각 경계에서 잘리는 경우
+
+
+def _feed(chunks):
+    parser = IncrementalJsonParser()
+    sections = []
+    for chunk in chunks:
+        sections.extend(parser.feed(chunk))
+    return parser, sections
+
+
+def test_extract_ignores_fence_and_surrounding_text():
+    text = f"플랜입니다:\n```json\n{DOC}\n```\n참고하세요 {{끝}}"
+    assert extract_json_object(text) == DOC
+    assert parse_json_object(text) == PLAN
+
+
+def test_braces_before_the_object_are_skipped():
+    text = '{고객명} 님의 결과 {"a": 1}'
+    assert extract_json_object(text) == '{"a": 1}'
+
+
+@pytest.mark.parametrize("doc", [DOC, ESCAPED_DOC])
+def test_every_split_point_gives_the_same_result(doc):
+    text = "```json\n" + doc + "\n```"
+    for split in range(len(text) + 1):
+        parser, sections = _feed([text[:split], text[split:]])
+        assert parser.closed, split
+        assert parser.close() == PLAN, split
+        assert [key for key, _ in sections] == list(PLAN), split
+
+
+def test_char_by_char_feed():
+    parser, sections = _feed(list(DOC))
+    assert dict(sections) == PLAN
+    assert parser.span == (0, len(DOC))
+
+
+def test_number_at_chunk_end_waits_for_the_rest():
+    parser = IncrementalJsonParser()
+    assert parser.feed('{"a": 12') == []
+    assert parser.feed('.5, "b": tr') == [("a", 12.5)]
+    assert parser.feed('ue}') == [("b", True)]
+    assert parser.closed
+
+
+def test_members_are_emitted_as_soon_as_they_close():
+    parser = IncrementalJsonParser()
+    assert parser.feed('{"summary": {"title": "t"}, "diagnosis": {"reasons": ["r"') == [("summary", {"title": "t"})]
+    assert parser.feed("]}}") == [("diagnosis", {"reasons": ["r"]})]
+
+
+def test_text_after_the_object_is_ignored():
+    parser, _ = _feed(['{"a": 1}', ' 그리고 {"b": 2}'])
+    assert parser.close() == {"a": 1}
+    assert parser.feed('{"c": 3}') == []
+
+
+@pytest.mark.parametrize("truncated", ['{"a": 1, "b": "unterminated', '{"a": 1, "b": [1, 2', '{"a": 1,', '{"a": 12'])
+def test_truncated_output_raises_on_close(truncated):
+    parser, _ = _feed([truncated])
+    with pytest.raises(JsonStreamError, match="ended before"):
+        parser.close()
+
+
+def test_missing_object_raises():
+    with pytest.raises(JsonStreamError, match="Could not locate"):
+        parse_json_object("JSON 이 없는 답변")
+    with pytest.raises(ValueError):
+        parse_json_object("")
+
+
+def test_broken_token_reports_offset():
+    text = '{"a": 1 "b": 2}'
+    with pytest.raises(JsonStreamError) as info:
+        parse_json_object(text)
+    assert info.value.offset == text.index('"b"')
+    # JsonStreamError 는 ValueError 라 기존 except ValueError 경로로도 잡힌다
+    assert isinstance(info.value, ValueError)
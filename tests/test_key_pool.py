@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+from app.services.key_pool import (
+    GeminiKey,
+    GeminiKeyPool,
+    KeyPoolExhausted,
+    KeyPoolRequestTooLarge,
+    parse_keys,
+)
+
+KEYS = [GeminiKey("key-a", "https://a.example/v1beta"), GeminiKey("key-b", "https://b.example/v1beta")]
+
+
+def _pool(tmp_path, keys=KEYS, **kwargs) -> GeminiKeyPool:
+    return GeminiKeyPool(str(tmp_path / "keys.sqlite3"), keys, **kwargs)
+
+
+def test_parse_keys():
+    keys = parse_keys(" k1, k2@https://other/v1beta/ ,", None, "https://default/v1beta")
+    assert keys == [GeminiKey("k1", "https://default/v1beta"), GeminiKey("k2", "https://other/v1beta")]
+    assert parse_keys("", "fallback", "https://default/") == [GeminiKey("fallback", "https://default")]
+
+
+def test_rotates_across_keys(tmp_path):
+    pool = _pool(tmp_path)
+
+    async def scenario():
+        # 처리 중인 호출이 적은 키 → 최근 1분 호출이 적은 키 순으로 고른다
+        first, second = await pool.acquire(10), await pool.acquire(10)
+        assert first.key != second.key
+        await pool.release(first, 200)
+        await pool.release(second, 200)
+        used = []
+        for _ in range(4):
+            lease = await pool.acquire(10)
+            used.append(lease.key)
+            await pool.release(lease, 200)
+        return used
+
+    assert Counter(asyncio.run(scenario())) == {"key-a": 2, "key-b": 2}
+
+
+def test_429_quarantines_key_until_cooldown(tmp_path):
+    pool = _pool(tmp_path, quarantine_sec=0.2, max_wait_sec=0)
+
+    async def scenario():
+        lease = await pool.acquire(10)
+        await pool.release(lease, 429)
+        others = []
+        for _ in range(3):
+            other = await pool.acquire(10)
+            others.append(other.key)
+            await pool.release(other, 200)
+        assert set(others) == {KEYS[1].key if lease.key == KEYS[0].key else KEYS[0].key}
+        stats = pool.stats()["keys"][lease.key_id]
+        assert stats["strikes"] == 1 and stats["quarantinedForSec"] > 0
+
+        await asyncio.sleep(0.25)
+        recovered = set()
+        for _ in range(4):
+            again = await pool.acquire(10)
+            recovered.add(again.key)
+            await pool.release(again, 200)
+        assert lease.key in recovered
+        assert pool.stats()["keys"][lease.key_id]["strikes"] == 0
+
+    asyncio.run(scenario())
+    assert pool.stats()["quarantines"] == 1
+
+
+def test_exhausted_when_every_key_is_quarantined(tmp_path):
+    pool = _pool(tmp_path, quarantine_sec=30, max_wait_sec=0.1)
+
+    async def scenario():
+        for _ in KEYS:
+            await pool.release(await pool.acquire(10), 429)
+        with pytest.raises(KeyPoolExhausted) as info:
+            await pool.acquire(10)
+        return info.value
+
+    assert asyncio.run(scenario()).retry_after > 1
+    assert pool.stats()["exhausted"] == 1
+
+
+def test_rpm_limit_fails_fast_when_quota_frees_too_late(tmp_path):
+    pool = _pool(tmp_path, keys=KEYS[:1], rpm=1, max_wait_sec=0.1)
+
+    async def scenario():
+        await pool.release(await pool.acquire(10), 200)
+        started = time.monotonic()
+        with pytest.raises(KeyPoolExhausted):
+            await pool.acquire(10)
+        # 구간이 풀릴 시각(약 60초 뒤)이 대기 한도를 넘으므로 기다리지 않고 바로 실패한다
+        assert time.monotonic() - started < 0.1
+
+    asyncio.run(scenario())
+
+
+def test_request_larger_than_tpm_fails_fast(tmp_path):
+    pool = _pool(tmp_path, tpm=1000, max_wait_sec=5)
+
+    async def scenario():
+        with pytest.raises(KeyPoolRequestTooLarge):
+            await pool.acquire(5000)
+
+    asyncio.run(scenario())
+    assert pool.stats()["too_large"] == 1
+
+
+def test_cancelled_acquire_discards_claimed_key(tmp_path):
+    pool = _pool(tmp_path, tpm=1000)
+
+    async def scenario():
+        for _ in range(10):
+            task = asyncio.ensure_future(pool.acquire(100))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        await asyncio.sleep(0.3)
+
+    asyncio.run(scenario())
+    for row in pool.stats()["keys"].values():
+        assert row["inFlight"] == 0
+        assert row["requestsLastMinute"] == 0
+        assert row["tokensLastMinute"] == 0
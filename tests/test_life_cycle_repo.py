@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+import time
+
+from app.repositories.life_cycle_repo import LifeCycleRepo, SqliteRecordStore
+
+
+class RecordingStore:
+    def __init__(self, gate=None, fail=False):
+        self.batches = []
+        self.gate = gate
+        self.fail = fail
+        self.closed = False
+
+    def write_batch(self, rows):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append(list(rows))
+
+    def close(self):
+        self.closed = True
+
+
+def _save(repo, n, survey_id=1):
+    for i in range(n):
+        repo.save_record("plan", {"surveyId": survey_id, "i": i}, None, f'{{"i": {i}}}')
+
+
+def test_close_flushes_in_batches_of_batch_size():
+    store = RecordingStore()
+    repo = LifeCycleRepo(store=store, batch_size=3, flush_interval_sec=5.0)
+    _save(repo, 7)
+    repo.close()
+
+    assert [len(b) for b in store.batches] == [3, 3, 1]
+    assert store.closed
+    stats = repo.stats()
+    assert stats["enqueued"] == 7
+    assert stats["written"] == 7
+    assert stats["dropped"] == 0
+
+
+def test_flush_interval_writes_partial_batch():
+    store = RecordingStore()
+    repo = LifeCycleRepo(store=store, batch_size=100, flush_interval_sec=0.05)
+    _save(repo, 2)
+    deadline = time.monotonic() + 2
+    while not store.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        assert [len(b) for b in store.batches] == [2]
+    finally:
+        repo.close()
+
+
+def test_full_queue_drops_without_blocking():
+    gate = threading.Event()
+    store = RecordingStore(gate=gate)
+    repo = LifeCycleRepo(store=store, max_queue=2, batch_size=1, flush_interval_sec=0.0)
+    try:
+        _save(repo, 1)
+        # 쓰기 스레드가 첫 기록을 꺼내 막힐 때까지 기다린다
+        deadline = time.monotonic() + 2
+        while repo.stats()["queue_depth"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started = time.perf_counter()
+        _save(repo, 10)
+        elapsed = time.perf_counter() - started
+
+        stats = repo.stats()
+        assert stats["enqueued"] == 3
+        assert stats["dropped"] == 8
+        assert elapsed < 0.05
+    finally:
+        gate.set()
+        repo.close()
+    assert repo.stats()["written"] == 3
+
+
+def test_write_error_is_counted_and_writer_keeps_running():
+    store = RecordingStore(fail=True)
+    repo = LifeCycleRepo(store=store, batch_size=2, flush_interval_sec=5.0)
+    _save(repo, 4)
+    repo.close()
+
+    stats = repo.stats()
+    assert stats["write_errors"] == 2
+    assert stats["written"] == 0
+
+
+def test_sqlite_store_persists_rows(tmp_path):
+    db_path = str(tmp_path / "records.db")
+    repo = LifeCycleRepo(store=SqliteRecordStore(db_path), batch_size=50)
+    _save(repo, 5, survey_id=42)
+    repo.close()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT task, survey_id, result_json FROM life_cycle_records ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    assert len(rows) == 5
+    assert rows[0] == ("plan", 42, '{"i": 0}')
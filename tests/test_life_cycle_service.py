@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import SHED_FALLBACK, SHED_REJECT, AdmissionController, AdmissionRejected
+from app.services.gemini_service import GeminiCircuitOpen, GeminiServiceTimeout, GeminiServiceUnavailable
+from app.services.life_cycle_service import LifeCycleService
+from app.services.plan_cache import PlanCache
+from tests.fakes import PLAN_JSON, SURVEY, FakeGemini, RecordingRepo
+
+
+def _service(gemini=None, cache=None, **kwargs):
+    return LifeCycleService(gemini or FakeGemini(), RecordingRepo(), cache=cache, **kwargs)
+
+
+def test_cache_miss_calls_llm_then_hit_skips_it():
+    cache = PlanCache(max_entries=8, ttl_sec=60)
+    service = _service(cache=cache)
+
+    async def scenario():
+        first = await service.generate_plan(dict(SURVEY))
+        second = await service.generate_plan(dict(SURVEY))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert service.gemini.calls == [None]
+    assert first == second
+    assert first.report != "보고서 생성 예정"
+    stats = cache.stats()
+    assert (stats["misses"], stats["memory_hits"]) == (1, 1)
+    # 기록은 LLM 이 새로 만든 플랜만 남긴다
+    assert len(service.repo.records) == 1
+
+
+def test_cache_hit_rerenders_local_fields_for_the_new_input():
+    cache = PlanCache(max_entries=8, ttl_sec=60)
+    service = _service(cache=cache)
+    # surveyId / 희망 평형은 LLM 입력이 아니므로 같은 캐시 키를 쓴다
+    other = {**SURVEY, "surveyId": 2, "preferredHousingSize": "84㎡"}
+
+    async def scenario():
+        await service.generate_plan(dict(SURVEY))
+        return await service.generate_plan(other)
+
+    plan = asyncio.run(scenario())
+    assert service.gemini.calls == [None]
+    assert "희망 평형 84㎡" in plan.report
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+    db_path = str(tmp_path / "plan_cache.sqlite3")
+    writer = _service(cache=PlanCache(max_entries=8, ttl_sec=60, db_path=db_path))
+    reader_cache = PlanCache(max_entries=8, ttl_sec=60, db_path=db_path)
+    reader = _service(cache=reader_cache)
+
+    async def scenario():
+        await writer.generate_plan(dict(SURVEY))
+        return await reader.generate_plan(dict(SURVEY))
+
+    asyncio.run(scenario())
+    assert reader.gemini.calls == []
+    assert reader_cache.stats()["disk_hits"] == 1
+
+
+def test_concurrent_identical_requests_share_one_llm_call():
+    service = _service(gemini=FakeGemini(delays={None: 0.05}))
+
+    async def scenario():
+        return await asyncio.gather(*(service.generate_plan(dict(SURVEY)) for _ in range(5)))
+
+    plans = asyncio.run(scenario())
+    assert service.gemini.calls == [None]
+    assert all(plan == plans[0] for plan in plans)
+    stats = service.single_flight.stats()
+    assert (stats["leaders"], stats["collapsed"], stats["inflight"]) == (1, 4, 0)
+
+
+def _is_fallback(plan) -> bool:
+    return plan.diagnosis.confidenceLevel == "LOW" and plan.summary.title.startswith("임시 청약 플랜")
+
+
+@pytest.mark.parametrize(
+    "error",
+    [GeminiCircuitOpen("circuit open"), GeminiServiceUnavailable("503"), GeminiServiceTimeout("upstream timeout")],
+)
+def test_upstream_failure_serves_fallback_and_is_not_cached(error):
+    cache = PlanCache(max_entries=8, ttl_sec=60)
+    service = _service(gemini=FakeGemini({None: [error, PLAN_JSON]}), cache=cache)
+
+    async def scenario():
+        first = await service.generate_plan(dict(SURVEY))
+        second = await service.generate_plan(dict(SURVEY))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert _is_fallback(first)
+    assert str(error) in first.summary.body
+    # fallback 은 캐시하지 않으므로 다음 요청은 다시 LLM 을 부른다
+    assert not _is_fallback(second)
+    assert service.gemini.calls == [None, None]
+    assert [r["result"] for r in service.repo.records] == [first, second]
+
+
+def test_timeout_serves_fallback():
+    service = _service(gemini=FakeGemini(delays={None: 1.0}))
+    plan = asyncio.run(service.generate_plan(dict(SURVEY), timeout_sec=0.02))
+    assert _is_fallback(plan)
+    assert "초과" in plan.summary.body
+
+
+def _admission(policy):
+    return AdmissionController(max_in_flight=1, max_queue=0, service_estimate=lambda model: 1.0, policy=policy)
+
+
+async def _generate_while_busy(service, admission):
+    release = asyncio.Event()
+
+    async def hold():
+        async with admission.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    try:
+        return await service.generate_plan(dict(SURVEY), admission=admission)
+    finally:
+        release.set()
+        await holder
+
+
+def test_admission_rejection_serves_fallback_under_fallback_policy():
+    service = _service()
+    plan = asyncio.run(_generate_while_busy(service, _admission(SHED_FALLBACK)))
+    assert _is_fallback(plan)
+    assert service.gemini.calls == []
+
+
+def test_admission_rejection_raises_under_reject_policy():
+    service = _service()
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(_generate_while_busy(service, _admission(SHED_REJECT)))
+    assert rejected.value.reason == "queue_full"
+    assert service.gemini.calls == []
+    assert service.repo.records == []
@@ -0,0 +1,85 @@
+import asyncio
+import sqlite3
+import time
+
+from app.services.plan_cache import PlanCache
+from tests.fakes import sample_plan
+
+
+def _disk_keys(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT key FROM plan_cache")}
+    finally:
+        conn.close()
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = PlanCache(max_entries=2, ttl_sec=60)
+
+    async def scenario():
+        await cache.set("a", sample_plan("a"))
+        await cache.set("b", sample_plan("b"))
+        await cache.get("a")
+        await cache.set("c", sample_plan("c"))
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    a, b, c = asyncio.run(scenario())
+    assert a.summary.title == "a" and c.summary.title == "c"
+    assert b is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = PlanCache(max_entries=8, ttl_sec=-1, db_path=str(tmp_path / "cache.sqlite3"))
+
+    async def scenario():
+        await cache.set("a", sample_plan())
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) is None
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 2
+
+
+def test_prune_runs_every_n_writes_and_caps_disk_entries(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = PlanCache(max_entries=8, ttl_sec=60, db_path=db_path, max_disk_entries=2, prune_every=3)
+
+    async def scenario():
+        for key in ("a", "b"):
+            await cache.set(key, sample_plan(key))
+            time.sleep(0.01)
+
+    asyncio.run(scenario())
+    # 만료된 행은 다음 정리 때 지워진다
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO plan_cache (key, plan_json, expires_at) VALUES ('old', '{}', 0)")
+    conn.commit()
+    conn.close()
+    assert _disk_keys(db_path) == {"a", "b", "old"}
+
+    async def third_write():
+        await cache.set("c", sample_plan("c"))
+
+    asyncio.run(third_write())
+    # 세 번째 쓰기에서 정리: 만료 1건 + 초과분(가장 먼저 만료되는 a) 1건
+    assert _disk_keys(db_path) == {"b", "c"}
+    assert cache.stats()["evictions"] == 2
+
+
+def test_undecodable_disk_rows_are_dropped(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = PlanCache(max_entries=8, ttl_sec=60, db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO plan_cache (key, plan_json, expires_at) VALUES ('stale', '{\"summary\": 1}', ?)",
+        (time.time() + 60,),
+    )
+    conn.commit()
+    conn.close()
+
+    assert asyncio.run(cache.get("stale")) is None
+    assert cache.stats()["invalid_entries"] == 1
+    assert _disk_keys(db_path) == set()
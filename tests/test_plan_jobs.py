@@ -0,0 +1,130 @@
+import asyncio
+import json
+import sqlite3
+
+from app.services.plan_jobs import FAILED, RUNNING, SUCCEEDED, PlanJobQueue
+from tests.fakes import sample_plan
+
+
+def _describe(exc: Exception):
+    return {"status": 500, "detail": str(exc)}
+
+
+def _queue(tmp_path, run, **kwargs) -> PlanJobQueue:
+    return PlanJobQueue(str(tmp_path / "jobs.sqlite3"), run=run, describe_error=_describe, workers=2, **kwargs)
+
+
+async def _plan(user_data):
+    return sample_plan(title=f"plan {user_data['n']}")
+
+
+def test_submit_and_long_poll(tmp_path):
+    async def scenario():
+        jobs = _queue(tmp_path, _plan)
+        await jobs.start()
+        submitted = await jobs.submit({"n": 1})
+        job = await jobs.get(submitted["jobId"], wait_sec=5)
+        await jobs.stop()
+        return jobs, job
+
+    jobs, job = asyncio.run(scenario())
+    assert job["status"] == SUCCEEDED
+    assert job["plan"]["summary"]["title"] == "plan 1"
+    assert jobs.stats()["succeeded"] == 1
+
+
+def test_failed_job_records_error(tmp_path):
+    async def fail(user_data):
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        jobs = _queue(tmp_path, fail)
+        await jobs.start()
+        job = await jobs.get((await jobs.submit({"n": 1}))["jobId"], wait_sec=5)
+        await jobs.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job["status"] == FAILED
+    assert job["error"] == {"status": 500, "detail": "upstream down"}
+
+
+def test_live_owner_keeps_its_jobs_and_dead_owner_is_recovered(tmp_path):
+    # 같은 프로세스(같은 PID) 안의 두 큐: 컨테이너 재시작으로 PID 가 재사용되는 경우와 같다
+    release = asyncio.Event()
+
+    async def blocked(user_data):
+        await release.wait()
+        return await _plan(user_data)
+
+    async def scenario():
+        crashed = _queue(tmp_path, blocked, heartbeat_sec=0.05)
+        survivor = _queue(tmp_path, _plan, heartbeat_sec=0.05)
+        await crashed.start()
+        job_id = (await crashed.submit({"n": 7}))["jobId"]
+        await asyncio.sleep(0.05)
+        await survivor.start()
+
+        # heartbeat 가 살아 있는 동안에는 가져가지 않는다
+        await asyncio.sleep(0.3)
+        assert survivor.stats()["recovered"] == 0
+        assert (await survivor.get(job_id))["status"] == RUNNING
+
+        # 작업 도중 죽은 워커: heartbeat 가 끊기면 살아 있는 워커가 다시 실행한다
+        await crashed.stop()
+        job = await survivor.get(job_id, wait_sec=5)
+        await survivor.stop()
+        return survivor, job
+
+    survivor, job = asyncio.run(scenario())
+    assert job["status"] == SUCCEEDED
+    assert job["plan"]["summary"]["title"] == "plan 7"
+    assert survivor.stats()["recovered"] == 1
+
+
+def test_recovers_jobs_from_the_previous_schema(tmp_path):
+    # owner 컬럼이 없던 DB (owner_pid 만 있음) 에 남은 미완료 작업
+    db_path = tmp_path / "jobs.sqlite3"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE plan_jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, owner_pid INTEGER NOT NULL,"
+        " request_json TEXT NOT NULL, result_json TEXT, error_json TEXT, created_at REAL NOT NULL,"
+        " started_at REAL, finished_at REAL)"
+    )
+    conn.execute(
+        "INSERT INTO plan_jobs (id, status, owner_pid, request_json, created_at) VALUES (?, ?, ?, ?, ?)",
+        ("old", RUNNING, 1, json.dumps({"n": 3}), 0.0),
+    )
+    conn.commit()
+    conn.close()
+
+    async def scenario():
+        jobs = _queue(tmp_path, _plan)
+        await jobs.start()
+        job = await jobs.get("old", wait_sec=5)
+        await jobs.stop()
+        return jobs, job
+
+    jobs, job = asyncio.run(scenario())
+    assert job["status"] == SUCCEEDED
+    assert jobs.stats()["recovered"] == 1
+
+
+def test_done_event_is_dropped_when_recording_fails(tmp_path):
+    async def scenario():
+        jobs = _queue(tmp_path, _plan)
+
+        def broken_finish(*args):
+            raise sqlite3.OperationalError("database is locked")
+
+        jobs._mark_finished = broken_finish
+        await jobs.start()
+        await jobs.submit({"n": 1})
+        # 알 수 없는 id: _mark_running 이 None 을 돌려준다
+        jobs._done_events["missing"] = asyncio.Event()
+        jobs._queue.put_nowait("missing")
+        await jobs._queue.join()
+        await jobs.stop()
+        return jobs
+
+    assert asyncio.run(scenario())._done_events == {}
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import AdaptiveRateLimiter, RateLimiterTimeout
+
+
+def _limiter(tmp_path, **kwargs) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(str(tmp_path / "limiter.sqlite3"), **kwargs)
+
+
+def test_success_grows_window_additively(tmp_path):
+    limiter = _limiter(tmp_path, initial_window=8)
+
+    async def scenario():
+        for _ in range(2):
+            async with limiter.slot():
+                pass
+
+    asyncio.run(scenario())
+    # 8 → 8 + 1/8 → 8.125 + 1/8.125
+    assert limiter.stats()["window"] == round(8 + 1 / 8 + 1 / (8 + 1 / 8), 2)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_throttle_shrinks_window_once_per_cooldown(tmp_path):
+    limiter = _limiter(tmp_path, initial_window=8, decrease_factor=0.5, decrease_cooldown_sec=60)
+
+    async def scenario():
+        for _ in range(3):
+            lease_id = await limiter.acquire()
+            await limiter.release(lease_id, "throttled")
+
+    asyncio.run(scenario())
+    stats = limiter.stats()
+    # 동시에 돌아온 429 들로 window 가 한꺼번에 무너지지 않는다
+    assert stats["window"] == 4
+    assert stats["throttled"] == 3
+    assert stats["throttle_rate"] == 1.0
+
+
+def test_throttle_respects_min_window(tmp_path):
+    limiter = _limiter(tmp_path, initial_window=4, min_window=2, decrease_cooldown_sec=0)
+
+    async def scenario():
+        for _ in range(4):
+            lease_id = await limiter.acquire()
+            await limiter.release(lease_id, "throttled")
+
+    asyncio.run(scenario())
+    assert limiter.stats()["window"] == 2
+
+
+def test_slot_marks_throttled_on_error(tmp_path):
+    limiter = _limiter(tmp_path, initial_window=8, decrease_cooldown_sec=0)
+
+    async def scenario():
+        async with limiter.slot() as slot:
+            slot.mark_throttled()
+            raise RuntimeError("HTTP 429")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+    assert limiter.stats()["window"] == 4
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_acquire_waits_for_window_then_times_out(tmp_path):
+    limiter = _limiter(tmp_path, initial_window=1)
+
+    async def scenario():
+        first = await limiter.acquire()
+        with pytest.raises(RateLimiterTimeout):
+            await limiter.acquire(max_wait_sec=0.1)
+        # 같은 워커의 반납은 대기 중인 요청을 바로 깨운다
+        waiter = asyncio.ensure_future(limiter.acquire(max_wait_sec=5))
+        await asyncio.sleep(0.05)
+        await limiter.release(first, "ok")
+        await limiter.release(await waiter, "ok")
+
+    asyncio.run(scenario())
+    assert limiter.stats()["timeouts"] == 1
+    assert limiter.stats()["acquired"] == 2
+
+
+def test_cancelled_acquire_does_not_leak_leases(tmp_path):
+    limiter = _limiter(tmp_path, initial_window=4)
+
+    async def scenario():
+        for _ in range(20):
+            task = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        # 스레드에서 이미 잡힌 임대는 끝난 뒤 반납된다
+        await asyncio.sleep(0.3)
+
+    asyncio.run(scenario())
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.stats()["window"] == 4
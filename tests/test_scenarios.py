@@ -0,0 +1,47 @@
+from app.schemas.life_cycle import ScenarioGrid
+from app.schemas.life_cycle_response import ScenarioOverrides
+from app.services.scenarios import apply_overrides, expand_grid, scenario_count, scenario_label
+
+
+def test_empty_grid_is_only_the_base():
+    assert expand_grid(ScenarioGrid()) == [ScenarioOverrides()]
+    assert scenario_count(ScenarioGrid()) == 1
+
+
+def test_expands_all_combinations_after_the_base():
+    grid = ScenarioGrid(monthlySavingAmount=[1_000_000, 2_000_000], waitYears=[0, 3])
+    variants = expand_grid(grid)
+    assert variants[0] == ScenarioOverrides()
+    assert variants[1:] == [
+        ScenarioOverrides(monthlySavingAmount=1_000_000, waitYears=0),
+        ScenarioOverrides(monthlySavingAmount=1_000_000, waitYears=3),
+        ScenarioOverrides(monthlySavingAmount=2_000_000, waitYears=0),
+        ScenarioOverrides(monthlySavingAmount=2_000_000, waitYears=3),
+    ]
+    assert scenario_count(grid) == len(variants)
+
+
+def test_duplicate_values_are_expanded_once():
+    grid = ScenarioGrid(monthlySavingAmount=[1_000_000, 1_000_000, 2_000_000], isDoubleIncome=[True, True])
+    variants = expand_grid(grid)
+    assert variants == [
+        ScenarioOverrides(),
+        ScenarioOverrides(monthlySavingAmount=1_000_000, isDoubleIncome=True),
+        ScenarioOverrides(monthlySavingAmount=2_000_000, isDoubleIncome=True),
+    ]
+    # scenario_count 는 중복 제거 전 상한
+    assert scenario_count(grid) == 7
+
+
+def test_saving_rate_override_re_derives_monthly_saving():
+    user = {"annualIncome": 60_000_000, "monthlySavingAmount": 1_000_000, "targetSavingRate": 20}
+    variant = apply_overrides(user, ScenarioOverrides(targetSavingRate=40))
+    assert variant["targetSavingRate"] == 40
+    assert variant["monthlySavingAmount"] is None
+    assert user["monthlySavingAmount"] == 1_000_000
+
+
+def test_labels():
+    assert scenario_label(ScenarioOverrides()) == "현재 설문 기준"
+    label = scenario_label(ScenarioOverrides(monthlySavingAmount=1_500_000, isDoubleIncome=False, waitYears=2))
+    assert label == "월 저축 150만원 · 외벌이 · 2년 후 신청"
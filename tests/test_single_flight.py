@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_waiter_timeout_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        patient = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do("k", slow, timeout=0.01)
+        return await patient
+
+    assert asyncio.run(scenario()) == "done"
+    assert calls == [1]
+    stats = flight.stats()
+    assert (stats["leaders"], stats["collapsed"], stats["waiter_timeouts"]) == (1, 1, 1)
+
+
+def test_error_reaches_every_waiter_and_key_is_released():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream")
+
+    async def scenario():
+        results = await asyncio.gather(
+            flight.do("k", failing), flight.do("k", failing), return_exceptions=True
+        )
+        return results, flight.inflight("k")
+
+    results, inflight = asyncio.run(scenario())
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert inflight is False
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services.financial_engine import compute_facts
+from app.services.gemini_service import GeminiServiceError
+from app.services.life_cycle_service import LifeCycleService
+from tests.fakes import PLAN_JSON, PLAN_SECTIONS, SURVEY, FakeGemini, RecordingRepo
+
+FACTS = compute_facts(SURVEY)
+
+
+def _plan_json(**overrides) -> str:
+    sections = json.loads(PLAN_JSON)
+    for path, value in overrides.items():
+        section, field = path.split("__")
+        if value is None:
+            sections[section].pop(field)
+        else:
+            sections[section][field] = value
+    return json.dumps(sections, ensure_ascii=False)
+
+
+# summary 가 통째로 빠지면 로컬 보정으로 채울 수 없다
+UNREPAIRABLE = json.dumps({k: v for k, v in PLAN_SECTIONS.items() if k != "summary"}, ensure_ascii=False)
+
+
+def _parse(raw_text, repair_replies=None):
+    replies = {None: [PLAN_JSON]}
+    if repair_replies is not None:
+        replies[settings.GEMINI_REPAIR_MODEL] = repair_replies
+    service = LifeCycleService(FakeGemini(replies), RecordingRepo())
+    try:
+        return service, asyncio.run(service._parse_or_repair(raw_text, FACTS)), None
+    except ValueError as e:
+        return service, None, e
+
+
+def test_valid_output_needs_no_repair():
+    service, plan, _ = _parse("```json\n" + PLAN_JSON + "\n```")
+    assert plan.summary.title == PLAN_SECTIONS["summary"]["title"]
+    # 판정/차트는 LLM 값이 아니라 재무 엔진 값
+    assert plan.diagnosis.canBuyWithCheongyak == FACTS.canBuyWithCheongyak
+    assert plan.chartData.savingProjectionByYear == FACTS.savingProjectionByYear
+    assert service.output_stats["valid"] == 1
+    assert service.gemini.calls == []
+
+
+def test_local_repair_fixes_enum_case_and_missing_list_without_a_call():
+    service, plan, _ = _parse(_plan_json(diagnosis__confidenceLevel="high", diagnosis__reasons=None))
+    assert plan.diagnosis.confidenceLevel == "HIGH"
+    assert plan.diagnosis.reasons == []
+    assert service.output_stats["localRepairs"] == 1
+    assert service.gemini.calls == []
+
+
+def test_repair_call_rescues_unrepairable_output():
+    service, plan, _ = _parse(UNREPAIRABLE, repair_replies=[PLAN_JSON])
+    assert plan.summary.title == PLAN_SECTIONS["summary"]["title"]
+    assert service.gemini.calls == [settings.GEMINI_REPAIR_MODEL]
+    stats = service.output_stats
+    assert (stats["repairCalls"], stats["repairCallSuccesses"], stats["wastedGenerations"]) == (1, 1, 0)
+
+
+@pytest.mark.parametrize("repair_reply", ["{\"still\": \"broken\"", GeminiServiceError("upstream 500")])
+def test_failed_repair_reraises_the_original_error(repair_reply):
+    service, plan, error = _parse(UNREPAIRABLE, repair_replies=[repair_reply])
+    assert plan is None
+    assert "LLM JSON schema mismatch" in str(error)
+    assert "summary" in str(error)
+    stats = service.output_stats
+    assert (stats["repairCalls"], stats["repairCallSuccesses"], stats["wastedGenerations"]) == (1, 0, 1)